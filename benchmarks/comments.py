@@ -0,0 +1,41 @@
+import argparse
+import sys
+import time
+
+from specie import grammar
+
+
+# Return a generated script with the specified amount of inline comments, block comments and blank lines
+def generate(count):
+  lines = []
+  for i in range(count):
+    lines.append(f"# Inline comment {i} with \"quotes\" and #hashes")
+    lines.append(f"#- Block comment {i}\n   spanning lines -#")
+    lines.append(f"var v{i} = \"string # not a comment\" # trailing comment {i}")
+    lines.append("")
+  return "\n".join(lines) + "\n"
+
+
+# Main function
+def main(args):
+  # Parse the command-line arguments
+  argparser = argparse.ArgumentParser(description = "Measures the time to tokenize heavily commented scripts of increasing size")
+  argparser.add_argument('-n', '--count', type = int, default = 5000, help = "The amount of comment groups in the smallest script")
+  argparser.add_argument('-s', '--steps', type = int, default = 3, help = "The amount of times the script size is doubled")
+  args = argparser.parse_args(args)
+
+  # Tokenize scripts of doubling size; the time should roughly double with them
+  previous = None
+  for step in range(args.steps):
+    count = args.count * 2 ** step
+    string = generate(count)
+    start = time.perf_counter()
+    tokens = grammar.lexer.tokenize(string)
+    elapsed = time.perf_counter() - start
+    ratio = f" ({elapsed / previous:.1f}x the time of the previous size)" if previous else ""
+    print(f"{count * 3:,} comments, {string.count(chr(10)):,} lines: {len(tokens):,} tokens in {elapsed:.3f}s{ratio}")
+    previous = elapsed
+
+# Execute the main function if not imported
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,69 @@
+import argparse
+import csv
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest.mock
+
+from specie import interpreter, internals
+
+
+# Write a generated Rabobank export with the specified amount of rows, drawing the names, accounts and codes from small pools
+def generate(file_name, count, seed = 7):
+  random.seed(seed)
+  merchants = [f"MERCHANT {index:03d} BV" for index in range(400)]
+  accounts = [f"NL{random.randrange(10, 100)}BANK{random.randrange(10 ** 10):010d}" for _ in range(600)]
+  codes = ['ba', 'bc', 'ei', 'id']
+  words = "boodschappen week tanken trein bestelling huur energie verzekering abonnement salaris terugbetaling kado".split()
+
+  with open(file_name, 'w', newline = '', encoding = 'cp1252') as file:
+    writer = csv.writer(file, delimiter = ',', quotechar = '"', quoting = csv.QUOTE_ALL)
+    writer.writerow(["Volgnr", "Datum", "Munt", "Bedrag", "Naam tegenpartij", "Tegenrekening IBAN/BBAN", "Omschrijving-1", "Omschrijving-2", "Omschrijving-3", "Code"])
+    for index in range(count):
+      amount = f"{random.choice('+-')}{random.randrange(1, 100000) / 100:.2f}".replace('.', ',')
+      description = f"{random.choice(words).capitalize()} {random.choice(words)}"
+      writer.writerow([f"{2022000000 + index}", f"2022-{random.randrange(1, 13):02d}-{random.randrange(1, 29):02d}", "EUR", amount, random.choice(merchants), random.choice(accounts), description, f"ref {random.randrange(1000)}", "", random.choice(codes)])
+
+# Return the memory in MiB that is retained by the transactions parsed from a file, and the time it took to parse them
+def measure(file_name):
+  importer = internals.ObjRabobankImporter(interpreter.Interpreter())
+  gc.collect()
+  tracemalloc.start()
+  try:
+    start = time.perf_counter()
+    transactions = importer.parse(file_name, None)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] / 2 ** 20
+  finally:
+    tracemalloc.stop()
+  return len(transactions), retained, elapsed
+
+
+# Main function
+def main(args):
+  # Parse the command-line arguments
+  argparser = argparse.ArgumentParser(description = "Measures the memory retained by the transactions of a generated Rabobank export with and without interned strings")
+  argparser.add_argument('-n', '--count', type = int, default = 100000, help = "The amount of generated rows")
+  args = argparser.parse_args(args)
+
+  with tempfile.TemporaryDirectory() as directory:
+    file_name = os.path.join(directory, 'transactions.csv')
+    generate(file_name, args.count)
+    print(f"{args.count:,} rows, {os.path.getsize(file_name) / 2 ** 20:.1f} MiB")
+
+    # Parse the file with every string allocated separately, and with the categorical strings interned
+    with unittest.mock.patch.object(internals.ObjString, 'intern', classmethod(lambda cls, value: internals.ObjString(value.value if isinstance(value, internals.ObjString) else value))):
+      count, retained, elapsed = measure(file_name)
+    print(f"without interning: {retained:.1f} MiB retained by {count:,} transactions (parsed in {elapsed:.1f}s under tracemalloc)")
+
+    count, retained, elapsed = measure(file_name)
+    print(f"with interning: {retained:.1f} MiB retained by {count:,} transactions (parsed in {elapsed:.1f}s under tracemalloc)")
+
+# Execute the main function if not imported
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,46 @@
+import argparse
+import random
+import sys
+import time
+
+from specie import grammar, parser
+
+
+# Return a generated script with the specified amount of declarations, mixing the literals, operators and comments of the language
+def generate(count, seed = 7):
+  random.seed(seed)
+  lines = []
+  for i in range(count):
+    lines.append(f"# Function number {i} computes something")
+    lines.append(f"var f{i} = (a, b = {i}) -> if a > b then a * {i} + b - 3 else (a + b) * 2")
+    lines.append(f"#- block comment {i}\n   spanning lines -#")
+    lines.append(f"var r{i} = {{name: \"item {i}\", value: {i}.5, when: 2023-01-{(i % 28) + 1:02d}, tags: [1, 2, 3]}}")
+    lines.append(f"var q{i} = (xs) -> from t in xs where t.value > {random.randrange(1000)} and t.name =~ /item/i select t.value * 2 + 1")
+    lines.append(f"var s{i} = do\n  var local = f{i}(1, 2)\n  local + {i} # trailing comment\nend")
+  return "\n".join(lines) + "\n"
+
+
+# Main function
+def main(args):
+  # Parse the command-line arguments
+  argparser = argparse.ArgumentParser(description = "Measures the tokens per second of the lexer with and without first-character dispatch")
+  argparser.add_argument('-n', '--count', type = int, default = 1500, help = "The amount of generated declaration groups")
+  argparser.add_argument('-r', '--repeat', type = int, default = 3, help = "The amount of runs, of which the fastest is reported")
+  args = argparser.parse_args(args)
+
+  string = generate(args.count)
+  print(f"{len(string):,} characters, {string.count(chr(10)):,} lines")
+
+  # Tokenize the script with both lexers and report the fastest run
+  for compiled in (False, True):
+    lexer = parser.Lexer(grammar.rules, comment_inline = grammar.lexer.comment_inline, comment_block = grammar.lexer.comment_block, comment_ignore_pattern = grammar.lexer.comment_ignore_pattern, compiled = compiled)
+    timings = []
+    for _ in range(args.repeat):
+      start = time.perf_counter()
+      tokens = lexer.tokenize(string)
+      timings.append(time.perf_counter() - start)
+    print(f"{'compiled' if compiled else 'all rules'}: {len(tokens):,} tokens in {min(timings):.3f}s = {len(tokens) / min(timings):,.0f} tokens/s")
+
+# Execute the main function if not imported
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,73 @@
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+
+from specie import interpreter, internals
+
+
+# The queries on the descriptions of the transactions, which can be prefiltered by a trigram index
+queries = [
+  "from t in _ where t.description =~ /terugbetaling.*kado/i count",
+  "from t in _ where \"ref 4242\" in t.description count",
+  "from t in _ where t.description =~ /zorg ref 1234/ count",
+]
+
+# Return a table with the specified amount of transactions with generated descriptions
+def generate(count, seed = 7):
+  random.seed(seed)
+  words = "boodschappen week tanken trein bestelling huur energie verzekering abonnement salaris terugbetaling kado restaurant parkeren apotheek zorg belasting".split()
+
+  table = internals.ObjTable()
+  for index in range(count):
+    transaction = internals.ObjTransaction()
+    transaction.set_field('id', internals.ObjString(f"{index:09d}"))
+    transaction.set_field('description', internals.ObjString(f"{random.choice(words).capitalize()} {random.choice(words)} ref {random.randrange(100000)} {random.choice(words)}"))
+    table.insert(transaction)
+  return table
+
+# Return the result of a query and the time it took to execute it
+def measure(intp, query):
+  with contextlib.redirect_stdout(io.StringIO()):
+    start = time.perf_counter()
+    result = intp.execute(query)
+    return result, time.perf_counter() - start
+
+
+# Main function
+def main(args):
+  # Parse the command-line arguments
+  argparser = argparse.ArgumentParser(description = "Measures the time of substring and regex queries on generated descriptions with and without a trigram index")
+  argparser.add_argument('-n', '--count', type = int, default = 1000000, help = "The amount of generated rows")
+  args = argparser.parse_args(args)
+
+  start = time.perf_counter()
+  table = generate(args.count)
+  print(f"{args.count:,} rows generated in {time.perf_counter() - start:.1f}s")
+
+  intp = interpreter.Interpreter()
+  intp.globals['_'] = table
+
+  # Execute the queries by scanning the rows
+  scans = []
+  for query in queries:
+    result, elapsed = measure(intp, query)
+    scans.append(result)
+    print(f"scan: {elapsed:.3f}s, {result} rows for {query}")
+
+  # Build the trigram index and execute the queries again
+  start = time.perf_counter()
+  table.create_index('description', 'trigram').search('description', ['ref'])
+  print(f"index built in {time.perf_counter() - start:.1f}s")
+
+  for query, expected in zip(queries, scans):
+    result, elapsed = measure(intp, query)
+    if result != expected:
+      raise AssertionError(f"The index found {result} rows instead of {expected} for {query}")
+    print(f"index: {elapsed:.4f}s, {result} rows for {query}")
+
+# Execute the main function if not imported
+if __name__ == "__main__":
+  main(sys.argv[1:])
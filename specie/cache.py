@@ -0,0 +1,113 @@
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import zlib
+
+from . import grammar
+
+
+##################################################
+### Definition of the grammar version function ###
+##################################################
+
+# Return the source files of the package, which define the abstract syntax trees and the objects they contain
+def package_modules():
+  root = os.path.dirname(os.path.abspath(__file__))
+  for directory, directory_names, file_names in os.walk(root):
+    directory_names[:] = sorted(name for name in directory_names if name != '__pycache__')
+    for file_name in sorted(file_names):
+      if file_name.endswith('.py'):
+        yield os.path.relpath(os.path.join(directory, file_name), root).replace(os.sep, '/'), os.path.join(directory, file_name)
+
+# Return the version of the grammar, which changes when the Python version or the source of any module in the package changes
+def grammar_version():
+  digest = hashlib.sha256(sys.version.encode())
+  for module, file_name in package_modules():
+    with open(file_name, 'rb') as file:
+      digest.update(module.encode() + b'\0' + hashlib.sha256(file.read()).digest())
+  return digest.hexdigest()
+
+
+############################################
+### Definition of the module cache class ###
+############################################
+
+# Class that defines a cache of parsed modules, which is kept in memory and on disk
+class ModuleCache:
+  # The default directory to store the cached modules in
+  default_directory = os.environ.get('SPECIE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'specie'))
+
+  # Constructor
+  def __init__(self, directory = None):
+    self.directory = directory if directory is not None else self.default_directory
+    self.version = grammar_version()
+
+    # Define the map of cached modules by absolute file name
+    self.modules = {}
+
+  # Return the key of a file with the specified contents
+  def key(self, file_name, string):
+    return (self.version, os.path.getmtime(file_name), hashlib.sha256(string.encode()).hexdigest())
+
+  # Return the file name of the cached module of a file on disk
+  def cache_file_name(self, file_name):
+    return os.path.join(self.directory, hashlib.sha256(file_name.encode()).hexdigest() + '.ast')
+
+
+  # Parse the contents of a file into an abstract syntax tree, or return the cached tree if the file didn't change
+  def parse(self, file_name, string):
+    file_name = os.path.abspath(file_name)
+    key = self.key(file_name, string)
+
+    # Check if the module is cached in memory
+    if (cached := self.modules.get(file_name)) is not None and cached[0] == key:
+      return cached[1]
+
+    # Check if the module is cached on disk, otherwise parse the string and cache it on disk
+    if (module := self.load(file_name, key)) is None:
+      module = grammar.parse(string)
+      if module is None:
+        return None
+      self.store(file_name, key, module)
+
+    # Cache the module in memory and return it
+    self.modules[file_name] = (key, module)
+    return module
+
+  # Return if the status of a file or directory shows that it is owned by the current user and can't be written by
+  # other users, since unpickling a cached module that someone else planted would run their code
+  @staticmethod
+  def trusted(status):
+    if not hasattr(os, 'getuid'):
+      return True
+    return status.st_uid == os.getuid() and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+  # Load a cached module from disk, or return None if it's not cached, outdated or not trusted
+  def load(self, file_name, key):
+    try:
+      if not self.trusted(os.stat(self.directory)):
+        return None
+      with open(self.cache_file_name(file_name), 'rb') as file:
+        if not self.trusted(os.fstat(file.fileno())):
+          return None
+        cached_key, module = pickle.loads(zlib.decompress(file.read()))
+      return module if cached_key == key else None
+    except Exception:
+      return None
+
+  # Store a module on disk in a directory that only the current user can access, ignoring failures since caching is
+  # optional
+  def store(self, file_name, key, module):
+    cache_file_name = self.cache_file_name(file_name)
+    temp_file_name = f"{cache_file_name}.{os.getpid()}.tmp"
+    try:
+      os.makedirs(self.directory, mode = 0o700, exist_ok = True)
+      if not self.trusted(os.stat(self.directory)):
+        return
+      with os.fdopen(os.open(temp_file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+        file.write(zlib.compress(pickle.dumps((key, module), pickle.HIGHEST_PROTOCOL)))
+      os.replace(temp_file_name, cache_file_name)
+    except Exception:
+      pass
@@ -0,0 +1,444 @@
+import weakref
+
+from . import ast, internals
+
+
+#########################################
+### Definition of the operator tables ###
+#########################################
+
+# Table of binary operators, which map to the method to call on the left operand and if the result is converted to a bool
+binary_ops = {
+  '*': ('mul', None),
+  '/': ('div', None),
+  '+': ('add', None),
+  '-': ('sub', None),
+  '<': ('lt', 'bool'),
+  '<=': ('lte', 'bool'),
+  '>': ('gt', 'bool'),
+  '>=': ('gte', 'bool'),
+  '<=>': ('cmp', 'bool'),
+  '=~': ('match', 'bool'),
+  '!~': ('match', 'negate'),
+  '==': ('eq', 'bool'),
+  '!=': ('eq', 'negate'),
+}
+
+# Table of containment operators, which map to the method to call on the right operand and if the result is converted to a bool
+containment_ops = {
+  'in': ('contains', 'bool'),
+  '!in': ('contains', 'negate'),
+}
+
+
+##################################
+### Definition of the compiler ###
+##################################
+
+# Class that defines a compiler that compiles expressions to nested Python closures
+#
+# The closures evaluate the expression they are compiled from in the current environment of the interpreter,
+# with the same results as the interpreter itself, but the expression kind, operators, variable distances
+# and constants are resolved once when compiling instead of on every evaluation.
+class Compiler(ast.ExprVisitor[object]):
+  # Constructor
+  def __init__(self, interpreter):
+    self.interpreter = interpreter
+
+    # The map of compiled closures by expression, which only keeps the closures of expressions that are still in use,
+    # so the closures must not refer to the expression they are compiled from
+    self.closures = weakref.WeakKeyDictionary()
+
+
+  # Return the closure of an expression, compiling it if it isn't compiled yet
+  def compile(self, expr: ast.Expr):
+    if (closure := self.closures.get(expr)) is None:
+      closure = self.closures[expr] = expr.accept(self)
+    return closure
+
+  # Return a closure that evaluates a sequence of expressions in the specified environment
+  def compile_with(self, exprs):
+    interpreter = self.interpreter
+    closures = [self.compile(expr) for expr in exprs]
+
+    def evaluate_with(environment):
+      # Set the new environment
+      previous = interpreter.environment
+      interpreter.environment = environment
+
+      # Evaluate the expressions
+      result = None
+      for closure in closures:
+        result = closure()
+
+      # Reset the environment
+      interpreter.environment = previous
+
+      # Return the result
+      return result
+    return evaluate_with
+
+
+  # Compile a literal expression
+  def visit_literal_expr(self, expr: ast.LiteralExpr):
+    object = expr.object
+    return lambda: object
+
+  # Compile a list expression
+  def visit_list_expr(self, expr: ast.ListExpr):
+    items = [self.compile(item) for item in expr]
+    lazy_list = internals.ObjLazyList
+
+    def evaluate_list():
+      list_object = internals.ObjList()
+      for item in items:
+        # Evaluate the item, materializing it if it is a lazy list
+        value = item()
+        if type(value) is lazy_list:
+          value.materialize()
+        list_object.insert(value)
+      return list_object
+    return evaluate_list
+
+  # Compile a record expression
+  def visit_record_expr(self, expr: ast.RecordExpr):
+    fields = [(name.value, self.compile(value), name.location) for name, value in expr]
+    lazy_list = internals.ObjLazyList
+
+    def evaluate_record():
+      record_object = internals.ObjRecord()
+      for name, value, location in fields:
+        # Evaluate the value of the field, materializing it if it is a lazy list
+        field_value = value()
+        if type(field_value) is lazy_list:
+          field_value.materialize()
+        record_object.declare_field(name, field_value, location)
+      return record_object
+    return evaluate_record
+
+  # Compile a variable expression
+  def visit_variable_expr(self, expr: ast.VariableExpr):
+    interpreter = self.interpreter
+    name = expr.name
+
+    # Get the distance and slot of the local variable, or otherwise assume it's global
+    local = interpreter.locals.get(expr)
+    if local is not None:
+      distance, slot = local
+      return lambda: interpreter.environment.get_slot(name, distance, slot)
+    else:
+      return lambda: interpreter.globals.get_variable(name)
+
+  # Compile a grouping expression
+  def visit_grouping_expr(self, expr: ast.GroupingExpr):
+    return self.compile(expr.expression)
+
+  # Compile a call expression
+  def visit_call_expr(self, expr: ast.CallExpr):
+    expression = self.compile(expr.expression)
+    args = [self.compile(arg) for arg in expr.args]
+    target, location = expr.expression, expr.token.location
+    lazy_list = internals.ObjLazyList
+
+    def evaluate_call():
+      # Evaluate the expression
+      callable = expression()
+
+      # Check if the expression is callable
+      if not isinstance(callable, internals.ObjCallable):
+        raise internals.RuntimeException(f"The expression '{target}' is not callable", location)
+
+      # Evaluate the arguments, materializing the lazy lists among them
+      values = [arg() for arg in args]
+      for value in values:
+        if type(value) is lazy_list:
+          value.materialize()
+
+      # Validate the arguments and call the callable
+      return callable(*callable.parameters().validate(values))
+    return evaluate_call
+
+  # Compile a get expression
+  def visit_get_expr(self, expr: ast.GetExpr):
+    expression = self.compile(expr.expression)
+    name = expr.name.value
+    target, location = expr.expression, expr.token.location
+
+    # Cache of the shape of the last evaluated record and its field with the name, or None if it has no such field
+    cache = [None, None]
+
+    def evaluate_get():
+      # Evaluate the expression
+      object = expression()
+
+      # Return the field of the record, looking it up only if the shape of the record changed
+      if isinstance(object, internals.ObjRecord):
+        if object.shape is not cache[0]:
+          cache[0] = object.shape
+          cache[1] = object.shape.fields.get(name)
+        if (field := cache[1]) is not None:
+          return field.get(object)
+
+      # Return the method of the object
+      if object.has_method(name):
+        return object.get_method(name)
+
+      # Nothing found to get
+      raise internals.RuntimeException(f"The expression '{target}' is either not a record or the specified field or method is undefined", location)
+    return evaluate_get
+
+  # Compile a set expression
+  def visit_set_expr(self, expr: ast.SetExpr):
+    expression = self.compile(expr.expression)
+    value = self.compile(expr.value)
+    name = expr.name.value
+    target, location = expr.expression, expr.token.location
+    lazy_list = internals.ObjLazyList
+
+    def evaluate_set():
+      # Evaluate the expression
+      object = expression()
+
+      # Check if the object is a record
+      if not isinstance(object, internals.ObjRecord):
+        raise internals.RuntimeException(f"The expression '{target}' is not a record", location)
+
+      # Evaluate the value, set the field of the record and return the value
+      set_value = value()
+      if type(set_value) is lazy_list:
+        set_value.materialize()
+      object.set_field(name, set_value)
+      return set_value
+    return evaluate_set
+
+  # Compile a unary operator expression
+  def visit_unary_op_expr(self, expr: ast.UnaryOpExpr):
+    op, location = expr.op.value, expr.op.location
+    expression = self.compile(expr.expression)
+
+    # Logic operations
+    if op == 'not':
+      return lambda: internals.ObjBool(not bool(expression()))
+
+    # No matching operation found
+    def evaluate_undefined():
+      raise internals.RuntimeException("Undefined unary operator '{}'".format(op), location)
+    return evaluate_undefined
+
+  # Compile a binary operator expression
+  def visit_binary_op_expr(self, expr: ast.BinaryOpExpr):
+    op, location = expr.op.value, expr.op.location
+    left = self.compile(expr.left)
+    right = self.compile(expr.right)
+
+    # Arithmetic, comparison and equality operations
+    if op in binary_ops:
+      method, conversion = binary_ops[op]
+      if conversion is None:
+        return lambda: left().call_method(method, right())
+      elif conversion == 'bool':
+        return lambda: left().call_method(method, right()).method_asBool()
+      else:
+        return lambda: left().call_method(method, right()).method_asBool().negate()
+
+    # Containment operations
+    elif op in containment_ops:
+      method, conversion = containment_ops[op]
+
+      def evaluate_containment():
+        left_value = left()
+        result = right().call_method(method, left_value).method_asBool()
+        return result if conversion == 'bool' else result.negate()
+      return evaluate_containment
+
+    # No matching operation found
+    def evaluate_undefined():
+      left()
+      right()
+      raise internals.RuntimeException("Undefined binary operator '{}'".format(op), location)
+    return evaluate_undefined
+
+  # Compile a logical expression
+  def visit_logical_expr(self, expr: ast.LogicalExpr):
+    op, location = expr.op.value, expr.op.location
+    left = self.compile(expr.left)
+    right = self.compile(expr.right)
+
+    # Logical and, which short-circuits on the canonical false object
+    if op == 'and':
+      false = internals.ObjBool.false
+      return lambda: false if internals.ObjBool(left()) is false else internals.ObjBool(right())
+
+    # Logical or, which short-circuits on the canonical true object
+    elif op == 'or':
+      true = internals.ObjBool.true
+      return lambda: true if internals.ObjBool(left()) is true else internals.ObjBool(right())
+
+    # No matching operation found
+    def evaluate_undefined():
+      raise internals.RuntimeException("Undefined binary operator '{}'".format(op), location)
+    return evaluate_undefined
+
+  # Compile an if expression
+  def visit_if_expr(self, expr: ast.IfExpr):
+    condition = self.compile(expr.condition)
+    then_clause = self.compile(expr.then_clause)
+    else_clause = self.compile(expr.else_clause) if expr.else_clause is not None else None
+    true, false = internals.ObjBool.true, internals.ObjBool.false
+
+    def evaluate_if():
+      # Evaluate the condition and the matching clause, or return null if there is no else clause
+      if (result := condition()) is true or (result is not false and result):
+        return then_clause()
+      elif else_clause is not None:
+        return else_clause()
+      else:
+        return internals.ObjNull()
+    return evaluate_if
+
+  # Compile a for expression
+  def visit_for_expr(self, expr: ast.ForExpr):
+    interpreter = self.interpreter
+    iterable_closure = self.compile(expr.iterable)
+    body = self.compile_with([expr.body])
+    variable = expr.variable.name
+
+    def evaluate_for():
+      # Evaluate the iterable
+      iterable = iterable_closure()
+
+      # Check if the expression is iterable
+      if not isinstance(iterable, (internals.ObjIterable, internals.ObjIterator)):
+        raise internals.InvalidTypeException(f"{iterable} is not iterable")
+
+      # Create a list to store the results
+      results = internals.ObjList()
+
+      # Iterate over the iterable and evaluate the body with the capture variable
+      iterator = iter(iterable) if isinstance(iterable, internals.ObjIterable) else iterable
+      iterator.rewind()
+      while iterator.advance():
+        capture = interpreter.environment.nested()
+        capture.declare_variable(variable, iterator.current())
+        results.insert(body(capture))
+
+      # Return the results
+      return results
+    return evaluate_for
+
+  # Compile a query expression
+  def visit_query_expr(self, expr: ast.QueryExpr):
+    interpreter = self.interpreter
+    iterable_closure = self.compile(expr.iterable)
+    function = expr.function
+    variable = expr.variable.name.value
+
+    def evaluate_query():
+      # Evaluate the iterable
+      iterable = iterable_closure()
+
+      # Check if the expression is traversable
+      if not isinstance(iterable, internals.ObjIterable):
+        raise internals.InvalidTypeException(f"{iterable} is not iterable")
+
+      # Evaluate the function
+      return interpreter.query_result(function, variable, iterable)
+    return evaluate_query
+
+  # Compile a function expression
+  def visit_function_expr(self, expr: ast.FunctionExpr):
+    interpreter = self.interpreter
+    params = [(param.name.value, param.variadic, self.compile(param.default) if param.default is not None else None) for param in expr.params]
+    body = expr.body
+
+    # Evaluate the parameters
+    def evaluate_parameters():
+      for name, variadic, default in params:
+        # Check for variadic parameters
+        if variadic:
+          yield internals.Parameter(name, internals.Obj, internals.ParameterVariadic)
+
+        # Check for optional parameters
+        elif default is not None:
+          yield internals.Parameter(name, internals.Obj, default())
+
+        # Must be a required parameter
+        else:
+          yield internals.Parameter(name, internals.Obj)
+
+    # Return the function object
+    return lambda: internals.ObjFunction(interpreter, internals.Parameters(*evaluate_parameters()), body, interpreter.environment)
+
+  # Compile an assignment expression
+  def visit_assignment_expr(self, expr: ast.AssignmentExpr):
+    interpreter = self.interpreter
+    value_closure = self.compile(expr.value)
+    name = expr.name
+    lazy_list = internals.ObjLazyList
+
+    # Get the distance and slot of the local variable, or otherwise assume it's global
+    local = interpreter.locals.get(expr)
+
+    def evaluate_assignment():
+      # Evaluate the value, materializing it if it is a lazy list
+      value = value_closure()
+      if type(value) is lazy_list:
+        value.materialize()
+
+      # Set the local variable, or otherwise the global variable
+      if local is not None:
+        if interpreter.environment.has_slot(name, *local):
+          interpreter.environment.set_slot(name, value, *local)
+        else:
+          raise internals.RuntimeException(f"Variable '{name.value}' does not exist in the current scope", name.location)
+      else:
+        if interpreter.globals.has_variable(name):
+          interpreter.globals.set_variable(name, value)
+        else:
+          raise internals.RuntimeException(f"Variable '{name.value}' does not exist in the current scope", name.location)
+
+      # Return the value
+      return value
+    return evaluate_assignment
+
+  # Compile a declaration expression
+  def visit_declaration_expr(self, expr: ast.DeclarationExpr):
+    interpreter = self.interpreter
+    value_closure = self.compile(expr.value)
+    name = expr.name
+    lazy_list = internals.ObjLazyList
+
+    # Get the slot of the local variable, or otherwise declare it by name
+    slot = interpreter.locals.get(expr)
+
+    def evaluate_declaration():
+      # Evaluate the value, materializing it if it is a lazy list
+      value = value_closure()
+      if type(value) is lazy_list:
+        value.materialize()
+
+      # Declare the value and return it
+      if slot is None and not interpreter.environment.has_variable(name):
+        interpreter.environment.declare_variable(name, value)
+      elif slot is not None and not interpreter.environment.has_slot(name, 0, slot):
+        interpreter.environment.declare_slot(name, value, slot)
+      else:
+        raise internals.RuntimeException(f"Variable '{name.value}' already exists in the current scope", name.location)
+      return value
+    return evaluate_declaration
+
+  # Compile a block expression
+  def visit_block_expr(self, expr: ast.BlockExpr):
+    interpreter = self.interpreter
+    expressions = self.compile_with(expr.expressions)
+
+    # Evaluate the sub-expressions in an environment relative to the CURRENT environment
+    return lambda: expressions(interpreter.environment.nested())
+
+  # Compile a module expression
+  def visit_module_expr(self, expr: ast.ModuleExpr):
+    interpreter = self.interpreter
+    expressions = self.compile_with(expr.expressions)
+
+    # Evaluate the sub-expressions in an environment relative to the GLOBAL environment
+    return lambda: expressions(interpreter.globals.nested())
@@ -99,6 +99,9 @@ rules = [
   parser.Rule('identifier', r'[A-Za-z_][A-Za-z0-9_]*')
 ]
 
+# Lexer that tokenizes using the token rules
+lexer = parser.Lexer(rules, comment_inline = '#', comment_block = ('#-', '-#'), comment_ignore_pattern = r'"((?:[^"\\]|\\.)*)"')
+
 
 #############################################
 ### Definition of parser helper functions ###
@@ -282,24 +285,24 @@ expr = parser.describe('expr', parser.synchronize(declaration, 'newline'))
 # Modules
 module = parser.describe('module', parser.map(ast.ModuleExpr, expr * parser.token('newline')))
 
+# Compile the grammar to dispatch alternatives on the next token and to fuse sequences
+parser.compile_grammar(module, expr)
+
 
 ######################################
 ### Definition of parser functions ###
 ######################################
 
 # Parse an input string to an abstract syntax tree
-def parse(string, is_module = True):
-  # Create the lexer
-  lexer = parser.Lexer(rules, comment_inline = '#', comment_block = ('#-', '-#'), comment_ignore_pattern = r'"((?:[^"\\]|\\.)*)"')
-
+def parse(string, is_module = True, packrat = True):
   # Parse the inout string to a list of tokens
   tokens = lexer.tokenize(string)
 
   # Parse the list of tokens to an abstract syntax tree
   if is_module:
-    result = module.parse_strict(tokens, 0)
+    result = module.parse_strict(tokens, 0, packrat)
   else:
-    result = expr.parse_strict(tokens, 0)
+    result = expr.parse_strict(tokens, 0, packrat)
 
   # Check the result
   if result:
@@ -15,13 +15,14 @@ from .object import (Obj, ObjNull, ObjBool, ObjNumber, ObjInt, ObjFloat,
 # Import objects
 from .object_callable import ObjCallable, ObjPartialCallable, ObjPyCallable
 from .object_function import ObjFunction
-from .object_iterable import ObjIterable, ObjDelegatedIterable, ObjIterator
-from .object_list import ObjList, ObjListIterator
-from .object_record import FieldOptions, Field, ObjRecord
+from .object_iterable import ObjIterable, ObjDelegatedIterable, ObjOrderedIterable, ObjIterator
+from .object_list import ObjList, ObjListIterator, ObjLazyList, ObjLazyListIterator
+from .object_record import FieldOptions, Field, ValueField, Shape, ObjRecord
 from .object_map import ObjMap, ObjMapElement, ObjMapIterator
 from .object_date import ObjDate
 from .object_money import ObjMoney
 from .object_transaction import ObjTransaction
+from .object_table import ObjTable, ObjTransactionRow, create_index
 from .object_importer import ObjImporter
 from .object_importer_rabobank import ObjRabobankImporter
 from .object_importer_n26 import ObjN26Importer
@@ -4,6 +4,12 @@ import inspect
 import re
 import sys
 import types
+import weakref
+
+try:
+  from re import _parser as regex_parser
+except ImportError:
+  import sre_parse as regex_parser
 
 from .parameters import Parameter, ParameterRequired, ParameterVariadic, Parameters
 from .errors import RuntimeException, InvalidOperationException, InvalidTypeException, UndefinedMethodException, UndefinedIndexException
@@ -19,10 +25,15 @@ class Method:
     self.cls = cls
     self.func = func
 
+  # Return the callable of the method, which is created once when the method is first resolved
+  @functools.cached_property
+  def callable(self):
+    from .object_callable import ObjPyCallable
+    return ObjPyCallable(self.func, self.cls)
+
   # Resolve the method to a callable
   def create_callable(self, this_arg):
-    from .object_callable import ObjPyCallable
-    return ObjPyCallable(self.func, self.cls).partial(this_arg)
+    return self.callable.partial(this_arg)
 
 
 ###########################################
@@ -139,14 +150,14 @@ class Obj(metaclass = ObjMeta, typename = "Object"):
 ###########################################
 
 class ObjNull(Obj, typename = "Null"):
-  # Constructor
-  def __init__(self):
-    super().__init__()
+  # Return the canonical null object instead of creating a new one
+  def __new__(cls):
+    return ObjNull.null
 
 
   # Return if this null object is equal to another object
   def __eq__(self, other):
-    return isinstance(other, ObjNull)
+    return other is self
 
   def method_eq(self, other: 'Obj') -> 'ObjBool':
     return ObjBool(self.__eq__(other))
@@ -173,31 +184,32 @@ class ObjNull(Obj, typename = "Null"):
     return ObjInt(self.__hash__())
 
 
+  # Return the arguments to reconstruct this null object when pickling
+  def __reduce__(self):
+    return (ObjNull, ())
+
+
+# Create the canonical null object, bypassing the constructor that returns it
+ObjNull.null = object.__new__(ObjNull)
+
+
 ###########################################
 ### Definition of the bool object class ###
 ###########################################
 
 class ObjBool(Obj, typename = "Bool"):
-  # Constructor
-  def __init__(self, value: 'ObjBool, ObjString') -> 'ObjBool':
-    super().__init__()
-
+  # Return the canonical bool object for a value instead of creating a new one
+  def __new__(cls, value: 'ObjBool, ObjString') -> 'ObjBool':
     if isinstance(value, ObjBool):
-      self.value = value.value
-    elif isinstance(value, ObjString):
-      if value.value == "false":
-        self.value = False
-      elif value.value == "true":
-        self.value = True
-      else:
-        raise ValueError(f"Unexpected native type {value.__class__.__name__} with value {value!r}")
+      return value
     elif isinstance(value, bool):
-      self.value = value
-    elif isinstance(value, str):
-      if value == "false":
-        self.value = False
-      elif value == "true":
-        self.value = True
+      return ObjBool.true if value else ObjBool.false
+    elif isinstance(value, (ObjString, str)):
+      string = value.value if isinstance(value, ObjString) else value
+      if string == "false":
+        return ObjBool.false
+      elif string == "true":
+        return ObjBool.true
       else:
         raise ValueError(f"Unexpected native type {value.__class__.__name__} with value {value!r}")
     else:
@@ -210,7 +222,7 @@ class ObjBool(Obj, typename = "Bool"):
 
   # Return if this bool object is equal to another object
   def __eq__(self, other):
-    return isinstance(other, ObjBool) and self.value == other.value
+    return other is self
 
   def method_eq(self, other: 'Obj') -> 'ObjBool':
     return ObjBool(self.__eq__(other))
@@ -237,11 +249,22 @@ class ObjBool(Obj, typename = "Bool"):
     return ObjInt(self.__hash__())
 
 
+  # Return the arguments to reconstruct this bool object when pickling
+  def __reduce__(self):
+    return (ObjBool, (self.value,))
+
   # Return the Python representation of this object
   def __repr__(self):
     return f"{self.__class__.__name__}({self.value!r})"
 
 
+# Create the canonical bool objects, bypassing the constructor that returns them
+ObjBool.false = object.__new__(ObjBool)
+ObjBool.false.value = False
+ObjBool.true = object.__new__(ObjBool)
+ObjBool.true.value = True
+
+
 #############################################
 ### Definition of the number object class ###
 #############################################
@@ -359,11 +382,25 @@ class ObjNumber(Obj, typename = "Number"):
 ##########################################
 
 class ObjInt(ObjNumber, typename = "Int"):
+  # The range of native values for which int objects are cached
+  cache_range = range(-128, 1024)
+
+  # The map of cached int objects by native value
+  cache = {}
+
+  # Return the cached int object for a small native value, or create a new int object
+  def __new__(cls, value: 'ObjInt, ObjFloat, ObjString' = 0) -> 'ObjInt':
+    if type(value) is int and value in ObjInt.cache_range:
+      if (instance := ObjInt.cache.get(value)) is None:
+        instance = ObjInt.cache[value] = super().__new__(cls)
+      return instance
+    return super().__new__(cls)
+
   # Constructor
   def __init__(self, value: 'ObjInt, ObjFloat, ObjString' = 0) -> 'ObjInt':
-    super().__init__()
-
-    if isinstance(value, ObjInt):
+    if type(value) is int:
+      self.value = value
+    elif isinstance(value, ObjInt):
       self.value = value.value
     elif isinstance(value, ObjFloat):
       self.value = int(value.value)
@@ -441,6 +478,11 @@ class ObjInt(ObjNumber, typename = "Int"):
     return self.value
 
 
+  # Return the arguments to reconstruct this int object when pickling, which keeps the cached int objects intact
+  def __reduce__(self):
+    return (ObjInt, (self.value,))
+
+
 ############################################
 ### Definition of the float object class ###
 ############################################
@@ -531,6 +573,9 @@ class ObjFloat(ObjNumber, typename = "Float"):
 
 # Class that defines a string object
 class ObjString(Obj, typename = "String"):
+  # The pool of interned string objects by value, which only keeps string objects that are still in use
+  pool = weakref.WeakValueDictionary()
+
   # Constructor
   def __init__(self, value: 'Obj' = "") -> 'ObjString':
     super().__init__()
@@ -544,10 +589,18 @@ class ObjString(Obj, typename = "String"):
     else:
       raise TypeError(f"Unexpected native type {value.__class__.__name__}")
 
+  # Return the interned string object for a value, so that identical values share one object
+  @classmethod
+  def intern(cls, value):
+    value = value.value if isinstance(value, ObjString) else value
+    if (string := ObjString.pool.get(value)) is None:
+      string = ObjString.pool[value] = ObjString(sys.intern(value))
+    return string
+
 
   # Return if this string object is equal to another object
   def __eq__(self, other):
-    return isinstance(other, ObjString) and self.value == other.value
+    return self is other or (isinstance(other, ObjString) and self.value == other.value)
 
   def method_eq(self, other: 'Obj') -> 'ObjBool':
     return ObjBool(self.__eq__(other))
@@ -732,6 +785,36 @@ class ObjRegex(Obj, typename = "Regex"):
   def method_flags(self) -> 'ObjString':
     return ObjString(self.flags())
 
+  # Return the literal strings that every match of this regex object contains; literals of a case-insensitive
+  # regex only contain ASCII characters, since other characters can match characters that are cased differently
+  def literals(self):
+    parsed = regex_parser.parse(self.pattern.pattern, self.pattern.flags)
+    ignore_case = parsed.state.flags & re.IGNORECASE
+    literals, run = [], []
+
+    # Add the run of consecutive literal characters as a literal
+    def end_run():
+      if run:
+        literals.append(''.join(run))
+        run.clear()
+
+    # Add the literals of a sequence of parsed items
+    def add_literals(items):
+      for op, arg in items:
+        if op == regex_parser.LITERAL and (not ignore_case or arg < 128):
+          run.append(chr(arg))
+        elif op == regex_parser.SUBPATTERN and not arg[1] and not arg[2]:
+          add_literals(arg[3])
+        else:
+          end_run()
+          if op in (regex_parser.MAX_REPEAT, regex_parser.MIN_REPEAT) and arg[0] >= 1:
+            add_literals(arg[2])
+            end_run()
+
+    add_literals(parsed)
+    end_run()
+    return literals
+
 
   # Return the Python representation of this object
   def __repr__(self):
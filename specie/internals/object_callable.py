@@ -18,6 +18,10 @@ class ObjCallable(Obj, typename = "Callable"):
   def parameters(self):
     raise NotImplementedError()
 
+  # Return the parameters of the callable with the specified amount of first parameters substituted
+  def partial_parameters(self, count):
+    return self.parameters()[count:]
+
   # Return the result of calling the callable
   def __call__(self, *args):
     raise NotImplementedError()
@@ -58,7 +62,7 @@ class ObjPartialCallable(ObjCallable, typename = "PartialCallable"):
 
   # Return the parameters of the callable
   def parameters(self):
-    return self.callable.parameters()[len(self.args):]
+    return self.callable.partial_parameters(len(self.args))
 
   # Call the callable
   def __call__(self, *args):
@@ -88,21 +92,30 @@ class ObjPyCallable(ObjCallable, typename = "PyCallable"):
     super().__init__()
     self.function = function
     self.params = Parameters.from_callable(self.function, self_type)
+    self.variadic = self.params.has_variadic()
+
+    # Define the map of parameters with the first parameters substituted by count
+    self.partial_params = {}
 
   # Return the parameters of the callable
   def parameters(self):
     return self.params
 
+  # Return the parameters of the callable with the specified amount of first parameters substituted
+  def partial_parameters(self, count):
+    if (params := self.partial_params.get(count)) is None:
+      params = self.partial_params[count] = self.params[count:]
+    return params
+
   # Return the result of calling the callable
   def __call__(self, *args):
-    def get_args():
-      for param, arg in zip(self.params, args):
-        if param.is_variadic():
-          yield from arg
-        else:
-          yield arg
-
-    return self.function(*get_args())
+    params_length = len(self.params)
+
+    # Unpack the argument of the last variadic parameter
+    if self.variadic and len(args) >= params_length:
+      return self.function(*args[:params_length - 1], *args[params_length - 1])
+    else:
+      return self.function(*args[:params_length])
 
 
   # Return the Python representation for this object
@@ -1,49 +1,83 @@
-from datetime import datetime, date, timedelta
+import functools
+
+from datetime import datetime, date
 
 from .object import Obj, ObjBool, ObjInt, ObjString
 from .object_record import ObjRecord
-from .errors import InvalidOperationException
+from .errors import RuntimeException, InvalidOperationException, InvalidTypeException
 
 
 ###########################################
 ### Definition of the date object class ###
 ###########################################
 
+# Class that defines a date, which is stored as a proleptic Gregorian ordinal
+#
+# The year, month and day of date objects are exposed as delegate fields of a shape that is shared between all
+# date objects, and are only computed when they are read.
 class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
+  # The ordinal of the date object
+  __slots__ = ('ordinal',)
+
   # The date format to use when parsing a string date
   format = "%Y-%m-%d"
 
   # Constructor
   def __init__(self, value: 'ObjDate, ObjString' = date.today()) -> 'ObjDate':
-    super().__init__()
-
     if isinstance(value, ObjDate):
-      self.value = value.value
+      ordinal = value.ordinal
     elif isinstance(value, ObjString):
-      try:
-        self.value = datetime.strptime(value.value, self.format).date()
-      except ValueError:
-        raise RuntimeException(f"Invalid date literal {value}")
+      ordinal = ObjDate.parse(value.value)
     elif isinstance(value, datetime):
-      self.value = value.date()
+      ordinal = value.date().toordinal()
     elif isinstance(value, date):
-      self.value = value
+      ordinal = value.toordinal()
     elif isinstance(value, str):
-      try:
-        self.value = datetime.strptime(value, self.format).date()
-      except ValueError:
-        raise RuntimeException(f"Invalid date literal {value}")
+      ordinal = ObjDate.parse(value)
     else:
       raise TypeError(f"Unexpected native type {value.__class__.__name__}")
 
-    self.declare_delegate('year', lambda self: ObjInt(self.value.year))
-    self.declare_delegate('month', lambda self: ObjInt(self.value.month))
-    self.declare_delegate('day', lambda self: ObjInt(self.value.day))
+    super(ObjRecord, self).__setattr__('ordinal', ordinal)
+
+  # Create a date object with the specified ordinal
+  @classmethod
+  def from_ordinal(cls, ordinal):
+    instance = cls.__new__(cls)
+    super(ObjRecord, instance).__setattr__('ordinal', ordinal)
+    return instance
+
+  # Return the ordinal of a string date, which is cached since the same dates are parsed over and over again
+  @staticmethod
+  @functools.lru_cache(maxsize = 4096)
+  def parse(string):
+    try:
+      return datetime.strptime(string, ObjDate.format).toordinal()
+    except ValueError:
+      raise RuntimeException(f"Invalid date literal {string}")
+
+  # Return the native date of this date object
+  @property
+  def value(self):
+    return date.fromordinal(self.ordinal)
+
+  # Return the year, month and day of this date object, which are shared between date objects as field getters
+  def get_year(self):
+    return ObjInt(self.value.year)
+
+  def get_month(self):
+    return ObjInt(self.value.month)
+
+  def get_day(self):
+    return ObjInt(self.value.day)
+
+  # The shape of all date objects
+  shape = ObjRecord.empty_shape.with_delegate_field('year', get_year).with_delegate_field('month', get_month).with_delegate_field('day', get_day)
+  values = ()
 
 
   # Return if this date object is equal to another date object
   def __eq__(self, other):
-    return isinstance(other, ObjDate) and self.value == other.value
+    return isinstance(other, ObjDate) and self.ordinal == other.ordinal
 
   def method_eq(self, other: 'Obj') -> 'ObjBool':
     return ObjBool(self.__eq__(other))
@@ -57,7 +91,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
 
   # Return the hash of this object
   def __hash__(self):
-    return hash(self.value)
+    return hash(self.ordinal)
 
   def method_asHash(self) -> 'ObjInt':
     return ObjInt(self.__hash__())
@@ -83,7 +117,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
   # Compare this date object with another object
   def __lt__(self, other):
     if isinstance(other, ObjDate):
-      return self.value < other.value
+      return self.ordinal < other.ordinal
     return NotImplemented
 
   def method_lt(self, other: 'ObjDate') -> 'ObjBool':
@@ -93,7 +127,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
 
   def __le__(self, other):
     if isinstance(other, ObjDate):
-      return self.value <= other.value
+      return self.ordinal <= other.ordinal
     return NotImplemented
 
   def method_lte(self, other: 'ObjDate') -> 'ObjBool':
@@ -103,7 +137,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
 
   def __gt__(self, other):
     if isinstance(other, ObjDate):
-      return self.value > other.value
+      return self.ordinal > other.ordinal
     return NotImplemented
 
   def method_gt(self, other: 'ObjDate') -> 'ObjBool':
@@ -113,7 +147,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
 
   def __ge__(self, other):
     if isinstance(other, ObjDate):
-      return self.value >= other.value
+      return self.ordinal >= other.ordinal
     return NotImplemented
 
   def method_gte(self, other: 'ObjDate') -> 'ObjBool':
@@ -133,7 +167,7 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
   # Return this date with a specified amount of days added
   def __add__(self, other):
     if isinstance(other, ObjInt):
-      return ObjDate(self.value + timedelta(days = other.value))
+      return ObjDate.from_ordinal(self.ordinal + other.value)
     return NotImplemented
 
   def method_add(self, other: 'ObjInt') -> 'ObjDate':
@@ -144,9 +178,9 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
   # Return this date with a specified amount of days subtracted
   def __sub__(self, other):
     if isinstance(other, ObjInt):
-      return ObjDate(self.value - timedelta(days = other.value))
+      return ObjDate.from_ordinal(self.ordinal - other.value)
     elif isinstance(other, ObjDate):
-      return ObjInt(self.value - other.value.days)
+      return ObjInt(self.ordinal - other.ordinal)
     return NotImplemented
 
   def method_sub(self, other: 'ObjInt, ObjDate') -> 'ObjDate, ObjInt':
@@ -155,6 +189,10 @@ class ObjDate(ObjRecord, typename = 'Date', prettyprint = False):
     raise InvalidOperationException(f"Operation 'lt' does not support operands of type {self.__class__} and {other.__class__}")
 
 
+  # Return the arguments to reconstruct this date object when pickling
+  def __reduce__(self):
+    return (ObjDate.from_ordinal, (self.ordinal,))
+
   # Return the Python representation for this object
   def __repr__(self):
     return f"{self.__class__.__name__}({self.value!r})"
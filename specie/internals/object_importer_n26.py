@@ -1,6 +1,5 @@
 import csv
 import codecs
-import datetime
 import re
 
 from .object import Obj, ObjBool, ObjInt, ObjFloat, ObjString
@@ -45,11 +44,11 @@ class ObjN26Importer(ObjImporter, typename = "N26Importer"):
 
     # Standard fields
     transaction.id = ObjString(f"n26:{source}:{id:06d}")
-    transaction.source = ObjString(source)
-    transaction.date = ObjDate(datetime.datetime.strptime(record['Date'], '%Y-%m-%d'))
-    transaction.amount = ObjMoney(ObjString("EUR"), ObjFloat(record['Amount (EUR)']))
-    transaction.name = ObjString(record['Payee'].upper())
-    transaction.address = ObjString(record['Account number'])
+    transaction.source = ObjString.intern(source)
+    transaction.date = ObjDate(record['Date'])
+    transaction.amount = ObjMoney(ObjString.intern("EUR"), ObjString(record['Amount (EUR)']))
+    transaction.name = ObjString.intern(record['Payee'].upper())
+    transaction.address = ObjString.intern(record['Account number'])
     transaction.description = ObjString(record['Payment reference'])
 
     return transaction
@@ -76,15 +76,15 @@ class ObjPayPalImporter(ObjImporter, typename = "PayPalImporter"):
 
     # Standard fields
     transaction.id = ObjString(f"paypal:{source}:{id:06d}:{record['Transactiereferentie']}")
-    transaction.source = ObjString(source)
+    transaction.source = ObjString.intern(source)
     transaction.date = ObjDate(timestamp)
-    transaction.amount = ObjMoney(ObjString(record['Valuta']), ObjFloat(record['Net'].replace('.', '').replace(',','.')))
-    transaction.name = ObjString(record['Naam'].upper())
-    transaction.address = ObjString(record['Naar e-mailadres'].lower() if transaction.amount.value < ObjFloat(0.0) else record['Van e-mailadres'].lower())
+    transaction.amount = ObjMoney(ObjString.intern(record['Valuta']), ObjString(record['Net'].replace('.', '').replace(',','.')))
+    transaction.name = ObjString.intern(record['Naam'].upper())
+    transaction.address = ObjString.intern(record['Naar e-mailadres'].lower() if transaction.amount.value < ObjFloat(0.0) else record['Van e-mailadres'].lower())
     transaction.description = ObjString(record['Item Title'] or record['Note'])
 
     # Extension fields
-    transaction.declare_field('type', ObjString(record['Type']), public = False)
+    transaction.declare_field('type', ObjString.intern(record['Type']), public = False)
     transaction.declare_field('timestamp', ObjFloat(timestamp.timestamp()), public = False)
 
     return transaction
@@ -1,6 +1,5 @@
 import csv
 import codecs
-import datetime
 import re
 
 from .object import Obj, ObjBool, ObjInt, ObjFloat, ObjString
@@ -45,14 +44,14 @@ class ObjRabobankImporter(ObjImporter, typename = "RabobankImporter"):
 
     # Standard fields
     transaction.id = ObjString(f"rabobank:{record['Volgnr']}")
-    transaction.source = ObjString(source)
-    transaction.date = ObjDate(datetime.datetime.strptime(record['Datum'], '%Y-%m-%d'))
-    transaction.amount = ObjMoney(ObjString(record['Munt']), ObjFloat(record['Bedrag'].replace(',', '.')))
-    transaction.name = ObjString(record['Naam tegenpartij'].upper())
-    transaction.address = ObjString(record['Tegenrekening IBAN/BBAN'])
+    transaction.source = ObjString.intern(source)
+    transaction.date = ObjDate(record['Datum'])
+    transaction.amount = ObjMoney(ObjString.intern(record['Munt']), ObjString(record['Bedrag'].replace(',', '.')))
+    transaction.name = ObjString.intern(record['Naam tegenpartij'].upper())
+    transaction.address = ObjString.intern(record['Tegenrekening IBAN/BBAN'])
     transaction.description = ObjString(re.sub('\s+', ' ', ' '.join([record['Omschrijving-1'], record['Omschrijving-2'], record['Omschrijving-3']]).strip()))
 
     # Extension fields
-    transaction.declare_field('type', ObjString(record['Code']), public = False)
+    transaction.declare_field('type', ObjString.intern(record['Code']), public = False)
 
     return transaction
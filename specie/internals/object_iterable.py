@@ -1,6 +1,12 @@
-from .object import Obj, ObjNull, ObjBool, ObjInt, ObjString
+import heapq
+import operator
+
+from .object import Obj, ObjNull, ObjBool, ObjInt, ObjFloat, ObjString
 from .object_callable import ObjPyCallable
-from .errors import RuntimeException
+from .object_date import ObjDate
+from .object_money import ObjMoney
+from .object_record import ObjRecord
+from .errors import RuntimeException, InvalidOperationException, InvalidStateException
 
 
 ###############################################
@@ -28,12 +34,13 @@ class ObjIterable(Obj, typename = "Iterable"):
   def method_select(self, function: 'ObjCallable') -> 'ObjIterable':
     return self.select(function)
 
-  # Return an iterable with the distinct elements from this iterable
-  def distinct(self):
-    return ObjDistinctIterator(iter(self)).delegate()
+  # Return an iterable with the distinct elements from this iterable, or the first element for each distinct key if a
+  # key function is specified
+  def distinct(self, key = ObjNull()):
+    return ObjDistinctIterator(iter(self), key if key is not ObjNull() else None).delegate()
 
-  def method_distinct(self) -> 'ObjIterable':
-    return self.distinct()
+  def method_distinct(self, key: 'ObjCallable' = ObjNull()) -> 'ObjIterable':
+    return self.distinct(key)
 
   # Return an iterable that only contains elements that match the predicate
   def where(self, predicate):
@@ -44,13 +51,49 @@ class ObjIterable(Obj, typename = "Iterable"):
 
   # Return an iterable that has its elements sorted using the key function
   def sort(self, key = ObjNull(), desc = ObjBool(False)):
-    elements = [e for e in iter(self)]
-    elements.sort(key = key if key != ObjNull() else (lambda e: e), reverse = bool(desc))
-    return ObjPyIterator(elements).delegate()
+    return ObjPyIterator(self.order_by(key, desc).sorted()).delegate()
 
   def method_sort(self, key: 'ObjCallable' = ObjNull(), desc: 'ObjBool' = ObjBool(False)) -> 'ObjList':
     return self.sort(key, desc)
 
+  # Return an iterable that sorts its elements using the key function when it is iterated
+  def order_by(self, key = ObjNull(), desc = ObjBool(False)):
+    return ObjOrderedIterable(self, [(key if key is not ObjNull() else None, bool(desc))])
+
+  def method_orderBy(self, key: 'ObjCallable' = ObjNull()) -> 'ObjOrderedIterable':
+    return self.order_by(key)
+
+  def method_orderByDesc(self, key: 'ObjCallable' = ObjNull()) -> 'ObjOrderedIterable':
+    return self.order_by(key, ObjBool(True))
+
+  # Return an iterable with the first elements of this iterable
+  def take(self, count):
+    return ObjTakeIterator(iter(self), int(count)).delegate()
+
+  def method_take(self, count: 'ObjInt') -> 'ObjIterable':
+    return self.take(count)
+
+  # Return an iterable without the first elements of this iterable
+  def skip(self, count):
+    return ObjSkipIterator(iter(self), int(count)).delegate()
+
+  def method_skip(self, count: 'ObjInt') -> 'ObjIterable':
+    return self.skip(count)
+
+  # Return an iterable with the elements of this iterable until an element doesn't match the predicate
+  def take_while(self, predicate):
+    return ObjTakeWhileIterator(iter(self), predicate).delegate()
+
+  def method_takeWhile(self, predicate: 'ObjCallable') -> 'ObjIterable':
+    return self.take_while(predicate)
+
+  # Return an iterable with the elements of this iterable from the first element that doesn't match the predicate
+  def skip_while(self, predicate):
+    return ObjSkipWhileIterator(iter(self), predicate).delegate()
+
+  def method_skipWhile(self, predicate: 'ObjCallable') -> 'ObjIterable':
+    return self.skip_while(predicate)
+
   # Return the number of elements in this iterable
   def __len__(self):
     return sum(1 for e in iter(self))
@@ -69,37 +112,170 @@ class ObjIterable(Obj, typename = "Iterable"):
     else:
       return initial
 
-    while iterator.advance():
-      value = function(value, iterator.current())
-    return value
+    return self.fold_iterator(iterator, function, value)
 
   def method_fold(self, function: 'ObjCallable', initial: 'Obj' = ObjNull()) -> 'Obj':
     return self.fold(function, initial)
 
-  # Return the sum of the elements in this iterable
+  # Fold the remaining elements of an iterator into the value
+  @staticmethod
+  def fold_iterator(iterator, function, value):
+    while iterator.advance():
+      value = function(value, iterator.current())
+    return value
+
+  # Return the sum of the elements in this iterable, adding a stream of ints, floats or money of a single currency
+  # natively and falling back to the add method from the first element of another kind
   def sum(self):
-    return self.fold(lambda a, b: a.call_method('add', b))
+    add = lambda a, b: a.call_method('add', b)
+
+    iterator = iter(self)
+    if not iterator.advance():
+      return ObjNull()
+    first = iterator.current()
+    kind = type(first)
+
+    # Accumulate the values of ints and floats
+    if kind is ObjInt or kind is ObjFloat:
+      total = first.value
+      while iterator.advance():
+        if type(element := iterator.current()) is not kind:
+          return self.fold_iterator(iterator, add, add(kind(total), element))
+        total += element.value
+      return kind(total)
+
+    # Accumulate the minor units of money
+    if kind is ObjMoney:
+      code, total = first.code, first.minor
+      while iterator.advance():
+        if type(element := iterator.current()) is not ObjMoney or element.code != code:
+          return self.fold_iterator(iterator, add, add(ObjMoney.from_minor(code, total), element))
+        total += element.minor
+      return ObjMoney.from_minor(code, total)
+
+    return self.fold_iterator(iterator, add, first)
 
   def method_sum(self) -> 'Obj':
     return self.sum()
 
+  # Return the element that wins every comparison in this iterable, comparing a stream of ints, floats, money of a
+  # single currency or dates by their native value and keeping the later one of equal elements like the method does
+  def extreme(self, method, compare):
+    select = lambda a, b: a if bool(a.call_method(method, b)) else b
+
+    iterator = iter(self)
+    if not iterator.advance():
+      return ObjNull()
+    best = iterator.current()
+    kind = type(best)
+
+    if kind is ObjInt or kind is ObjFloat or kind is ObjDate or kind is ObjMoney:
+      native = operator.attrgetter('ordinal' if kind is ObjDate else 'minor' if kind is ObjMoney else 'value')
+      code = best.code if kind is ObjMoney else None
+      best_value = native(best)
+      while iterator.advance():
+        if type(element := iterator.current()) is not kind or (code is not None and element.code != code):
+          return self.fold_iterator(iterator, select, select(best, element))
+        if not compare(best_value, value := native(element)):
+          best, best_value = element, value
+      return best
+
+    return self.fold_iterator(iterator, select, best)
+
   # Return the minimum of the elements in this iterable
   def min(self):
-    return self.fold(lambda a, b: a if bool(a.call_method('lt', b)) else b)
+    return self.extreme('lt', operator.lt)
 
   def method_min(self) -> 'Obj':
     return self.min()
 
   # Return the maximum of the elements in this iterable
   def max(self):
-    return self.fold(lambda a, b: a if bool(a.call_method('gt', b)) else b)
+    return self.extreme('gt', operator.gt)
 
   def method_max(self) -> 'Obj':
     return self.max()
 
+  # Return a record with the count, sum, minimum, maximum, mean and population variance of the elements in this
+  # iterable from a single pass, accumulating a stream of ints, floats or money of a single currency natively like
+  # the sum and extreme functions and updating the variance of numbers and money with Welford's algorithm
+  def stats(self):
+    add = lambda a, b: a.call_method('add', b)
+    select_min = lambda a, b: a if bool(a.call_method('lt', b)) else b
+    select_max = lambda a, b: a if bool(a.call_method('gt', b)) else b
+
+    iterator = iter(self)
+    count = 0
+    total = minimum = maximum = ObjNull()
+    element = None
+    mean = m2 = 0.0
+    numeric = True
+
+    if iterator.advance():
+      element = iterator.current()
+      kind = type(element)
+
+      # Accumulate the native values of the run of elements of the same kind as the first element
+      if kind is ObjInt or kind is ObjFloat or kind is ObjMoney:
+        code = element.code if kind is ObjMoney else None
+        native = operator.attrgetter('minor' if kind is ObjMoney else 'value')
+        scale = ObjMoney.scale if kind is ObjMoney else 1
+
+        minimum = maximum = element
+        total_value = minimum_value = maximum_value = value = native(element)
+        while True:
+          count += 1
+          delta = value / scale - mean
+          mean += delta / count
+          m2 += delta * (value / scale - mean)
+
+          if not iterator.advance():
+            element = None
+            break
+          if type(element := iterator.current()) is not kind or (code is not None and element.code != code):
+            break
+          value = native(element)
+          total_value += value
+          if not minimum_value < value:
+            minimum, minimum_value = element, value
+          if not maximum_value > value:
+            maximum, maximum_value = element, value
+
+        total = ObjMoney.from_minor(code, total_value) if kind is ObjMoney else kind(total_value)
+
+    # Accumulate the remaining elements with their methods, starting at the element that ended the native run
+    while element is not None:
+      count += 1
+      if count == 1:
+        total = minimum = maximum = element
+      else:
+        total, minimum, maximum = add(total, element), select_min(minimum, element), select_max(maximum, element)
+
+      if numeric and (type(element) is ObjInt or type(element) is ObjFloat or type(element) is ObjMoney):
+        value = element.minor / ObjMoney.scale if type(element) is ObjMoney else element.value
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+      else:
+        numeric = False
+
+      element = iterator.current() if iterator.advance() else None
+
+    stats = ObjRecord()
+    stats.declare_field('count', ObjInt(count))
+    stats.declare_field('sum', total)
+    stats.declare_field('min', minimum)
+    stats.declare_field('max', maximum)
+    stats.declare_field('mean', total / ObjInt(count) if count and numeric else ObjNull())
+    stats.declare_field('variance', ObjFloat(m2 / count) if count and numeric else ObjNull())
+    return stats
+
+  def method_stats(self) -> 'ObjRecord':
+    return self.stats()
+
   # Return the average of the elements in this iterable
   def average(self):
-    return self.method_sum() / self.method_count()
+    return self.stats().get_field('mean')
 
   def method_average(self) -> 'Obj':
     return self.average()
@@ -114,10 +290,18 @@ class ObjIterable(Obj, typename = "Iterable"):
   def method_contains(self, element: 'Obj') -> 'ObjBool':
     return ObjBool(self.__contains__(element))
 
+  # Return the first element in this iterable, or null if the iterable is empty
+  def first(self):
+    iterator = iter(self)
+    return iterator.current() if iterator.advance() else ObjNull()
+
+  def method_first(self) -> 'Obj':
+    return self.first()
+
   # Return if any element in this iterable matches the predicate
   def any(self, predicate):
     for e in iter(self):
-      if predicate(e):
+      if (result := predicate(e)) is ObjBool.true or (result is not ObjBool.false and result):
         return True
     return False
 
@@ -127,7 +311,7 @@ class ObjIterable(Obj, typename = "Iterable"):
   # Return if all elements in this iterable matches the predicate
   def all(self, predicate):
     for e in iter(self):
-      if not predicate(e):
+      if (result := predicate(e)) is ObjBool.false or (result is not ObjBool.true and not result):
         return False
     return True
 
@@ -188,6 +372,116 @@ class ObjDelegatedIterable(ObjIterable, typename = "DelegatedIterable"):
     return f"{self.__class__.__name__}({self.value!r})"
 
 
+#######################################################
+### Definition of the ordered iterable object class ###
+#######################################################
+
+# Class that defines an iterable that sorts the elements of another iterable by one or more keys when it is
+# iterated, so following keys and a limit on the number of elements can be added before the elements are sorted
+class ObjOrderedIterable(ObjIterable, typename = "OrderedIterable"):
+  # Constructor
+  def __init__(self, iterable, keys, limit = None):
+    super().__init__()
+
+    # Define the iterable to sort, the list of key functions and descending flags in order of precedence, and the
+    # maximal number of sorted elements to return
+    self.iterable = iterable
+    self.keys = keys
+    self.limit = limit
+
+
+  # Return an iterator for the iterable object
+  def __iter__(self):
+    return ObjPyIterator(self.sorted())
+
+  def method_iterator(self) -> 'ObjIterator':
+    return self.__iter__()
+
+  # Return an iterable that sorts the elements that are equal by the previous keys using the key function
+  def then_by(self, key = ObjNull(), desc = ObjBool(False)):
+    if self.limit is not None:
+      raise InvalidOperationException("Cannot add a key to an iterable of which the elements have been taken")
+    return ObjOrderedIterable(self.iterable, [*self.keys, (key if key is not ObjNull() else None, bool(desc))])
+
+  def method_thenBy(self, key: 'ObjCallable' = ObjNull()) -> 'ObjOrderedIterable':
+    return self.then_by(key)
+
+  def method_thenByDesc(self, key: 'ObjCallable' = ObjNull()) -> 'ObjOrderedIterable':
+    return self.then_by(key, ObjBool(True))
+
+  # Return an iterable with the first sorted elements of this iterable, which selects them with a heap instead of
+  # sorting all elements
+  def take(self, count):
+    limit = max(int(count), 0)
+    return ObjOrderedIterable(self.iterable, self.keys, limit if self.limit is None else min(limit, self.limit))
+
+  # Return the first sorted element, which is selected without sorting all elements
+  def first(self):
+    elements = self.take(1).sorted()
+    return elements[0] if elements else ObjNull()
+
+  # Return a list of the sorted elements, with the keys of the elements evaluated once and compared as native values
+  def sorted(self):
+    elements = [e for e in iter(self.iterable)]
+    columns = [self.native_keys(elements if key is None else [key(e) for e in elements]) for key, desc in self.keys]
+    indices = range(len(elements))
+
+    # Sort on tuples of the keys if all keys are sorted in the same direction, selecting the first elements with a
+    # heap if there's a limit
+    try:
+      if all(desc == self.keys[0][1] for key, desc in self.keys):
+        desc = self.keys[0][1]
+        rows = columns[0] if len(columns) == 1 else [*zip(*columns)]
+        if self.limit is not None and self.limit < len(elements):
+          indices = (heapq.nlargest if desc else heapq.nsmallest)(self.limit, indices, key = rows.__getitem__)
+        else:
+          indices = sorted(indices, key = rows.__getitem__, reverse = desc)
+
+      # Otherwise sort on every key from the last to the first, which keeps the order of the previous keys since
+      # sorting is stable
+      else:
+        indices = [*indices]
+        for column, (key, desc) in reversed([*zip(columns, self.keys)]):
+          indices.sort(key = column.__getitem__, reverse = desc)
+        if self.limit is not None:
+          indices = indices[:self.limit]
+
+    # Keys that are not compared as native values are compared by their own comparison, which doesn't support
+    # operands of different types
+    except TypeError:
+      raise InvalidOperationException("Cannot sort elements by keys of types that can't be compared with each other")
+
+    return [elements[index] for index in indices]
+
+  # Return the native values of a list of keys, or the keys themselves if they are not all numbers, strings, dates or
+  # money of a single currency, in which case they are compared using their methods
+  @staticmethod
+  def native_keys(keys):
+    if not keys:
+      return keys
+
+    kind = type(keys[0])
+    if kind is ObjInt or kind is ObjFloat:
+      if all(type(key) is ObjInt or type(key) is ObjFloat for key in keys):
+        return [key.value for key in keys]
+    elif kind is ObjString:
+      if all(type(key) is ObjString for key in keys):
+        return [key.value for key in keys]
+    elif kind is ObjDate:
+      if all(type(key) is ObjDate for key in keys):
+        return [key.ordinal for key in keys]
+    elif kind is ObjMoney:
+      code = keys[0].code
+      if all(type(key) is ObjMoney and key.code == code for key in keys):
+        return [key.minor for key in keys]
+    return keys
+
+
+  # Return the Python representation of this object
+  def __repr__(self):
+    return f"{self.__class__.__name__}({self.iterable!r}, {self.keys!r}, {self.limit!r})"
+
+
 ###############################################
 ### Definition of the iterator object class ###
 ###############################################
@@ -329,11 +623,15 @@ class ObjSelectIterator(ObjIterator, typename = "SelectIterator"):
 
 class ObjDistinctIterator(ObjIterator, typename = "DistinctIterator"):
   # Constructor
-  def __init__(self, iterator):
+  def __init__(self, iterator, key = None):
     super().__init__()
 
     self.iterator = iterator
-    self.yields = []
+    self.key = key
+
+    # Define the set of yielded keys, and the list of yielded keys that can't be hashed
+    self.yields = set()
+    self.unhashable_yields = []
 
 
   # Return the element at the cursor of the iterator object
@@ -342,11 +640,17 @@ class ObjDistinctIterator(ObjIterator, typename = "DistinctIterator"):
 
   # Advance the cursor of the iterator object
   def advance(self):
-    # Advance the iterator until an element matches the predicate
+    # Advance the iterator until the key of an element has not been yielded yet
     while self.iterator.advance():
-      if (current := self.iterator.current()) not in self.yields:
-        self.yields.append(current)
-        return True
+      key = self.iterator.current() if self.key is None else self.key(self.iterator.current())
+      try:
+        if key not in self.yields:
+          self.yields.add(key)
+          return True
+      except TypeError:
+        if key not in self.unhashable_yields:
+          self.unhashable_yields.append(key)
+          return True
 
     # Readed the end of the iterator
     return False
@@ -354,6 +658,8 @@ class ObjDistinctIterator(ObjIterator, typename = "DistinctIterator"):
   # Rewind the iterator object
   def rewind(self):
     self.iterator.rewind()
+    self.yields.clear()
+    self.unhashable_yields.clear()
 
   # Delete the element at the cursor of the iterator object
   def delete(self):
@@ -379,9 +685,9 @@ class ObjWhereIterator(ObjIterator, typename = "WhereIterator"):
 
   # Advance the cursor of the iterator object
   def advance(self):
-    # Advance the iterator until an element matches the predicate
+    # Advance the iterator until an element matches the predicate, checking the canonical bool objects first
     while self.iterator.advance():
-      if self.predicate(self.iterator.current()):
+      if (result := self.predicate(self.iterator.current())) is ObjBool.true or (result is not ObjBool.false and result):
         return True
 
     # Readed the end of the iterator
@@ -394,3 +700,159 @@ class ObjWhereIterator(ObjIterator, typename = "WhereIterator"):
   # Delete the element at the cursor of the iterator object
   def delete(self):
     self.iterator.delete()
+
+
+####################################################
+### Definition of the take iterator object class ###
+####################################################
+
+class ObjTakeIterator(ObjIterator, typename = "TakeIterator"):
+  # Constructor
+  def __init__(self, iterator, count):
+    super().__init__()
+
+    self.iterator = iterator
+    self.count = count
+    self.taken = 0
+
+
+  # Return the element at the cursor of the iterator object
+  def current(self):
+    return self.iterator.current()
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    # Stop advancing the iterator when the number of elements has been taken
+    if self.taken >= self.count:
+      return False
+
+    self.taken += 1
+    return self.iterator.advance()
+
+  # Rewind the iterator object
+  def rewind(self):
+    self.iterator.rewind()
+    self.taken = 0
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    self.iterator.delete()
+
+
+####################################################
+### Definition of the skip iterator object class ###
+####################################################
+
+class ObjSkipIterator(ObjIterator, typename = "SkipIterator"):
+  # Constructor
+  def __init__(self, iterator, count):
+    super().__init__()
+
+    self.iterator = iterator
+    self.count = count
+    self.skipped = False
+
+
+  # Return the element at the cursor of the iterator object
+  def current(self):
+    return self.iterator.current()
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    # Skip the number of elements when the iterator is advanced for the first time
+    if not self.skipped:
+      self.skipped = True
+      for i in range(self.count):
+        if not self.iterator.advance():
+          return False
+
+    return self.iterator.advance()
+
+  # Rewind the iterator object
+  def rewind(self):
+    self.iterator.rewind()
+    self.skipped = False
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    self.iterator.delete()
+
+
+##########################################################
+### Definition of the take while iterator object class ###
+##########################################################
+
+class ObjTakeWhileIterator(ObjIterator, typename = "TakeWhileIterator"):
+  # Constructor
+  def __init__(self, iterator, predicate):
+    super().__init__()
+
+    self.iterator = iterator
+    self.predicate = predicate
+    self.stopped = False
+
+
+  # Return the element at the cursor of the iterator object
+  def current(self):
+    return self.iterator.current()
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    # Stop advancing the iterator at the first element that doesn't match the predicate
+    if self.stopped or not self.iterator.advance():
+      return False
+
+    if (result := self.predicate(self.iterator.current())) is ObjBool.true or (result is not ObjBool.false and result):
+      return True
+
+    self.stopped = True
+    return False
+
+  # Rewind the iterator object
+  def rewind(self):
+    self.iterator.rewind()
+    self.stopped = False
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    self.iterator.delete()
+
+
+##########################################################
+### Definition of the skip while iterator object class ###
+##########################################################
+
+class ObjSkipWhileIterator(ObjIterator, typename = "SkipWhileIterator"):
+  # Constructor
+  def __init__(self, iterator, predicate):
+    super().__init__()
+
+    self.iterator = iterator
+    self.predicate = predicate
+    self.skipped = False
+
+
+  # Return the element at the cursor of the iterator object
+  def current(self):
+    return self.iterator.current()
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    # Skip the elements until an element doesn't match the predicate when the iterator is advanced for the first time
+    if not self.skipped:
+      self.skipped = True
+      while self.iterator.advance():
+        if (result := self.predicate(self.iterator.current())) is ObjBool.false or (result is not ObjBool.true and not result):
+          return True
+      return False
+
+    return self.iterator.advance()
+
+  # Rewind the iterator object
+  def rewind(self):
+    self.iterator.rewind()
+    self.skipped = False
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    self.iterator.delete()
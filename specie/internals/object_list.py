@@ -191,3 +191,113 @@ class ObjListIterator(ObjIterator, typename = "ListIterator"):
     else:
       self.list.delete_item_at(self.list_index)
       self.list_deleted = True
+
+
+################################################
+### Definition of the lazy list object class ###
+################################################
+
+# List whose items are the elements of an iterable that is only evaluated when the items are needed. Every pass
+# over the list evaluates a new iterable that is returned by a callable, until the list is materialized when its
+# items are accessed as a list, after which the items are cached like in a regular list.
+class ObjLazyList(ObjList, typename = "List"):
+  # Constructor
+  def __init__(self, iterable, passes):
+    super(ObjList, self).__init__()
+
+    # Define the iterable of the next pass, the callable that returns the iterable of further passes, and the
+    # cached items of the list
+    self.iterable = iterable
+    self.passes = passes
+    self.cache = None
+
+  # Return the items in the list, materializing the list if it hasn't been materialized yet
+  @property
+  def items(self):
+    if self.cache is None:
+      self.cache = [*iter(self.next_pass())]
+      self.passes = None
+    return self.cache
+
+  # Return if the list has been materialized
+  def materialized(self):
+    return self.cache is not None
+
+  # Materialize the list and return it
+  def materialize(self):
+    self.items
+    return self
+
+  # Return the iterable of the next pass over the list
+  def next_pass(self):
+    if (iterable := self.iterable) is not None:
+      self.iterable = None
+      return iterable
+    return self.passes()
+
+
+  # Return an iterator for this list object, which iterates over a pass if the list hasn't been materialized yet
+  def __iter__(self):
+    if self.cache is None:
+      return ObjLazyListIterator(self)
+    return ObjListIterator(self)
+
+  # Return the length of the list object, counting the elements of a pass if the list hasn't been materialized yet
+  def __len__(self):
+    if self.cache is None:
+      iterator = iter(self.next_pass())
+      count = 0
+      while iterator.advance():
+        count += 1
+      return count
+    return len(self.cache)
+
+
+  # Return the Python representation for the object
+  def __repr__(self):
+    return f"{self.__class__.__name__}({self.iterable!r})" if self.cache is None else super().__repr__()
+
+
+#########################################################
+### Definition of the lazy list iterator object class ###
+#########################################################
+
+class ObjLazyListIterator(ObjListIterator, typename = "ListIterator"):
+  # Constructor
+  def __init__(self, list):
+    super().__init__(list)
+
+    # Define the iterator of the pass over the list, or None if the iterator iterates over the materialized items
+    self.iterator = iter(list.next_pass())
+
+
+  # Return the element at the cursor of the iterator object
+  def current(self):
+    if self.iterator is None:
+      return super().current()
+    if self.list_index is None:
+      raise InvalidStateException("The iterator has not yet been advanced")
+    return self.iterator.current()
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    if self.iterator is None:
+      return super().advance()
+    self.list_index = 0 if self.list_index is None else self.list_index + 1
+    return self.iterator.advance()
+
+  # Rewind the iterator object, starting a new pass if the current pass has already been advanced
+  def rewind(self):
+    if self.iterator is not None and self.list_index is not None:
+      self.iterator = None if self.list.materialized() else iter(self.list.next_pass())
+    self.list_index = None
+
+  # Delete the element at the cursor of the iterator object from the materialized items, since deleting it from
+  # the pass would delete it from the source of the list
+  def delete(self):
+    if self.iterator is not None:
+      if self.list_index is None:
+        raise InvalidStateException("The iterator has not yet been advanced")
+      self.iterator = None
+      self.list.materialize()
+    super().delete()
@@ -113,8 +113,18 @@ class ObjMapElement(ObjRecord, typename = "MapElement", prettyprint = False):
     super().__setattr__('_map', map)
     super().__setattr__('_key', key)
 
-    self.declare_delegate('key', lambda self: self._key)
-    self.declare_delegate('value', lambda self: self._map.get(self._key), lambda self, value: self._map.set(self._key, value))
+    self.declare_delegate('key', ObjMapElement.get_key)
+    self.declare_delegate('value', ObjMapElement.get_value, ObjMapElement.set_value)
+
+  # Get and set the key and value of this map element object, which are shared between map element objects as field accessors
+  def get_key(self):
+    return self._key
+
+  def get_value(self):
+    return self._map.get(self._key)
+
+  def set_value(self, value):
+    self._map.set(self._key, value)
 
 
   # Return if this map element object is equal to another object
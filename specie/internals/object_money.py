@@ -1,55 +1,102 @@
+from decimal import Decimal, InvalidOperation
+
 from .object import Obj, ObjBool, ObjNumber, ObjInt, ObjFloat, ObjString
 from .object_record import ObjRecord
-from .errors import InvalidOperationException
+from .errors import RuntimeException, InvalidOperationException
 
 
 ############################################
 ### Definition of the money object class ###
 ############################################
 
+# Class that defines an amount of money, which is stored as an interned currency code and an amount of minor units
+#
+# The currency and value of money objects are exposed as delegate fields of a shape that is shared between all
+# money objects, so money objects don't declare fields themselves and are immutable.
 class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
+  # The currency code and the amount of minor units of the money object
+  __slots__ = ('code', 'minor')
+
+  # The amount of minor units in a major unit
+  scale = 100
+
   # Constructor
   def __init__(self, currency: 'ObjString', value: 'ObjNumber' = 0.0) -> 'ObjMoney':
-    super().__init__()
-    self.declare_field('currency', ObjString(currency))
-    self.declare_field('value', ObjFloat(value))
+    super(ObjRecord, self).__setattr__('code', ObjString.intern(currency))
+    super(ObjRecord, self).__setattr__('minor', ObjMoney.to_minor(value))
+
+  # Create a money object with the specified currency code string object and amount of minor units
+  @classmethod
+  def from_minor(cls, code, minor):
+    money = cls.__new__(cls)
+    super(ObjRecord, money).__setattr__('code', code)
+    super(ObjRecord, money).__setattr__('minor', minor)
+    return money
+
+  # Return the amount of minor units of a value
+  @classmethod
+  def to_minor(cls, value):
+    value = value.value if isinstance(value, (ObjNumber, ObjString)) else value
+    if isinstance(value, int):
+      return value * cls.scale
+    elif isinstance(value, float):
+      return round(value * cls.scale)
+    elif isinstance(value, str):
+      try:
+        return int((Decimal(value) * cls.scale).to_integral_value())
+      except InvalidOperation:
+        raise RuntimeException(f"Invalid money literal {value}")
+    else:
+      raise TypeError(f"Unexpected native type {value.__class__.__name__}")
+
+  # Return the currency and value of this money object, which are shared between money objects as field getters
+  def get_currency(self):
+    return self.code
+
+  def get_value(self):
+    return ObjFloat(self.minor / self.scale)
+
+  # The shape of all money objects
+  shape = ObjRecord.empty_shape.with_delegate_field('currency', get_currency).with_delegate_field('value', get_value)
+  values = ()
 
 
   # Return if this money object is equal to another object
   def __eq__(self, other):
-    return isinstance(other, ObjMoney) and (self['currency'], self['value']) == (other['currency'], other['value'])
+    return isinstance(other, ObjMoney) and self.code == other.code and self.minor == other.minor
 
   def method_eq(self, other: 'Obj') -> 'ObjBool':
     return ObjBool(self.__eq__(other))
 
   # Return the bool representation of this object
   def __bool__(self):
-    return self.value != ObjFloat(0.0)
+    return self.minor != 0
 
   def method_asBool(self):
     return ObjBool(self.__bool__())
 
   # Return the string representation of this object
   def __str__(self):
-    if float(self.value) < 0.0:
-      return f"[red]{self.currency} {self.value:.2f}"
+    major, minor = divmod(abs(self.minor), self.scale)
+    if self.minor < 0:
+      return f"[red]{self.code} -{major}.{minor:02d}"
     else:
-      return f"{self.currency} {self.value:.2f}"
+      return f"{self.code} {major}.{minor:02d}"
 
   def method_asString(self) -> 'ObjString':
     return ObjString(self.__str__())
 
   # Return the hash of this object
   def __hash__(self):
-    return hash((self.currency, self.value))
+    return hash((self.code, self.minor))
 
   def method_asHash(self) -> 'ObjInt':
     return ObjInt(self.__hash__())
 
   # Compare this money object with another object
   def __lt__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return self.value < other.value
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return self.minor < other.minor
     return NotImplemented
 
   def method_lt(self, other: 'ObjMoney') -> 'ObjBool':
@@ -58,8 +105,8 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
     raise InvalidOperationException(f"Operation 'lt' does not support operands of type {self.__class__} and {other.__class__}")
 
   def __le__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return self.value <= other.value
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return self.minor <= other.minor
     return NotImplemented
 
   def method_lte(self, other: 'ObjMoney') -> 'ObjBool':
@@ -68,8 +115,8 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
     raise InvalidOperationException(f"Operation 'lte' does not support operands of type {self.__class__} and {other.__class__}")
 
   def __gt__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return self.value > other.value
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return self.minor > other.minor
     return NotImplemented
 
   def method_gt(self, other: 'ObjMoney') -> 'ObjBool':
@@ -78,8 +125,8 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
     raise InvalidOperationException(f"Operation 'gt' does not support operands of type {self.__class__} and {other.__class__}")
 
   def __ge__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return self.value >= other.value
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return self.minor >= other.minor
     return NotImplemented
 
   def method_gte(self, other: 'ObjMoney') -> 'ObjBool':
@@ -98,8 +145,8 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
 
   # Return the addition of two money objects
   def __add__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return ObjMoney(self.currency, self.value + other.value)
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return ObjMoney.from_minor(self.code, self.minor + other.minor)
     return NotImplemented
 
   def method_add(self, other: 'ObjNumber') -> 'ObjNumber':
@@ -109,8 +156,8 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
 
   # Return the suntraction of two numeric objects
   def __sub__(self, other):
-    if isinstance(other, ObjMoney) and self.currency == other.currency:
-      return ObjMoney(self.currency, self.value - other.value)
+    if isinstance(other, ObjMoney) and self.code == other.code:
+      return ObjMoney.from_minor(self.code, self.minor - other.minor)
     return NotImplemented
 
   def method_sub(self, other: 'ObjNumber') -> 'ObjNumber':
@@ -121,7 +168,7 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
   # Return the multiplication of two numeric objects
   def __mul__(self, other):
     if isinstance(other, ObjNumber):
-      return ObjMoney(self.currency, self.value * other)
+      return ObjMoney.from_minor(self.code, round(self.minor * other.value))
     return NotImplemented
 
   def method_mul(self, other: 'ObjNumber') -> 'ObjNumber':
@@ -132,10 +179,22 @@ class ObjMoney(ObjRecord, typename = "Money", prettyprint = False):
   # Return the division of two numeric objects
   def __truediv__(self, other):
     if isinstance(other, ObjNumber):
-      return ObjMoney(self.currency, self.value / other)
+      try:
+        return ObjMoney.from_minor(self.code, round(self.minor / other.value))
+      except ZeroDivisionError:
+        raise RuntimeException("Division by zero")
     return NotImplemented
 
   def method_div(self, other: 'ObjNumber') -> 'ObjNumber':
     if (result := self.__truediv__(other)) is not NotImplemented:
       return result
     raise InvalidOperationException(f"Operation 'div' does not support operands of type {self.__class__} and {other.__class__}")
+
+
+  # Return the arguments to reconstruct this money object when pickling
+  def __reduce__(self):
+    return (ObjMoney.from_minor, (self.code, self.minor))
+
+  # Return the Python representation for this object
+  def __repr__(self):
+    return f"{self.__class__.__name__}.from_minor({self.code!r}, {self.minor!r})"
@@ -39,6 +39,60 @@ class Field:
       raise RuntimeException(f"The field '{self.name}' is not writable")
 
 
+class ValueField(Field):
+  # Constructor
+  def __init__(self, name, index, mutable = True, *, public = True, options = FieldOptions.NONE):
+    super().__init__(name, public = public, options = options)
+    self.index = index
+    self.mutable = mutable
+
+  # Get the value of this field in an instance
+  def get(self, instance):
+    return instance.values[self.index]
+
+  # Set the value of this field in an instance
+  def set(self, instance, value):
+    if self.mutable:
+      instance.values[self.index] = value
+    else:
+      raise RuntimeException(f"The field '{self.name}' is not writable")
+
+
+#####################################
+### Definition of the shape class ###
+#####################################
+
+# Class that defines the shape of a record, which is shared by all records with the same fields
+#
+# A shape is immutable: declaring a field on a record transitions the record to another shape, which is cached
+# in the transitions of the previous shape, so records that declare the same fields in the same order end up
+# with the same shape. The values of value fields are stored in a list in the record at the index of the field.
+class Shape:
+  # Constructor
+  def __init__(self, fields = None, size = 0):
+    self.fields = fields if fields is not None else {}
+    self.size = size
+
+    # Define the map of shapes to transition to by the declared field
+    self.transitions = {}
+
+  # Return the shape with an additional value field
+  def with_value_field(self, name, mutable = True, public = True, options = FieldOptions.NONE):
+    key = (name, mutable, public, options)
+    if (shape := self.transitions.get(key)) is None:
+      field = ValueField(name, self.size, mutable, public = public, options = options)
+      shape = self.transitions[key] = Shape({**self.fields, name: field}, self.size + 1)
+    return shape
+
+  # Return the shape with an additional delegate field
+  def with_delegate_field(self, name, getter, setter = None, public = True, options = FieldOptions.NONE):
+    key = (name, getter, setter, public, options)
+    if (shape := self.transitions.get(key)) is None:
+      field = Field(name, getter, setter, public = public, options = options)
+      shape = self.transitions[key] = Shape({**self.fields, name: field}, self.size)
+    return shape
+
+
 ##################################################
 ### Definition of the record object meta class ###
 ##################################################
@@ -61,10 +115,19 @@ class ObjRecordMeta(ObjMeta):
 #############################################
 
 class ObjRecord(Obj, metaclass = ObjRecordMeta, typename = "Record"):
+  # The shape of a record without fields
+  empty_shape = Shape()
+
   # Constructor
   def __init__(self, **fields):
     super().__init__()
-    super().__setattr__('fields', {})
+    super().__setattr__('shape', ObjRecord.empty_shape)
+    super().__setattr__('values', [])
+
+  # Return the fields of the record object by name
+  @property
+  def fields(self):
+    return self.shape.fields
 
 
   # Declare a property field in the record
@@ -72,27 +135,26 @@ class ObjRecord(Obj, metaclass = ObjRecordMeta, typename = "Record"):
     if self.has_field(name):
       raise RuntimeException(f"The field {name} already exists", location)
 
-    self.fields[name] = field = Field(name, getter, setter, **kwargs)
-    setattr(self.__class__, name, property(field.get, field.set))
+    super().__setattr__('shape', self.shape.with_delegate_field(name, getter, setter, **kwargs))
 
   # Declare a value field in the record
   def declare_field(self, name, value, mutable = True, location = None, **kwargs):
-    def getter(self):
-      return self.__dict__[f'__{name}']
-    def setter(self, value):
-      self.__dict__[f'__{name}'] = value
+    if self.has_field(name):
+      raise RuntimeException(f"The field {name} already exists", location)
 
-    self.declare_delegate(name, getter, setter if mutable else None, location, **kwargs)
-    setter(self, value)
+    super().__setattr__('shape', self.shape.with_value_field(name, bool(mutable), **kwargs))
+    self.values.append(value)
 
   # Get a field in the record object
   def get_field(self, name, location = None):
-    if self.has_field(name):
-      return self.fields[name].get(self)
+    if (field := self.shape.fields.get(name)) is not None:
+      return field.get(self)
     else:
       raise UndefinedFieldException(name, location)
 
   def __getattr__(self, name):
+    if name in ('shape', 'values'):
+      raise AttributeError(name)
     try:
       return self.get_field(name)
     except UndefinedFieldException:
@@ -107,8 +169,8 @@ class ObjRecord(Obj, metaclass = ObjRecordMeta, typename = "Record"):
 
   # Set a field in the record object
   def set_field(self, name, value, location = None):
-    if self.has_field(name):
-      self.fields[name].set(self, value)
+    if (field := self.shape.fields.get(name)) is not None:
+      field.set(self, value)
     else:
       raise UndefinedFieldException(name, location)
 
@@ -120,7 +182,7 @@ class ObjRecord(Obj, metaclass = ObjRecordMeta, typename = "Record"):
 
   # Return if a field exists in the record object
   def has_field(self, name):
-    return name in self.fields
+    return name in self.shape.fields
 
 
   # Iterate over the fields and their values in the record object
@@ -0,0 +1,825 @@
+import bisect
+import itertools
+import operator
+import weakref
+
+from array import array
+
+from .object import Obj, ObjNull, ObjBool, ObjInt, ObjFloat, ObjString
+from .object_list import ObjList, ObjListIterator
+from .object_record import ValueField, Shape, ObjRecord
+from .object_date import ObjDate
+from .object_money import ObjMoney
+from .object_transaction import ObjTransaction
+from .errors import InvalidTypeException, InvalidValueException, UndefinedIndexException
+
+
+########################################
+### Definition of the column classes ###
+########################################
+
+# Class that defines a column of values in a table, which stores the values as they are
+class Column:
+  # The stored value of rows that don't have a value in the column
+  missing = None
+
+  # Constructor
+  def __init__(self, data = None):
+    self.data = data if data is not None else []
+
+  # Return if a value can be stored in the column
+  def accepts(self, value):
+    return True
+
+  # Return the stored value for a value
+  def encode(self, value):
+    return value
+
+  # Return the value for a stored value
+  def decode(self, stored):
+    return stored
+
+  # Return the native sort key of a row, or None if the column has no native sort key
+  def key(self, row):
+    return None
+
+  # Get the value of a row in the column
+  def get(self, row):
+    return self.decode(self.data[row])
+
+  # Set the value of a row in the column
+  def set(self, row, value):
+    self.data[row] = self.encode(value)
+
+  # Add a row without a value to the column
+  def append_missing(self):
+    self.data.append(self.missing)
+
+  # Delete a row from the column
+  def delete(self, row):
+    del self.data[row]
+
+  # Reorder the rows in the column by a list of previous row indices
+  def reorder(self, order):
+    data = self.data
+    self.data = self.data.__class__(data[row] for row in order) if isinstance(data, list) else array(data.typecode, (data[row] for row in order))
+
+
+# Class that defines a column of strings, which are stored as native strings
+class TextColumn(Column):
+  # Return if a value can be stored in the column
+  def accepts(self, value):
+    return type(value) is ObjString
+
+  # Return the stored value for a value
+  def encode(self, value):
+    return value.value
+
+  # Return the value for a stored value
+  def decode(self, stored):
+    return ObjString(stored)
+
+  # Return the native sort key of a row
+  def key(self, row):
+    return self.data[row]
+
+
+# Class that defines a column of strings, which are stored as codes in a dictionary of distinct strings
+class DictionaryColumn(Column):
+  # The stored value of rows that don't have a value in the column
+  missing = -1
+
+  # Constructor
+  def __init__(self):
+    super().__init__(array('i'))
+
+    # Define the list of distinct strings and the map of codes by string
+    self.strings = []
+    self.codes = {}
+
+  # Return if a value can be stored in the column
+  def accepts(self, value):
+    return type(value) is ObjString
+
+  # Return the stored value for a value
+  def encode(self, value):
+    if (code := self.codes.get(value.value)) is None:
+      code = self.codes[value.value] = len(self.strings)
+      self.strings.append(value)
+    return code
+
+  # Return the value for a stored value, which is shared between rows since strings are immutable
+  def decode(self, stored):
+    return self.strings[stored]
+
+  # Return the native sort key of a row
+  def key(self, row):
+    return self.strings[self.data[row]].value
+
+
+# Class that defines a column of dates, which are stored as ordinals
+class DateColumn(Column):
+  # The stored value of rows that don't have a value in the column
+  missing = 0
+
+  # Constructor
+  def __init__(self):
+    super().__init__(array('i'))
+
+    # Define the map of decoded dates by ordinal
+    self.dates = {}
+
+  # Return if a value can be stored in the column
+  def accepts(self, value):
+    return type(value) is ObjDate
+
+  # Return the stored value for a value
+  def encode(self, value):
+    return value.ordinal
+
+  # Return the value for a stored value, which is shared between rows since dates are immutable
+  def decode(self, stored):
+    if (value := self.dates.get(stored)) is None:
+      value = self.dates[stored] = ObjDate.from_ordinal(stored)
+    return value
+
+  # Return the native sort key of a row
+  def key(self, row):
+    return self.data[row]
+
+
+# Class that defines a column of money, which is stored as a currency code and an amount of minor units
+class MoneyColumn(Column):
+  # The stored value of rows that don't have a value in the column
+  missing = 0
+
+  # Constructor
+  def __init__(self):
+    super().__init__(array('q'))
+    self.currencies = DictionaryColumn()
+
+  # Return if a value can be stored in the column
+  def accepts(self, value):
+    return type(value) is ObjMoney and -2 ** 63 <= value.minor < 2 ** 63
+
+  # Get the value of a row in the column
+  def get(self, row):
+    return ObjMoney.from_minor(self.currencies.get(row), self.data[row])
+
+  # Set the value of a row in the column
+  def set(self, row, value):
+    self.data[row] = value.minor
+    self.currencies.set(row, value.code)
+
+  # Add a row without a value to the column
+  def append_missing(self):
+    self.data.append(self.missing)
+    self.currencies.append_missing()
+
+  # Delete a row from the column
+  def delete(self, row):
+    del self.data[row]
+    self.currencies.delete(row)
+
+  # Reorder the rows in the column by a list of previous row indices
+  def reorder(self, order):
+    super().reorder(order)
+    self.currencies.reorder(order)
+
+
+##########################################
+### Definition of the hash index class ###
+##########################################
+
+# Class that defines a hash index from the values of a field to the indices of the rows with that value. The
+# index is updated along with the rows of the table once it is built, and is only rebuilt on the first lookup
+# after a change it couldn't follow. It can only be used when every row is stored in columns and has the field,
+# since evaluating the field of other rows might fail.
+class HashIndex:
+  # The types of values that can be looked up, since their hashes are consistent with their equality
+  value_types = (ObjNull, ObjBool, ObjInt, ObjFloat, ObjString, ObjDate)
+
+  # Constructor
+  def __init__(self, table, name):
+    self.table = table
+    self.name = name
+
+    # Define the version of the table the index was built at and the map of row indices by value
+    self.version = None
+    self.rows = None
+
+  # Return the map of row indices by value, or None if the rows can't be indexed
+  def build(self):
+    table, name = self.table, self.name
+    if (column := table.columns.get(name)) is None or not all(type(entry) is Shape and name in entry.fields for entry in table.rows):
+      return None
+
+    # Group the rows of a dictionary-encoded column by their code before decoding
+    if isinstance(column, DictionaryColumn):
+      codes = {}
+      for row, code in enumerate(column.data):
+        codes.setdefault(code, []).append(row)
+      return {column.decode(code): rows for code, rows in codes.items()}
+
+    rows = {}
+    try:
+      for row in range(len(table.rows)):
+        rows.setdefault(column.get(row), []).append(row)
+    except TypeError:
+      return None
+    return rows
+
+  # Return if the index is built and up to date with the rows of the table, so it can be updated along with them
+  def current(self):
+    return self.rows is not None and self.version == self.table.version
+
+  # Add a row to the index after it is stored, or discard the index if the row can't be indexed
+  def add(self, row):
+    table, name = self.table, self.name
+    if type(entry := table.rows[row]) is Shape and name in entry.fields:
+      try:
+        bisect.insort(self.rows.setdefault(table.columns[name].get(row), []), row)
+        self.version = table.version
+        return
+      except TypeError:
+        pass
+    self.rows = None
+
+  # Remove a row from the index before it is changed or deleted
+  def remove(self, row):
+    value = self.table.columns[self.name].get(row)
+    rows = self.rows[value]
+    del rows[bisect.bisect_left(rows, row)]
+    if not rows:
+      del self.rows[value]
+
+  # Shift the indices of the rows after a row that is deleted from the table
+  def shift(self, row):
+    for rows in self.rows.values():
+      if rows[-1] > row:
+        position = bisect.bisect_right(rows, row)
+        rows[position:] = [index - 1 for index in rows[position:]]
+    self.version = self.table.version
+
+  # Move the rows to their new indices after the rows of the table are reordered, given the new index of every
+  # previous row index
+  def reorder(self, indices):
+    for value, rows in self.rows.items():
+      self.rows[value] = sorted(indices[row] for row in rows)
+    self.version = self.table.version
+
+  # Mark the index as up to date after a change of the table that didn't change the field
+  def sync(self):
+    self.version = self.table.version
+
+  # Return the sorted indices of the rows with a value equal to any of the specified values, or None if the index
+  # can't be used for the rows or the values
+  def lookup(self, *values):
+    if self.version != self.table.version:
+      self.rows = self.build()
+      self.version = self.table.version
+    if self.rows is None or not all(type(value) in self.value_types for value in values):
+      return None
+
+    if len(values) == 1:
+      return list(self.rows.get(values[0], ()))
+    return sorted({row for value in values for row in self.rows.get(value, ())})
+
+
+#############################################
+### Definition of the trigram index class ###
+#############################################
+
+# Class that defines a trigram index from the sequences of three characters in the values of a string field to the
+# indices of the rows with a value containing them, which prefilters the rows that can contain a literal string.
+# Values are folded to lowercase one character at a time, with the characters that case-insensitive regexes match
+# to ASCII letters folded to those letters, so the candidates of a literal include every row that contains it in any
+# case. Folding whole strings with str.lower() would depend on the context of a character, like the final form of a
+# sigma, and miss rows that contain a literal that is folded in another context.
+class TrigramIndex:
+  # Class that defines the translation of characters to their folded form, which lowercases and stores the
+  # characters that are not translated yet
+  class Folding(dict):
+    # Return the folded form of a character that is not translated yet
+    def __missing__(self, char):
+      folded = self[char] = chr(char).lower()
+      return folded
+
+  # The translation of characters, starting with the non-ASCII characters that match ASCII letters in
+  # case-insensitive regexes
+  folding = Folding({0x130: 'i', 0x131: 'i', 0x17f: 's', 0x212a: 'k'})
+
+  # Constructor
+  def __init__(self, table, name):
+    self.table = table
+    self.name = name
+
+    # Define the version of the table the index was built at and the map of row indices by trigram
+    self.version = None
+    self.rows = None
+
+  # Return the folded form of a string
+  @classmethod
+  def fold(cls, string):
+    return string.lower() if string.isascii() else string.translate(cls.folding)
+
+  # Return the map of row indices by trigram, or None if the rows can't be indexed
+  def build(self):
+    table, name = self.table, self.name
+    if not isinstance(column := table.columns.get(name), (TextColumn, DictionaryColumn)) or not all(type(entry) is Shape and name in entry.fields for entry in table.rows):
+      return None
+
+    # Group the rows by their folded value first, since values like descriptions are often repeated
+    strings = {}
+    for row in range(len(table.rows)):
+      strings.setdefault(self.fold(column.key(row)), []).append(row)
+
+    rows = {}
+    for string, string_rows in strings.items():
+      for trigram in set(map(''.join, zip(string, string[1:], string[2:]))):
+        if (trigram_rows := rows.get(trigram)) is None:
+          trigram_rows = rows[trigram] = array('i')
+        trigram_rows.extend(string_rows)
+    return rows
+
+  # Return the sorted indices of the rows that can contain all of the specified literals, or None if the index
+  # can't be used for the rows or the literals don't contain a trigram
+  def lookup(self, literals):
+    if self.version != self.table.version:
+      self.rows = self.build()
+      self.version = self.table.version
+    trigrams = {''.join(trigram) for string in map(self.fold, literals) for trigram in zip(string, string[1:], string[2:])}
+    if self.rows is None or not trigrams:
+      return None
+
+    # Intersect the rows of the trigrams, starting with the trigram with the fewest rows
+    trigram_rows = sorted((self.rows.get(trigram, ()) for trigram in trigrams), key = len)
+    rows = set(trigram_rows[0])
+    for other_rows in trigram_rows[1:]:
+      if not rows:
+        break
+      rows.intersection_update(other_rows)
+    return sorted(rows)
+
+
+##################################################
+### Definition of the row view shape functions ###
+##################################################
+
+# The map of getters and setters of row views by field name
+row_accessors = {}
+
+# The map of row view shapes by the shape of the record they store
+row_shapes = {}
+
+# Return the getter and setter of a field of row views, which are shared between shapes
+def row_accessor(name):
+  if (accessor := row_accessors.get(name)) is None:
+    accessor = row_accessors[name] = (lambda row: row.table.columns[name].get(row.index), lambda row, value: row.table.update(name, row.index, value))
+  return accessor
+
+# Return the shape of row views that store a record with the specified shape
+def row_shape(shape):
+  if (view_shape := row_shapes.get(shape)) is None:
+    view_shape = ObjRecord.empty_shape
+    for name, field in shape.fields.items():
+      getter, setter = row_accessor(name)
+      mutable = field.mutable if isinstance(field, ValueField) else field.setter is not None
+      view_shape = view_shape.with_delegate_field(name, getter, setter if mutable else None, field.public, field.options)
+    row_shapes[shape] = row_shapes[view_shape] = view_shape
+  return view_shape
+
+
+######################################################
+### Definition of the transaction row object class ###
+######################################################
+
+# Class that defines a view of a transaction that is stored in a row of a table
+class ObjTransactionRow(ObjTransaction, typename = "Transaction"):
+  # Constructor
+  def __init__(self, table, index, shape):
+    super(ObjRecord, self).__setattr__('shape', shape)
+    super(ObjRecord, self).__setattr__('values', [])
+    super(ObjRecord, self).__setattr__('table', table)
+    super(ObjRecord, self).__setattr__('index', index)
+
+
+  # Return the Python representation for this object
+  def __repr__(self):
+    return f"{self.__class__.__name__}({self.table.__class__.__name__}(), {self.index!r})"
+
+
+#################################################
+### Definition of the transaction table class ###
+#################################################
+
+# Class that defines a list of transactions that stores the fields of the transactions in columns
+#
+# Transactions are stored as a row in every column, where the shape of the row determines which fields the
+# row has; other items are stored as they are. Rows are only materialized as a view when they are accessed,
+# and views that are still alive are kept up to date when rows are moved, or detached when rows are deleted.
+class ObjTable(ObjList, typename = "List"):
+  # The names of string fields that are mostly distinct and therefore not dictionary-encoded
+  text_fields = {'id', 'description'}
+
+  # The amount of tracked row views after which the views that are no longer alive are forgotten
+  views_limit = 1024
+
+  # Constructor
+  def __init__(self, *items):
+    super(ObjList, self).__init__()
+
+    # Define the map of columns by field name and the list of row shapes or items that are not stored in columns
+    self.columns = {}
+    self.rows = []
+
+    # Define the map of weak references to row views by row index
+    self.views = {}
+
+    # Define the version of the rows, which changes on every modification, and if the rows are sorted by date at a version
+    self.version = 0
+    self.date_sorted = (None, False)
+
+    # Define the maps of hash indexes and trigram indexes by field name
+    self.indexes = {}
+    self.trigram_indexes = {}
+
+    self.insert_all(items)
+
+  # Return the items in the table as a list
+  @property
+  def items(self):
+    return [self.get_item_at(index) for index in range(len(self.rows))]
+
+
+  # Return the column of a field, creating it for the first value if it doesn't exist yet
+  def column(self, name, value):
+    if (column := self.columns.get(name)) is None:
+      if type(value) is ObjString:
+        column = TextColumn() if name in self.text_fields else DictionaryColumn()
+      elif type(value) is ObjDate:
+        column = DateColumn()
+      elif type(value) is ObjMoney:
+        column = MoneyColumn()
+      else:
+        column = Column()
+      for row in self.rows:
+        column.append_missing()
+      self.columns[name] = column
+    return column
+
+  # Read the value of a field of a row
+  def read(self, name, index):
+    return self.columns[name].get(index)
+
+  # Write the value of a field of a row, storing the column as plain values if the value can't be encoded
+  def write(self, name, index, value):
+    self.version += 1
+    column = self.column(name, value)
+    if not column.accepts(value):
+      rows = self.rows
+      column = self.columns[name] = Column([column.get(row) if type(rows[row]) is Shape and name in rows[row].fields else None for row in range(len(rows))])
+    column.set(index, value)
+
+  # Write the value of a field of a row and update the hash indexes
+  def update(self, name, index, value):
+    indexes = self.current_indexes()
+    for hash_index in indexes:
+      if hash_index.name == name:
+        hash_index.remove(index)
+    self.write(name, index, value)
+    for hash_index in indexes:
+      if hash_index.name == name:
+        hash_index.add(index)
+      else:
+        hash_index.sync()
+
+  # Return the row shape or item to store for an item
+  def entry(self, item):
+    return row_shape(item.shape) if isinstance(item, ObjTransaction) else item
+
+  # Store an item in a row of the table
+  def store(self, index, item):
+    self.version += 1
+    self.rows[index] = entry = self.entry(item)
+    if type(entry) is Shape:
+      for name, field in item.shape.fields.items():
+        self.write(name, index, field.get(item))
+
+  # Return the native sort keys of all rows, or None if a row can't be compared natively
+  def sort_keys(self):
+    dates, ids = self.columns.get('date', DateColumn()), self.columns.get('id', TextColumn())
+    if not isinstance(dates, DateColumn) or not isinstance(ids, (TextColumn, DictionaryColumn)):
+      return None
+    for entry in self.rows:
+      if type(entry) is not Shape or 'date' not in entry.fields or 'id' not in entry.fields:
+        return None
+    return [(dates.key(row), ids.key(row)) for row in range(len(self.rows))]
+
+  # Return if all rows of the table are stored in columns and sorted by their date
+  def sorted_by_date(self):
+    if self.date_sorted[0] != self.version:
+      dates = self.columns.get('date')
+      if isinstance(dates, DateColumn) and all(type(entry) is Shape and 'date' in entry.fields for entry in self.rows):
+        self.date_sorted = (self.version, all(map(operator.le, dates.data, itertools.islice(dates.data, 1, None))))
+      else:
+        self.date_sorted = (self.version, False)
+    return self.date_sorted[1]
+
+  # Return the start and stop index of the rows with a date ordinal in the specified range, or None if the rows
+  # are not sorted by date; a bound of None leaves that side of the range open
+  def date_range(self, start = None, stop = None):
+    if not self.sorted_by_date():
+      return None
+    dates = self.columns['date'].data
+    start_index = bisect.bisect_left(dates, start) if start is not None else 0
+    stop_index = bisect.bisect_left(dates, stop) if stop is not None else len(dates)
+    return (start_index, max(start_index, stop_index))
+
+  # Return an iterable over the rows of the table in the specified range
+  def slice(self, start, stop):
+    return ObjTableRangeIterator(self, start, stop).delegate()
+
+  # Return an iterable over the rows of the table at the specified sorted row indices
+  def select_rows(self, rows):
+    return ObjTableRowsIterator(self, rows).delegate()
+
+  # Return the hash indexes that are up to date with the rows of the table, which are updated along with them
+  def current_indexes(self):
+    return [index for index in self.indexes.values() if index.current()]
+
+  # Create a hash index or a trigram index on a field of the rows of the table
+  def create_index(self, name, kind = 'hash'):
+    if kind == 'hash':
+      if name not in self.indexes:
+        self.indexes[name] = HashIndex(self, name)
+    elif kind == 'trigram':
+      if name not in self.trigram_indexes:
+        self.trigram_indexes[name] = TrigramIndex(self, name)
+    else:
+      raise InvalidValueException(f"Undefined index kind '{kind}'")
+    return self
+
+  def method_createIndex(self, name: 'ObjString', kind: 'ObjString' = None) -> 'ObjTable':
+    return self.create_index(name.value, kind.value if kind is not None else 'hash')
+
+  # Return the sorted indices of the rows with a field equal to any of the specified values using the index on the
+  # field, or None if the field has no usable index
+  def lookup(self, name, *values):
+    if (index := self.indexes.get(name)) is None:
+      return None
+    return index.lookup(*values)
+
+  # Return the sorted indices of the rows with a string field that can contain all of the specified literals using
+  # the trigram index on the field, or None if the field has no usable trigram index
+  def search(self, name, literals):
+    if (index := self.trigram_indexes.get(name)) is None:
+      return None
+    return index.lookup(literals)
+
+  # Reorder the rows of the table by a list of previous row indices
+  def reorder(self, order):
+    indexes = self.current_indexes()
+    self.version += 1
+    for column in self.columns.values():
+      column.reorder(order)
+    self.rows = [self.rows[row] for row in order]
+
+    # Move the rows in the hash indexes to their new indices
+    if indexes:
+      indices = [0] * len(order)
+      for index, row in enumerate(order):
+        indices[row] = index
+      for hash_index in indexes:
+        hash_index.reorder(indices)
+
+    # Move the alive views to their new rows
+    if views := self.alive_views():
+      indices = {row: index for index, row in enumerate(order)}
+      for view in views:
+        view.index = indices[view.index]
+      self.track_views(views)
+
+  # Detach the alive view of a row from the table by copying its fields into a table of its own
+  def detach(self, index):
+    if (ref := self.views.pop(index, None)) is not None and (view := ref()) is not None:
+      table = ObjTable()
+      table.rows.append(self.rows[index])
+      for name in view.shape.fields:
+        table.write(name, 0, self.read(name, index))
+      view.table = table
+      view.index = 0
+      table.track_views([view])
+
+  # Return the row views of the table that are still alive
+  def alive_views(self):
+    return [view for ref in self.views.values() if (view := ref()) is not None]
+
+  # Track the specified row views by their row index
+  def track_views(self, views):
+    self.views = {view.index: weakref.ref(view) for view in views}
+    self.views_limit = max(ObjTable.views_limit, 2 * len(self.views))
+
+
+  # Get an item in the table
+  def get_item_at(self, index):
+    if index < 0:
+      index += len(self.rows)
+    if not 0 <= index < len(self.rows):
+      raise UndefinedIndexException(index)
+
+    entry = self.rows[index]
+    if type(entry) is not Shape:
+      return entry
+    if (ref := self.views.get(index)) is None or (view := ref()) is None:
+      view = ObjTransactionRow(self, index, entry)
+      self.views[index] = weakref.ref(view)
+      if len(self.views) > self.views_limit:
+        self.track_views(self.alive_views())
+    return view
+
+  # Set an item in the table
+  def set_item_at(self, index, value):
+    if index < 0:
+      index += len(self.rows)
+    if not 0 <= index < len(self.rows):
+      raise UndefinedIndexException(index)
+
+    indexes = self.current_indexes()
+    for hash_index in indexes:
+      hash_index.remove(index)
+    self.detach(index)
+    self.store(index, value)
+    for hash_index in indexes:
+      hash_index.add(index)
+
+  # Delete an item from the table
+  def delete_item_at(self, index):
+    if index < 0:
+      index += len(self.rows)
+    if not 0 <= index < len(self.rows):
+      raise UndefinedIndexException(index)
+
+    indexes = self.current_indexes()
+    for hash_index in indexes:
+      hash_index.remove(index)
+
+    self.version += 1
+    self.detach(index)
+    for column in self.columns.values():
+      column.delete(index)
+    del self.rows[index]
+    for hash_index in indexes:
+      hash_index.shift(index)
+
+    # Move the alive views after the deleted row
+    if views := self.alive_views():
+      for view in views:
+        if view.index > index:
+          view.index -= 1
+      self.track_views(views)
+
+
+  # Return the bool representation of this object
+  def __bool__(self):
+    return bool(self.rows)
+
+  # Add an item to the table
+  def insert(self, item):
+    indexes = self.current_indexes()
+    index = len(self.rows)
+    self.rows.append(None)
+    for column in self.columns.values():
+      column.append_missing()
+    self.store(index, item)
+    for hash_index in indexes:
+      hash_index.add(index)
+
+  # Add an item to the table and sort it in place
+  def insort(self, item):
+    low, high = 0, len(self.rows)
+    while low < high:
+      middle = (low + high) // 2
+      if item < self.get_item_at(middle):
+        high = middle
+      else:
+        low = middle + 1
+
+    self.insert(item)
+    if low < len(self.rows) - 1:
+      self.reorder([*range(low), len(self.rows) - 1, *range(low, len(self.rows) - 1)])
+
+  # Add several items to the table and sort them in place
+  def insort_all(self, list):
+    items = [*list]
+
+    # Check if the existing rows are sorted by their native keys and the items have native keys as well
+    keys = self.sort_keys()
+    if keys is None or any(keys[index] > keys[index + 1] for index in range(len(keys) - 1)) or not all(map(self.has_sort_key, items)):
+      for item in items:
+        self.insort(item)
+      return
+
+    # Add the items and sort all rows by their native keys, which has the same result as adding the items one
+    # by one, since the existing rows are sorted and the sort is stable
+    self.insert_all(items)
+    keys = self.sort_keys()
+    self.reorder(sorted(range(len(keys)), key = keys.__getitem__))
+
+  # Return if an item has a native sort key when stored in the table
+  def has_sort_key(self, item):
+    return isinstance(item, ObjTransaction) and type(item.get_field_or('date')) is ObjDate and type(item.get_field_or('id')) is ObjString
+
+  # Delete an item from the table
+  def delete(self, item):
+    for index in range(len(self.rows)):
+      if self.get_item_at(index) == item:
+        self.delete_item_at(index)
+        return
+
+  # Return if the table contains the specified item, looking up transactions by their id if the table has an index on it
+  def __contains__(self, item):
+    if isinstance(item, ObjTransaction) and (rows := self.lookup('id', item.get_field_or('id'))) is not None:
+      return bool(rows)
+    return any(self.get_item_at(index) == item for index in range(len(self.rows)))
+
+  # Return the length of the table
+  def __len__(self):
+    return len(self.rows)
+
+
+###########################################################
+### Definition of the table range iterator object class ###
+###########################################################
+
+# Iterator over a contiguous range of rows in a table, which shrinks when rows in the range are deleted
+class ObjTableRangeIterator(ObjListIterator, typename = "ListIterator"):
+  # Constructor
+  def __init__(self, list, start, stop):
+    super().__init__(list)
+
+    self.start = start
+    self.stop = stop
+
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    if self.list_index is None:
+      self.list_index = self.start
+    elif self.list_deleted:
+      self.list_deleted = False
+    else:
+      self.list_index += 1
+    return self.list_index < min(self.stop, len(self.list))
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    super().delete()
+    self.stop -= 1
+
+
+##########################################################
+### Definition of the table rows iterator object class ###
+##########################################################
+
+# Iterator over the rows of a table at a list of sorted row indices, which are shifted when rows are deleted
+class ObjTableRowsIterator(ObjListIterator, typename = "ListIterator"):
+  # Constructor
+  def __init__(self, list, rows):
+    super().__init__(list)
+
+    self.rows = rows
+    self.rows_index = None
+
+
+  # Advance the cursor of the iterator object
+  def advance(self):
+    if self.list_index is None:
+      self.rows_index = 0
+    elif self.list_deleted:
+      self.list_deleted = False
+    else:
+      self.rows_index += 1
+
+    if self.rows_index < len(self.rows):
+      self.list_index = self.rows[self.rows_index]
+      return True
+    self.list_index = len(self.list)
+    return False
+
+  # Delete the element at the cursor of the iterator object
+  def delete(self):
+    super().delete()
+    del self.rows[self.rows_index]
+    self.rows[self.rows_index:] = [row - 1 for row in self.rows[self.rows_index:]]
+
+
+###############################################
+### Definition of functions to index tables ###
+###############################################
+
+# Create a hash index or a trigram index on a field of the rows of a table
+def create_index(table: 'ObjList', name: 'ObjString', kind: 'ObjString' = None) -> 'ObjList':
+  if not isinstance(table, ObjTable):
+    raise InvalidTypeException("Function 'createIndex' does not support lists that are not stored as a table")
+  return table.create_index(name.value, kind.value if kind is not None else 'hash')
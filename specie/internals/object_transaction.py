@@ -13,14 +13,14 @@ class ObjTransaction(ObjRecord, typename = "Transaction"):
   # Constructor
   def __init__(self):
     super().__init__()
-    self.declare_field('id', ObjString(), public = False)
-    self.declare_field('source', ObjString(), public = False)
+    self.declare_field('id', ObjString.intern(''), public = False)
+    self.declare_field('source', ObjString.intern(''), public = False)
     self.declare_field('date', ObjDate())
     self.declare_field('amount', ObjMoney(ObjString('EUR')), options = FieldOptions.FORMAT_ALIGN_RIGHT)
-    self.declare_field('label', ObjString())
-    self.declare_field('name', ObjString())
-    self.declare_field('address', ObjString())
-    self.declare_field('description', ObjString(), options = FieldOptions.FORMAT_ELLIPSIS)
+    self.declare_field('label', ObjString.intern(''))
+    self.declare_field('name', ObjString.intern(''))
+    self.declare_field('address', ObjString.intern(''))
+    self.declare_field('description', ObjString.intern(''), options = FieldOptions.FORMAT_ELLIPSIS)
 
 
   # Return if this transaction object is equal to another object
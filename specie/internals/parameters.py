@@ -59,6 +59,9 @@ class Parameters:
   def __init__(self, *parameters):
     self.parameters = list(parameters)
 
+    # The function that binds an argument list to this parameter list, which is compiled on the first validation
+    self.binder = None
+
   # Return an iterator for this parameter list
   def __iter__(self):
     return iter(self.parameters)
@@ -110,49 +113,65 @@ class Parameters:
     else:
       return f"between {min_length} and {max_length}"
 
-  # Validate an argument list against this parameter list and map it to a proper list
+  # Validate an argument list against this parameter list and map it to a tuple of arguments
   def validate(self, args, location = None):
-    from .object_list import ObjList
-
-    # Check the length of the arguments
-    args_length = len(args)
-    if args_length < self.min_length() or args_length > self.max_length():
-      raise InvalidCallException(f"Expected {self.format_length()} arguments, got {args_length}", location)
+    if self.binder is None:
+      self.binder = self.compile_binder()
+    return self.binder(args, location)
 
-    # Create a list to store the mapped arguments
-    args_list = []
-
-    # Iterate over the parameters
-    for i, param in enumerate(self.parameters):
-      # Check if an argument for this parameter exists
-      if i < len(args):
-        # Yes, so go get the argument
-        arg = args[i]
-
-        # Check the type of the argument
-        if not issubclass(check_type := type(arg), param_type := param.type):
-          raise InvalidCallException(f"Expected argument '{param.name}' of type {param_type}, got type {check_type}", location)
+  # Return a function that validates an argument list against this parameter list and maps it to a tuple of arguments
+  def compile_binder(self):
+    from .object_list import ObjList
 
-        # Add the argument to the list
-        if i == len(self.parameters) - 1 and param.is_variadic():
-          args_list.append(ObjList(arg))
-        else:
-          args_list.append(arg)
-      else:
-        # No, so this should be a optional or variadic parameter
-        if i == len(self.parameters) - 1 and param.is_variadic():
-          args_list.append(ObjList())
+    parameters = self.parameters
+    parameters_length = len(parameters)
+    min_length = self.min_length()
+    max_length = self.max_length()
+    variadic = self.has_variadic()
+    defaults = tuple(param.default for param in parameters)
+
+    # Set of tuples of argument types that passed the type check
+    checked_types = set()
+
+    # Check the types of the arguments
+    def check_types(args, location):
+      arg_types = tuple(type(arg) for arg in args[:parameters_length])
+      if arg_types not in checked_types:
+        for param, check_type in zip(parameters, arg_types):
+          if not issubclass(check_type, param_type := param.type):
+            raise InvalidCallException(f"Expected argument '{param.name}' of type {param_type}, got type {check_type}", location)
+        checked_types.add(arg_types)
+
+    # Binder for parameter lists without optional and variadic parameters
+    def bind_fixed(args, location):
+      args = tuple(args.items if isinstance(args, ObjList) else args)
+      if len(args) != parameters_length:
+        raise InvalidCallException(f"Expected {self.format_length()} arguments, got {len(args)}", location)
+
+      check_types(args, location)
+      return args
+
+    # Binder for parameter lists with optional or variadic parameters
+    def bind(args, location):
+      args = tuple(args.items if isinstance(args, ObjList) else args)
+      args_length = len(args)
+      if args_length < min_length or args_length > max_length:
+        raise InvalidCallException(f"Expected {self.format_length()} arguments, got {args_length}", location)
+
+      check_types(args, location)
+
+      # Collect the remaining arguments in the last variadic parameter
+      if variadic:
+        if args_length >= parameters_length:
+          return (*args[:parameters_length - 1], ObjList(*args[parameters_length - 1:]))
         else:
-          args_list.append(param.default)
+          return (*args, *defaults[args_length:parameters_length - 1], ObjList())
 
-    # Check if there are arguments left
-    if self.has_variadic() and len(self.parameters) < len(args):
-      # Add the remaining arguments to the last variadic argument
-      for i in range(len(self.parameters), len(args)):
-        args_list[-1].insert(args[i])
+      # Substitute the missing arguments by their defaults
+      else:
+        return (*args, *defaults[args_length:])
 
-    # Return the list as a list object
-    return ObjList(*args_list)
+    return bind_fixed if min_length == max_length and not variadic else bind
 
   # Return the string representation for this parameter
   def __str__(self):
@@ -1,26 +1,39 @@
 import os.path
+import weakref
 
 from colorama import Fore, Back, Style
 
-from . import ast, grammar, internals, output, parser, query, semantics
+from . import ast, cache, compiler, grammar, internals, output, parser, query, semantics
 
 
 #####################################
 ### Definition of the environment ###
 #####################################
 
+# Singleton class that defines the value of a slot of a variable that is not declared yet
+class Undeclared:
+  pass
+
+
 # Class that defines an environment
+#
+# The global environment stores its variables by name in a record. Other environments are frames that store their
+# variables in slots, which are assigned by the resolver, but can also be accessed by name as a fallback.
 class Environment:
   # Constructor
   def __init__(self, previous = None, variables = None):
     self.previous = previous
-    self.variables = variables or internals.ObjRecord()
+    self.variables = variables
+
+    # Define the slots of the variables and the map of slots by variable name
+    self.slots = []
+    self.names = {}
 
   # Get a variable in the environment
   def __getitem__(self, name):
     # Get a variable from the current environment
-    if self.variables.has_field(name):
-      return self.variables.get_field(name)
+    if self.has_name(name):
+      return self.get_name(name)
 
     # Get a variable from the previous environment
     elif self.previous is not None:
@@ -33,8 +46,8 @@ class Environment:
   # Set a variable in the environment
   def __setitem__(self, name, value):
     # Set a variable in the current environment
-    if self.variables.has_field(name):
-      self.variables.set_field(name, value)
+    if self.has_name(name):
+      self.set_name(name, value)
 
     # Get a variable from the previous environment
     elif self.previous is not None:
@@ -47,7 +60,7 @@ class Environment:
   # Return is a variable exists in the environment
   def __contains__(self, name):
     # Check the current environment
-    if self.variables.has_field():
+    if self.has_name(name):
       return True
 
     # Check the previous environment
@@ -59,8 +72,14 @@ class Environment:
       return False
 
   # Set a varable in the CURRENT environmentn
-  def declare(self, name, value):
-    self.variables.declare_field(name, value)
+  def declare(self, name, value, location = None, **kwargs):
+    if self.variables is not None:
+      self.variables.declare_field(name, value, location = location, **kwargs)
+    elif name not in self.names:
+      self.names[name] = len(self.slots)
+      self.slots.append(value)
+    else:
+      raise internals.RuntimeException(f"The field {name} already exists", location)
 
   # Create a nested environment with this environment as previous environment
   def nested(self):
@@ -73,36 +92,97 @@ class Environment:
       environment = environment.previous
     return environment
 
+
+  # Return if the CURRENT environment contains a variable with the specified name
+  def has_name(self, name):
+    if self.variables is not None:
+      return self.variables.has_field(name)
+    else:
+      return name in self.names
+
+  # Get a variable in the CURRENT environment by name
+  def get_name(self, name, location = None):
+    if self.variables is not None:
+      return self.variables.get_field(name, location)
+    elif (slot := self.names.get(name)) is not None:
+      return self.slots[slot]
+    else:
+      raise internals.UndefinedFieldException(name, location)
+
+  # Set a variable in the CURRENT environment by name
+  def set_name(self, name, value, location = None):
+    if self.variables is not None:
+      self.variables.set_field(name, value, location)
+    elif (slot := self.names.get(name)) is not None:
+      self.slots[slot] = value
+    else:
+      raise internals.UndefinedFieldException(name, location)
+
+
   # Get a variable in the environment by means of a lexer token
   def get_variable(self, name, distance = 0):
-    try:
-      if distance == 0:
-        return self.variables.get_field(name.value, name.location)
-      else:
-        return self.ancestor(distance).variables.get_field(name.value, name.location)
-    except KeyError:
-      raise internals.UndefinedFieldException(f"{name.value}", name.location)
+    return self.ancestor(distance).get_name(name.value, name.location)
 
   # Set a variable in the environment by means of a lexer token
   def set_variable(self, name, value, distance = 0):
-    try:
-      if distance == 0:
-        self.variables.set_field(name.value, value, name.location)
-      else:
-        self.ancestor(distance).variables.set_field(name.value, value, name.location)
-    except KeyError:
-      raise internals.UndefinedFieldException(name.value, name.location)
+    self.ancestor(distance).set_name(name.value, value, name.location)
 
   # Return if the environment contains the specified variable
   def has_variable(self, name, distance = 0):
-    if distance == 0:
-      return self.variables.has_field(name.value)
-    else:
-      return self.ancestor(distance).variables.has_field(name.value)
+    return self.ancestor(distance).has_name(name.value)
 
   # Declare a varable in the CURRENT environment by means of a lexer token
   def declare_variable(self, name, value, **kwargs):
-    self.variables.declare_field(name.value, value, **kwargs)
+    self.declare(name.value, value, name.location, **kwargs)
+
+
+  # Get a variable in the environment by means of a lexer token and the slot assigned by the resolver
+  def get_slot(self, name, distance, slot):
+    environment = self
+    for _ in range(distance):
+      environment = environment.previous
+
+    # Fall back to the name of the variable if the slot is not declared
+    slots = environment.slots
+    if slot < len(slots) and (value := slots[slot]) is not Undeclared:
+      return value
+    return environment.get_name(name.value, name.location)
+
+  # Set a variable in the environment by means of a lexer token and the slot assigned by the resolver
+  def set_slot(self, name, value, distance, slot):
+    environment = self
+    for _ in range(distance):
+      environment = environment.previous
+
+    # Fall back to the name of the variable if the slot is not declared
+    slots = environment.slots
+    if slot < len(slots) and slots[slot] is not Undeclared:
+      slots[slot] = value
+    else:
+      environment.set_name(name.value, value, name.location)
+
+  # Return if the environment contains the specified variable by means of a lexer token and the slot assigned by the resolver
+  def has_slot(self, name, distance, slot):
+    environment = self
+    for _ in range(distance):
+      environment = environment.previous
+
+    # Fall back to the name of the variable if the slot is not declared
+    slots = environment.slots
+    if slot < len(slots) and slots[slot] is not Undeclared:
+      return True
+    return environment.has_name(name.value)
+
+  # Declare a variable in the CURRENT environment by means of a lexer token and the slot assigned by the resolver
+  def declare_slot(self, name, value, slot):
+    if self.variables is not None:
+      self.variables.declare_field(name.value, value, location = name.location)
+    else:
+      if slot >= len(self.slots):
+        self.slots.extend([Undeclared] * (slot + 1 - len(self.slots)))
+      self.slots[slot] = value
+      self.names[name.value] = slot
+
 
   # Return an iterator over this environment and its ancestors
   def __iter__(self):
@@ -112,7 +192,7 @@ class Environment:
 
   # Convert to string
   def __str__(self):
-    string = '(' + ', '.join(self.variables.names()) + ')'
+    string = '(' + ', '.join(self.variables.names() if self.variables is not None else self.names) + ')'
     if self.previous is not None:
       string += " -> " + str(self.previous)
     return string
@@ -135,12 +215,13 @@ class Environment:
     globals.declare_field('print', internals.ObjPyCallable(output.print_object), mutable = False)
     globals.declare_field('printTitle', internals.ObjPyCallable(output.title), mutable = False)
     globals.declare_field('include', internals.ObjPyCallable(interpreter.include), mutable = False)
+    globals.declare_field('createIndex', internals.ObjPyCallable(internals.create_index), mutable = False)
 
     # Namespaces
     globals.declare_field('import', internals.namespace_import(interpreter), mutable = False)
 
     # Tables
-    globals.declare_field('_', internals.ObjList())
+    globals.declare_field('_', internals.ObjTable())
 
     return cls(None, globals)
 
@@ -152,7 +233,7 @@ class Environment:
 # Class that defines an interpreter
 class Interpreter(ast.ExprVisitor[internals.Obj]):
   # Constructor
-  def __init__(self):
+  def __init__(self, compiled = True):
     # Define the environment
     self.globals = Environment.globals(self)
     self.environment = self.globals
@@ -160,12 +241,19 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     # Define the include stack; the first file is the interactive console
     self.includes = [None]
 
-    # Define the map of local variables
-    self.locals = {}
+    # Define the map of local variables, which maps variable expressions to their distance and slot and declarations to their slot,
+    # and only keeps the expressions that are still in use
+    self.locals = weakref.WeakKeyDictionary()
+
+    # Define the cache of parsed include files
+    self.modules = cache.ModuleCache()
 
     # Define the static analyzers
     self.resolver = semantics.Resolver(self)
 
+    # Define the compiler if expressions are evaluated as compiled closures instead of by visiting them
+    self.compiler = compiler.Compiler(self) if compiled else None
+
   # Parse a string into an abstract syntax tree and interpret it
   def execute(self, string, is_module = True):
     # Check if the string is empty
@@ -174,15 +262,18 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
 
     # Parse and interpret the string
     try:
-      # Parse the string into an abstract syntax tree
-      ast = grammar.parse(string, is_module)
+      # Parse the string into an abstract syntax tree, using the cache if the string is the contents of an include file
+      if is_module and (include := self.includes[-1]):
+        ast = self.modules.parse(include, string)
+      else:
+        ast = grammar.parse(string, is_module)
 
       # Semantically analyse the tree
       self.resolver.resolve(ast)
 
       # Interpret the abstract syntax tree
       result = self.evaluate(ast)
-      if not self.includes[-1] and result != internals.ObjNull():
+      if not self.includes[-1] and result is not internals.ObjNull():
         output.print_object(result)
 
       # Return the result
@@ -247,7 +338,10 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
 
   # Evaluate an expression
   def evaluate(self, expr: ast.Expr) -> internals.Obj:
-    return expr.accept(self)
+    if self.compiler is not None:
+      return self.compiler.compile(expr)()
+    else:
+      return expr.accept(self)
 
   # Evaluate an expression with the given environment
   def evaluate_with(self, environment: Environment, *exprs: ast.Expr) -> internals.Obj:
@@ -266,6 +360,24 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     # Return the result
     return result
 
+  # Call a query function on an iterable with the given environment
+  def call_query_with(self, environment: Environment, function, variable, iterable: internals.ObjIterable) -> internals.Obj:
+    previous = self.environment
+    self.environment = environment
+    try:
+      return function.call(self, variable, iterable)
+    finally:
+      self.environment = previous
+
+  # Return the result of calling a query function on an iterable, which is a lazy list if the result is iterable,
+  # so that it is only evaluated when it is needed and every pass is evaluated in the current environment
+  def query_result(self, function, variable, iterable: internals.ObjIterable) -> internals.Obj:
+    result = function.call(self, variable, iterable)
+    if isinstance(result, internals.ObjIterable):
+      environment = self.environment
+      return internals.ObjLazyList(result, lambda: self.call_query_with(environment, function, variable, iterable))
+    return result
+
   # Visit a literal expression
   def visit_literal_expr(self, expr: ast.LiteralExpr) -> internals.Obj:
     return expr.object
@@ -274,23 +386,32 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
   def visit_list_expr(self, expr: ast.ListExpr) -> internals.Obj:
     list_object = internals.ObjList()
     for item in expr:
-      list_object.insert(self.evaluate(item))
+      # Evaluate the item, materializing it if it is a lazy list, so it doesn't change with its source anymore
+      value = self.evaluate(item)
+      if type(value) is internals.ObjLazyList:
+        value.materialize()
+      list_object.insert(value)
     return list_object
 
   # Visit a record expression
   def visit_record_expr(self, expr: ast.RecordExpr) -> internals.Obj:
     record_object = internals.ObjRecord()
     for name, value in expr:
-      record_object.declare_field(name.value, self.evaluate(value), name.location)
+      # Evaluate the value of the field, materializing it if it is a lazy list, so it doesn't change with its source
+      # anymore
+      field_value = self.evaluate(value)
+      if type(field_value) is internals.ObjLazyList:
+        field_value.materialize()
+      record_object.declare_field(name.value, field_value, name.location)
     return record_object
 
   # Visit a variable expression
   def visit_variable_expr(self, expr: ast.VariableExpr) -> internals.Obj:
-    # Get the distance of the local variable, or otherwise assume it's global
-    distance = self.locals.get(expr)
-    if distance is not None:
+    # Get the distance and slot of the local variable, or otherwise assume it's global
+    local = self.locals.get(expr)
+    if local is not None:
       # Get a local variable
-      return self.environment.get_variable(expr.name, distance)
+      return self.environment.get_slot(expr.name, *local)
     else:
       # Get a global variable
       return self.globals.get_variable(expr.name)
@@ -308,7 +429,8 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     if not isinstance(callable, internals.ObjCallable):
       raise internals.RuntimeException(f"The expression '{expr.expression}' is not callable", expr.token.location)
 
-    # Evaluate the arguments and validate them
+    # Evaluate the arguments, which materializes the lazy lists among them like the items of any list, and validate
+    # them
     args = self.evaluate(expr.args)
     args = callable.parameters().validate(args)
 
@@ -344,6 +466,10 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     # Evaluate the value
     value = self.evaluate(expr.value)
 
+    # Materialize the value if it is a lazy list, so it doesn't change with its source anymore
+    if type(value) is internals.ObjLazyList:
+      value.materialize()
+
     # Set the field of the record
     expression.set_field(expr.name.value, value)
 
@@ -475,11 +601,7 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
       raise internals.InvalidTypeException(f"{iterable} is not iterable")
 
     # Evaluate the function
-    result = expr.function.call(self, expr.variable.name.value, iterable)
-    if isinstance(result, internals.ObjIterable):
-      return result.as_list()
-    else:
-      return result
+    return self.query_result(expr.function, expr.variable.name.value, iterable)
 
   # Visit a function expression
   def visit_function_expr(self, expr: ast.FunctionExpr) -> internals.Obj:
@@ -506,12 +628,16 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     # Evaluate the value
     value = self.evaluate(expr.value)
 
-    # Get the distance of the local variable, or otherwise assume it's global
-    distance = self.locals.get(expr)
-    if distance is not None:
+    # Materialize the value if it is a lazy list, so it doesn't change with its source anymore
+    if type(value) is internals.ObjLazyList:
+      value.materialize()
+
+    # Get the distance and slot of the local variable, or otherwise assume it's global
+    local = self.locals.get(expr)
+    if local is not None:
       # Set a local variable
-      if self.environment.has_variable(expr.name, distance):
-        self.environment.set_variable(expr.name, value, distance)
+      if self.environment.has_slot(expr.name, *local):
+        self.environment.set_slot(expr.name, value, *local)
       else:
         raise internals.RuntimeException(f"Variable '{expr.name.value}' does not exist in the current scope", expr.name.location)
 
@@ -530,9 +656,18 @@ class Interpreter(ast.ExprVisitor[internals.Obj]):
     # Evaluate the value
     value = self.evaluate(expr.value)
 
+    # Materialize the value if it is a lazy list, so it doesn't change with its source anymore
+    if type(value) is internals.ObjLazyList:
+      value.materialize()
+
+    # Get the slot of the local variable, or otherwise declare it by name
+    slot = self.locals.get(expr)
+
     # Declare the value and return it
-    if not self.environment.has_variable(expr.name):
+    if slot is None and not self.environment.has_variable(expr.name):
       self.environment.declare_variable(expr.name, value)
+    elif slot is not None and not self.environment.has_slot(expr.name, 0, slot):
+      self.environment.declare_slot(expr.name, value, slot)
     else:
       raise internals.RuntimeException(f"Variable '{expr.name.value}' already exists in the current scope", expr.name.location)
 
@@ -1,5 +1,3 @@
-import functools
-
 from rich import box
 from rich.console import Console
 from rich.table import Table
@@ -183,8 +181,9 @@ def print_list(list: 'ObjList'):
 
 # Print a table object
 def print_table(list: 'ObjList'):
-  # Get all fields
-  fields = functools.reduce(utils.distinct_append, ([name for name, field in record.fields.items() if field.public] for record in list), [])
+  # Get all fields from the distinct shapes of the records
+  shapes = utils.distinct(record.shape for record in list)
+  fields = utils.distinct(name for shape in shapes for name, field in shape.fields.items() if field.public)
 
   # Print the list in table form
   table = Table(box = box.SQUARE)
@@ -1,3 +1,4 @@
 from .combinators import *
+from .compiler import compile_grammar
 from .lexer import Rule, Location, Token, Lexer, LexerError, SyntaxError
 from .parser import Parser, ParserResult, ParserError
@@ -5,6 +5,15 @@ from .parser import Parser, ParserResult, ParserError
 
 # Class that defines a parser combinator
 class ParserCombinator(Parser):
+  # Constructor
+  def __init__(self, function, sync_tokens = None, *, kind = None, parsers = (), argument = None):
+    super().__init__(function, sync_tokens)
+
+    # The kind, sub-parsers and argument of the combinator, which are used when compiling a grammar
+    self.kind = kind
+    self.parsers = list(parsers)
+    self.argument = argument
+
   # a + b -> combine(a, b)
   def __add__(self, other):
     return combine(self, other)
@@ -45,7 +54,7 @@ def token(name):
       return ParserResult(tokens[index], index + 1)
     else:
       return ParserError.unexpected(tokens, index, name)
-  return ParserCombinator(parse_token)
+  return ParserCombinator(parse_token, kind = 'token', argument = name)
 
 
 # Return an empty result
@@ -53,7 +62,7 @@ def empty():
   @functools.wraps(empty)
   def parse_empty(tokens, index):
     return ParserResult(None, index)
-  return ParserCombinator(parse_empty)
+  return ParserCombinator(parse_empty, kind = 'empty')
 
 
 # Return the result of the lazy evaluation of the parser factory
@@ -61,7 +70,7 @@ def lazy(parser_factory):
   @functools.wraps(lazy)
   def parse_lazy(tokens, index):
     return parser_factory().parse(tokens, index)
-  return ParserCombinator(parse_lazy)
+  return ParserCombinator(parse_lazy, kind = 'lazy', argument = parser_factory)
 
 
 # Synchronize a parser after raising an error
@@ -78,7 +87,7 @@ def nofail(parser):
       return result
     else:
       raise result.errors[-1]
-  return ParserCombinator(parse_nofail)
+  return ParserCombinator(parse_nofail, kind = 'nofail', parsers = [parser])
 
 
 ### Definition of parser combinator functions ###
@@ -121,14 +130,14 @@ def map(function, parser):
       return ParserResult(function(result.value), result.index, result.errors)
     else:
       return result
-  return ParserCombinator(parse_map)
+  return ParserCombinator(parse_map, kind = 'map', parsers = [parser], argument = function)
 
 def map_value(value, parser):
   @functools.wraps(map_value)
   def parse_map_value(tokens, index):
     result = parser.parse(tokens, index)
     return ParserResult(value, result.index, result.errors)
-  return ParserCombinator(parse_map_value)
+  return ParserCombinator(parse_map_value, kind = 'map_value', parsers = [parser], argument = value)
 
 
 # Return the concatenated result of the specified parsers
@@ -156,7 +165,7 @@ def concat(function, *parsers):
         return right_result
 
       return ParserResult(function(left_result.value, right_result.value), right_result.index)
-    return ParserCombinator(parse_concat)
+    return ParserCombinator(parse_concat, kind = 'concat', parsers = parsers, argument = function)
 
   # If more parsers are specified, then recursively concatenate them
   else:
@@ -181,7 +190,7 @@ def concat(function, *parsers):
 
       # Return the result
       return ParserResult(function(*result.value), result.index, result.errors)
-    return ParserCombinator(parse_concat_more)
+    return ParserCombinator(parse_concat_more, kind = 'concat', parsers = parsers, argument = function)
 
 def combine(*parsers):
   return concat(lambda *args: tuple(args), *parsers)
@@ -222,7 +231,7 @@ def alternate(*parsers):
 
       # No parser succeeded, so return a failure
       return ParserError.unexpected(tokens, index)
-    return ParserCombinator(parse_alternate)
+    return ParserCombinator(parse_alternate, kind = 'alternate', parsers = parsers)
 
 def optional(parser, default = None):
   return alternate(parser, map_value(default, empty()))
@@ -230,6 +239,8 @@ def optional(parser, default = None):
 
 # Return the results of multiple identical parsers as a list
 def many(parser, separator = empty(), terminator = empty()):
+  next_parser = then(separator, parser)
+
   @functools.wraps(many)
   def parse_many(tokens, index):
     results = []
@@ -244,14 +255,14 @@ def many(parser, separator = empty(), terminator = empty()):
       index = result.index
 
       # Parse the next occurence
-      result = then(separator, parser).parse(tokens, index)
+      result = next_parser.parse(tokens, index)
 
     # Terminate and return
     if not terminator.parse(tokens, index):
       return ParserError.unexpected(tokens, index)
     else:
       return ParserResult(results, index)
-  return ParserCombinator(parse_many)
+  return ParserCombinator(parse_many, kind = 'many', parsers = [parser, separator, terminator])
 
 def many_sep(parser, separator):
   return many(parser, separator)
@@ -289,4 +300,4 @@ def reduce(function, parser, initializer = None):
 
     # Return the result
     return result
-  return ParserCombinator(parse_reduce)
+  return ParserCombinator(parse_reduce, kind = 'reduce', parsers = [initializer, parser] if initializer else [parser], argument = function)
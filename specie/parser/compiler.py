@@ -0,0 +1,192 @@
+from .combinators import ParserCombinator
+from .parser import ParserResult, ParserError
+
+
+##################################################
+### Definition of the grammar analysis helpers ###
+##################################################
+
+# Return the parser that a lazy parser combinator refers to
+def resolve(parser):
+  while isinstance(parser, ParserCombinator) and parser.kind == 'lazy':
+    parser = parser.argument()
+  return parser
+
+# Return the sub-parsers of a parser, with lazy parser combinators resolved
+def children(parser):
+  if not isinstance(parser, ParserCombinator):
+    return []
+  elif parser.kind == 'lazy':
+    return [resolve(parser)]
+  else:
+    return parser.parsers
+
+# Return all parsers that are reachable from the specified parsers
+def collect(*parsers):
+  collected = {}
+  stack = list(parsers)
+  while stack:
+    parser = stack.pop()
+    if parser not in collected:
+      collected[parser] = None
+      stack.extend(children(parser))
+  return list(collected)
+
+
+# Return the union of two first sets, where None means that the set contains any token
+def union(left, right):
+  if left is None or right is None:
+    return None
+  return left | right
+
+# Return the first set and nullability of a sequence of parsers
+def sequence(parsers, first, nullable):
+  sequence_first = frozenset()
+  for parser in parsers:
+    sequence_first = union(sequence_first, first[parser])
+    if not nullable[parser]:
+      return sequence_first, False
+  return sequence_first, True
+
+# Return the first set and nullability of a parser, given the current first sets and nullabilities
+#
+# The first set of a parser contains every token name at which the parser can consume tokens or raise an error,
+# and the parser is nullable if it can succeed without consuming any tokens. A parser that is not nullable thus
+# always fails without side effects on a token that is not in its first set.
+def analyze(parser, first, nullable):
+  kind = parser.kind if isinstance(parser, ParserCombinator) else None
+
+  if kind == 'token':
+    return frozenset([parser.argument]), False
+  elif kind == 'empty':
+    return frozenset(), True
+  elif kind == 'lazy':
+    target = resolve(parser)
+    return first[target], nullable[target]
+  elif kind == 'nofail':
+    return None, nullable[parser.parsers[0]]
+  elif kind in ('map', 'map_value'):
+    return first[parser.parsers[0]], nullable[parser.parsers[0]]
+  elif kind == 'concat':
+    return sequence(parser.parsers, first, nullable)
+  elif kind == 'alternate':
+    alternate_first = frozenset()
+    for alternate_parser in parser.parsers:
+      alternate_first = union(alternate_first, first[alternate_parser])
+    return alternate_first, any(nullable[alternate_parser] for alternate_parser in parser.parsers)
+  elif kind == 'many':
+    item, separator, terminator = parser.parsers[:3]
+    many_first = union(first[item], first[terminator])
+    if nullable[item]:
+      many_first = union(many_first, first[separator])
+    return many_first, nullable[item] or nullable[terminator]
+  elif kind == 'reduce':
+    return sequence(parser.parsers, first, nullable)[0], nullable[parser.parsers[0]]
+  else:
+    return None, True
+
+
+###############################################
+### Definition of the compilation functions ###
+###############################################
+
+# Return a parser function that only tries the alternatives that can match the next token
+def compile_alternate(parser, first, nullable):
+  alternates = [resolve(alternate_parser) for alternate_parser in parser.parsers]
+
+  # Alternatives that can match any token are tried on every token
+  default = [alternate_parser for alternate_parser in alternates if first[alternate_parser] is None or nullable[alternate_parser]]
+
+  # Create a table of the alternatives to try by token name, in their original order
+  names = set()
+  for alternate_parser in alternates:
+    if first[alternate_parser] is not None:
+      names |= first[alternate_parser]
+  table = {name: [alternate_parser for alternate_parser in alternates if alternate_parser in default or name in first[alternate_parser]] for name in names}
+
+  def parse_alternate(tokens, index):
+    # Iterate over the parsers for the next token and try to parse them
+    for alternate_parser in table.get(tokens[index].name if index < len(tokens) else None, default):
+      result = alternate_parser.parse(tokens, index)
+      if result:
+        return result
+
+    # No parser succeeded, so return a failure
+    return ParserError.unexpected(tokens, index)
+  return parse_alternate
+
+
+# Append the operations of a parser to a program
+def compile_operations(parser, operations):
+  kind = parser.kind if isinstance(parser, ParserCombinator) else None
+
+  # Nested concatenations and maps are inlined, and their functions applied as soon as their values are parsed
+  if kind == 'concat':
+    for concat_parser in parser.parsers:
+      compile_operations(concat_parser, operations)
+    operations.append(('apply', parser.argument, len(parser.parsers), len(parser.parsers) > 2))
+  elif kind == 'map':
+    compile_operations(parser.parsers[0], operations)
+    operations.append(('apply', parser.argument, 1, False))
+
+  # Other parsers are parsed as a whole
+  else:
+    operations.append(('parse', resolve(parser), 0, False))
+  return operations
+
+# Return a parser function that parses a chain of concatenations and maps as a single program
+def compile_sequence(parser):
+  operations = compile_operations(parser, [])
+
+  def parse_sequence(tokens, index):
+    values = []
+    for operation, argument, count, splice in operations:
+      # Parse the next value, or return the failure
+      if operation == 'parse':
+        result = argument.parse(tokens, index)
+        if not result:
+          return result
+        values.append(result.value)
+        index = result.index
+
+      # Apply a function on the last parsed values
+      else:
+        args = values[-count:]
+        del values[-count:]
+
+        # Concatenations of more than two parsers unpack a tuple as first value
+        if splice and isinstance(args[0], tuple):
+          args = [*args[0], *args[1:]]
+        values.append(argument(*args))
+
+    # Return the result
+    return ParserResult(values[0], index)
+  return parse_sequence
+
+
+# Compile the grammar that is reachable from the specified parsers in place
+def compile_grammar(*parsers):
+  parsers = collect(*parsers)
+
+  # Calculate the first sets and nullabilities of the parsers until they don't change anymore
+  first = {parser: frozenset() for parser in parsers}
+  nullable = {parser: False for parser in parsers}
+
+  changed = True
+  while changed:
+    changed = False
+    for parser in parsers:
+      analyzed = analyze(parser, first, nullable)
+      if analyzed != (first[parser], nullable[parser]):
+        first[parser], nullable[parser] = analyzed
+        changed = True
+
+  # Replace the functions of the parser combinators
+  for parser in parsers:
+    kind = parser.kind if isinstance(parser, ParserCombinator) else None
+    if kind == 'lazy':
+      parser.function = resolve(parser).parse
+    elif kind == 'alternate':
+      parser.function = compile_alternate(parser, first, nullable)
+    elif kind in ('concat', 'map'):
+      parser.function = compile_sequence(parser)
@@ -1,6 +1,11 @@
 import functools
 import re
 
+try:
+  from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+  import sre_constants, sre_parse
+
 # Define the exports for this module
 __all__ = ['Rule', 'Lexer', 'LexerError', 'SyntaxError']
 
@@ -10,6 +15,85 @@ newline_pattern_literal = r"\r?\n"
 newline_pattern = re.compile(newline_pattern_literal)
 
 
+# List of ASCII characters and escapes for character categories, used to determine the first characters of a pattern
+ascii_chars = [chr(code) for code in range(128)]
+category_escapes = {
+  sre_constants.CATEGORY_DIGIT: r'\d', sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+  sre_constants.CATEGORY_SPACE: r'\s', sre_constants.CATEGORY_NOT_SPACE: r'\S',
+  sre_constants.CATEGORY_WORD: r'\w', sre_constants.CATEGORY_NOT_WORD: r'\W',
+}
+
+# Return the set of ASCII characters a compiled pattern can start with, or None if that cannot be determined
+def pattern_first_chars(pattern):
+  try:
+    chars, nullable = parsed_first_chars(sre_parse.parse(pattern.pattern, pattern.flags))
+  except (re.error, TypeError, ValueError):
+    return None
+  if chars is None or nullable:
+    return None
+
+  # Expand the characters with their other case when matching case-insensitively
+  if pattern.flags & re.IGNORECASE:
+    if any(not char.isascii() for char in chars):
+      return None
+    chars |= {char.swapcase() for char in chars}
+  return frozenset(chars)
+
+# Return the first characters of a parsed pattern and if the pattern can match the empty string
+def parsed_first_chars(items):
+  chars = set()
+  for op, av in items:
+    # Literals and character sets consume a character
+    if op is sre_constants.LITERAL:
+      item_chars, item_nullable = {chr(av)}, False
+    elif op is sre_constants.IN:
+      item_chars, item_nullable = parsed_set_chars(av), False
+
+    # Groups, branches and repeats use the characters of their subpatterns
+    elif op is sre_constants.SUBPATTERN and not av[1] and not av[2]:
+      item_chars, item_nullable = parsed_first_chars(av[3])
+    elif op is sre_constants.BRANCH:
+      item_chars, item_nullable = set(), False
+      for branch in av[1]:
+        branch_chars, branch_nullable = parsed_first_chars(branch)
+        if branch_chars is None:
+          return None, True
+        item_chars |= branch_chars
+        item_nullable = item_nullable or branch_nullable
+    elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+      item_chars, item_nullable = parsed_first_chars(av[2])
+      item_nullable = item_nullable or av[0] == 0
+
+    # Anchors and lookarounds don't consume characters, and only restrict a match further
+    elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+      item_chars, item_nullable = set(), True
+
+    # Any other operation could start with any character
+    else:
+      return None, True
+
+    if item_chars is None:
+      return None, True
+    chars |= item_chars
+    if not item_nullable:
+      return chars, False
+  return chars, True
+
+# Return the ASCII characters in a parsed character set, or None if that cannot be determined
+def parsed_set_chars(items):
+  chars = set()
+  for op, av in items:
+    if op is sre_constants.LITERAL:
+      chars.add(chr(av))
+    elif op is sre_constants.RANGE and av[1] - av[0] < 128:
+      chars.update(chr(code) for code in range(av[0], av[1] + 1))
+    elif op is sre_constants.CATEGORY and av in category_escapes:
+      chars.update(char for char in ascii_chars if re.match(category_escapes[av], char))
+    else:
+      return None
+  return chars
+
+
 # Class that represents a token rule
 class Rule:
   # Constructor
@@ -25,6 +109,7 @@ class Rule:
     else:
       self.replacement = lambda m, _: None
     self.ignore = ignore
+    self.first_chars = pattern_first_chars(self.pattern)
 
 
 # Class that represents a location
@@ -110,9 +195,33 @@ class Lexer:
     self.strip_newlines = kwargs.get('strip_newlines', True)
     self.reduce_newlines = kwargs.get('reduce_newlines', True)
 
+    # Options for rule matching
+    self.compiled = kwargs.get('compiled', True)
+    if self.compiled:
+      self.compile_rules()
+
+  # Compile the rules into a table that maps every ASCII character to the rules that can start with it
+  def compile_rules(self):
+    self.rules_by_char = {}
+    for char in ascii_chars:
+      self.rules_by_char[char] = [rule for rule in self.rules if rule.first_chars is None or char in rule.first_chars]
+
+  # Return the rule with the longest match at the position and its match, or None if no rule matches
+  def match_rules(self, string, pos):
+    # Only try the rules that can start with the current character, or all rules for non-ASCII characters
+    rules = self.rules_by_char.get(string[pos], self.rules) if self.compiled else self.rules
+
+    # Iterate over the rules to see if they match; on matches of equal length the first rule wins
+    rule_match = None
+    for rule in rules:
+      if (token_match := rule.pattern.match(string, pos)) and (rule_match is None or token_match.end() > rule_match[1].end()):
+        rule_match = rule, token_match
+    return rule_match
+
   # Base function for converting a string to tokens
   def tokenize_base(self, string, ignored = None):
-    ignored = ignored if ignored is not None else []
+    ignored = sorted(ignored) if ignored is not None else []
+    ignored_index = 0
 
     # Store the end of lines
     line_ends = []
@@ -120,9 +229,14 @@ class Lexer:
     # Iterate over the string
     pos = 0
     while pos < len(string):
+      # Skip the ignored sequences that start before the position, since the ignored sequences are ordered by position
+      while ignored_index < len(ignored) and ignored[ignored_index][0] < pos:
+        ignored_index += 1
+
       # Check for ignored sequences
-      ignored_match = next(filter(lambda m: m[0] == pos, ignored), None)
-      if ignored_match:
+      if ignored_index < len(ignored) and ignored[ignored_index][0] == pos:
+        ignored_match = ignored[ignored_index]
+
         # Append the ignored line ends
         line_ends.extend(ignored_match[2])
 
@@ -146,30 +260,23 @@ class Lexer:
         pos = newline_match.end()
         continue
 
-      # Iterate over the rules to see if they match
-      token_matches = []
-      for rule_index, rule in enumerate(self.rules):
-        if token_match := rule.pattern.match(string, pos):
-          value = rule.replacement(token_match, location)
-          token = Token(rule.name, value, location)
-          token_matches.append((token_match.end(), -rule_index, token, rule))
+      # Get the rule with the longest possible match
+      rule_match = self.match_rules(string, pos)
 
-      # Check if there are matched rules
-      if not token_matches:
+      # Check if there is a matched rule
+      if rule_match is None:
         # We encountered an invalid character
         raise SyntaxError(f"Illegal character '{string[pos]}'", location)
       else:
-        # Get the rule with the longest possible match
-        token_matches.sort()
-        match_tuple = token_matches[-1]
+        rule, token_match = rule_match
 
-        # Ignore tuples that should be ignored
-        if not match_tuple[3].ignore:
+        # Ignore rules that should be ignored
+        if not rule.ignore:
           # Yield the match token
-          yield match_tuple[2]
+          yield Token(rule.name, rule.replacement(token_match, location), location)
 
         # Increase position to past the match
-        pos = match_tuple[0]
+        pos = token_match.end()
 
   # Convert a string to tokens
   def tokenize(self, string):
@@ -209,20 +316,19 @@ class Lexer:
     # Strip newlines
     if self.newline_token and self.strip_newlines:
       # Strip newlines from the start
-      while tokens and tokens[0].name == self.newline_token:
-        del tokens[0]
+      start = 0
+      while start < len(tokens) and tokens[start].name == self.newline_token:
+        start += 1
 
       # Strip newlines from the end
-      while tokens and tokens[-1].name == self.newline_token:
-        del tokens[-1]
+      end = len(tokens)
+      while end > start and tokens[end - 1].name == self.newline_token:
+        end -= 1
+
+      tokens = tokens[start:end]
 
     # Reduce newlines
-    index = 1
-    while index < len(tokens):
-      if tokens[index].name == self.newline_token and tokens[index - 1].name == self.newline_token:
-        del tokens[index]
-      else:
-        index += 1
+    tokens = [token for index, token in enumerate(tokens) if not (index > 0 and token.name == self.newline_token and tokens[index - 1].name == self.newline_token)]
 
     # Return the tokens
     return tokens
@@ -7,6 +7,17 @@ class Parser:
 
   # Parse the iterable of tokens starting at the specified index
   def parse(self, tokens, index, errors = None):
+    # Return the memoized result if packrat parsing
+    if errors is None and isinstance(tokens, MemoizedTokens):
+      key = (self, index)
+      if (result := tokens.memo.get(key)) is None:
+        result = tokens.memo[key] = self.parse_base(tokens, index)
+      return result
+    else:
+      return self.parse_base(tokens, index, errors)
+
+  # Base function for parsing the iterable of tokens starting at the specified index
+  def parse_base(self, tokens, index, errors = None):
     errors = errors if errors is not None else []
     result = self.function(tokens, index)
     if isinstance(result, ParserResult):
@@ -29,8 +40,12 @@ class Parser:
         return ParserResult(None, index, errors + [result])
 
   # Parse the iterable of tokens, but fail if not all tokens are consumed
-  def parse_strict(self, tokens, index):
+  # If packrat is set, then the result of every parser at every index is memoized while parsing the tokens
+  def parse_strict(self, tokens, index, packrat = False):
+    if packrat:
+      tokens = MemoizedTokens(tokens)
     result = self.parse(tokens, index)
+
     if result.index != len(tokens):
       if not result:
         raise result.errors[0]
@@ -43,6 +58,14 @@ class Parser:
     return f"{self.__class__.__name__}({self.function!r})"
 
 
+# Class that defines a list of tokens that holds the memoized results of parsers while packrat parsing it
+class MemoizedTokens(list):
+  # Constructor
+  def __init__(self, tokens):
+    super().__init__(tokens)
+    self.memo = {}
+
+
 # Class that defines a parser result
 class ParserResult:
   # Constructor
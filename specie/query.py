@@ -1,4 +1,6 @@
-from . import internals, interpreter, parser
+import re
+
+from . import ast, internals, interpreter, parser
 
 
 ############################################
@@ -15,6 +17,10 @@ class Function:
   def resolve(self):
     return []
 
+  # Resolve the expressions of the function that are evaluated outside the scope of the query variable
+  def resolve_unbound(self):
+    return []
+
   # Return the Python representation of this function
   def __repr__(self):
     return f"{self.__class__.__name__}({self.name!r}, {self.args!r})"
@@ -36,6 +42,11 @@ class Compose(Function):
     yield from self.first.resolve()
     yield from self.second.resolve()
 
+  # Resolve the expressions of the function that are evaluated outside the scope of the query variable
+  def resolve_unbound(self):
+    yield from self.first.resolve_unbound()
+    yield from self.second.resolve_unbound()
+
   # Return the Python representation of this function
   def __repr__(self):
     return f"{self.__class__.__name__}({self.first!r}, {self.second!r})"
@@ -77,57 +88,305 @@ class Distinct(Function):
     yield self.func
 
 
+# DistinctBy query function, which returns the first element for each distinct key
+class DistinctBy(Function):
+  # Constructor
+  def __init__(self, func):
+    self.func = func
+
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
+    function = internals.ObjFunction(interpreter, function_params, self.func, interpreter.environment)
+
+    return iterable.method_distinct(function)
+
+  # Resolve the function
+  def resolve(self):
+    yield self.func
+
+
 # Where query function
 class Where(Function):
+  # The comparison operators of date range terms, mapped to the operators with swapped operands
+  range_ops = {'<': '>', '<=': '>=', '>': '<', '>=': '<=', '==': '=='}
+
   # Constructor
   def __init__(self, predicate):
     self.predicate = predicate
 
+    # Define the map of analyzed terms by variable name and of residual predicates by variable name and used terms
+    self.plans = {}
+
   # Call the function
   def call(self, interpreter, variable, iterable):
     function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
+
+    if isinstance(iterable, internals.ObjTable):
+      terms = self.plan(variable)
+
+      # Look up the rows of the table with the index on the field of an equality or containment term
+      for position, (op, term, match) in enumerate(terms):
+        if match is not None and match[0] in ('==', 'in') and match[1] in iterable.indexes:
+          if (rows := self.lookup(interpreter, function_params, match, iterable)) is not None:
+            return self.filter(interpreter, function_params, variable, iterable.select_rows(rows), (position,))
+
+      # Prefilter the rows of the table with the trigram index on the field of a match or substring term, and
+      # evaluate the whole predicate on the candidates
+      for position, (op, term, match) in enumerate(terms):
+        if match is not None and match[0] in ('=~', 'contains') and match[1] in iterable.trigram_indexes:
+          if (rows := self.search(interpreter, function_params, match, iterable)) is not None:
+            return self.filter(interpreter, function_params, variable, iterable.select_rows(rows), ())
+
+      # Slice the rows of a table that is sorted by date to the range of the date range terms
+      positions = tuple(position for position, (op, term, match) in enumerate(terms) if match is not None and match[0] in self.range_ops and match[1] == 'date')
+      if positions and (rows := self.date_range(interpreter, function_params, [terms[position][2] for position in positions], iterable)) is not None:
+        return self.filter(interpreter, function_params, variable, iterable.slice(*rows), positions)
+
     function = internals.ObjFunction(interpreter, function_params, self.predicate, interpreter.environment)
     return iterable.where(function)
 
+  # Return the terms of the predicate that are combined with a logical and as a list of the and operator token
+  # that precedes them, the term itself, and the operator, field and bound if the term compares a field of the
+  # variable to a bound
+  def plan(self, variable):
+    if (plan := self.plans.get(variable)) is None:
+      plan = self.plans[variable] = [(op, term, self.match(variable, term)) for op, term in self.conjunction(None, self.predicate)]
+    return plan
+
+  # Return the terms of the predicate that are combined with a logical and, together with the and operator
+  # token that precedes them
+  def conjunction(self, op, expr):
+    while isinstance(expr, ast.GroupingExpr):
+      expr = expr.expression
+    if isinstance(expr, ast.LogicalExpr) and expr.op.value == 'and':
+      yield from self.conjunction(op or expr.op, expr.left)
+      yield from self.conjunction(expr.op, expr.right)
+    else:
+      yield (op, expr)
+
+  # Return the operator, field and bound of a term that compares a field of the variable, or None if it doesn't
+  def match(self, variable, term):
+    if not isinstance(term, ast.BinaryOpExpr):
+      return None
+    op = term.op.value
+    if op in self.range_ops or op == 'in':
+      if (field := self.field(variable, term.left)) is not None and self.is_bound(variable, term.right):
+        return (op, field, term.right)
+    if op in self.range_ops:
+      if self.is_bound(variable, term.left) and (field := self.field(variable, term.right)) is not None:
+        return (self.range_ops[op], field, term.left)
+    if op == '=~':
+      if (field := self.field(variable, term.left)) is not None and self.is_bound(variable, term.right):
+        return (op, field, term.right)
+    if op == 'in':
+      if self.is_bound(variable, term.left) and (field := self.field(variable, term.right)) is not None:
+        return ('contains', field, term.left)
+    return None
+
+  # Return the name of the field if an expression gets a field of the variable, or None if it doesn't
+  @staticmethod
+  def field(variable, expr):
+    if isinstance(expr, ast.GetExpr) and isinstance(expr.expression, ast.VariableExpr) and expr.expression.name.value == variable:
+      return expr.name.value
+    return None
+
+  # Return if an expression can be evaluated once without the variable and without side effects
+  def is_bound(self, variable, expr):
+    if isinstance(expr, ast.LiteralExpr):
+      return True
+    if isinstance(expr, ast.VariableExpr):
+      return expr.name.value != variable
+    if isinstance(expr, (ast.GetExpr, ast.GroupingExpr)):
+      return self.is_bound(variable, expr.expression)
+    if isinstance(expr, ast.ListExpr):
+      return all(self.is_bound(variable, item) for item in expr.items)
+    return False
+
+  # Return the value of a bound, or None if evaluating it fails
+  def evaluate_bound(self, interpreter, function_params, bound):
+    try:
+      return internals.ObjFunction(interpreter, function_params, bound, interpreter.environment)(internals.ObjNull())
+    except internals.RuntimeException:
+      return None
+
+  # Return the indices of the rows of the table that match an equality or containment term using the index on
+  # its field, or None if the index can't be used
+  def lookup(self, interpreter, function_params, match, table):
+    op, field, bound = match
+    if (value := self.evaluate_bound(interpreter, function_params, bound)) is None:
+      return None
+    if op == '==':
+      return table.lookup(field, value)
+    if type(value) is internals.ObjList:
+      return table.lookup(field, *value.items)
+    return None
+
+  # Return the indices of the candidate rows of the table for a match or substring term using the trigram index on
+  # its field, or None if the index can't be used
+  def search(self, interpreter, function_params, match, table):
+    op, field, bound = match
+    value = self.evaluate_bound(interpreter, function_params, bound)
+    try:
+      if op == '=~' and type(value) is internals.ObjRegex:
+        literals = value.literals()
+      elif op == '=~' and type(value) is internals.ObjString:
+        literals = internals.ObjRegex(value, re.IGNORECASE).literals()
+      elif op == 'contains' and type(value) is internals.ObjString:
+        literals = [value.value]
+      else:
+        return None
+    except re.error:
+      return None
+    return table.search(field, literals)
+
+  # Return the start and stop index of the rows of the table that match the date range terms, or None if the
+  # table is not sorted by date or a bound is not a date
+  def date_range(self, interpreter, function_params, matches, table):
+    start = stop = None
+    for op, field, bound in matches:
+      if type(value := self.evaluate_bound(interpreter, function_params, bound)) is not internals.ObjDate:
+        return None
+
+      # Convert the bound to an inclusive start ordinal or an exclusive stop ordinal
+      if op in ('>', '>=', '=='):
+        ordinal = value.ordinal + 1 if op == '>' else value.ordinal
+        start = ordinal if start is None else max(start, ordinal)
+      if op in ('<', '<=', '=='):
+        ordinal = value.ordinal + 1 if op != '<' else value.ordinal
+        stop = ordinal if stop is None else min(stop, ordinal)
+    return table.date_range(start, stop)
+
+  # Return the rows of an iterable that match the terms of the predicate other than the specified used terms
+  def filter(self, interpreter, function_params, variable, iterable, positions):
+    if (variable, positions) not in self.plans:
+      residual = None
+      for position, (op, term, match) in enumerate(self.plan(variable)):
+        if position not in positions:
+          residual = term if residual is None else ast.LogicalExpr(residual, op, term)
+      self.plans[(variable, positions)] = residual
+
+    if (residual := self.plans[(variable, positions)]) is None:
+      return iterable
+    function = internals.ObjFunction(interpreter, function_params, residual, interpreter.environment)
+    return iterable.where(function)
+
   # Resolve the function
   def resolve(self):
     yield self.predicate
 
 
-# Sort query function
-class Sort(Function):
+# OrderBy query function, which sorts the elements by the keys of one or more functions
+class OrderBy(Function):
   # Constructor
-  def __init__(self, func):
+  def __init__(self, keys):
+    self.keys = keys
+
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
+    for index, (func, desc) in enumerate(self.keys):
+      function = internals.ObjFunction(interpreter, function_params, func, interpreter.environment)
+      iterable = iterable.order_by(function, desc) if index == 0 else iterable.then_by(function, desc)
+    return iterable
+
+  # Resolve the function
+  def resolve(self):
+    for func, desc in self.keys:
+      yield func
+
+
+# ThenBy query function, which sorts the elements that are equal by the keys of the previous order by function
+class ThenBy(Function):
+  # Constructor
+  def __init__(self, func, desc = False):
     self.func = func
+    self.desc = desc
 
   # Call the function
   def call(self, interpreter, variable, iterable):
+    if not isinstance(iterable, internals.ObjOrderedIterable):
+      raise internals.InvalidOperationException(f"Query function {'thenByDesc' if self.desc else 'thenBy'} must follow an order by query function")
+
     function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
     function = internals.ObjFunction(interpreter, function_params, self.func, interpreter.environment)
 
-    return iterable.method_sort(function)
+    return iterable.then_by(function, self.desc)
 
   # Resolve the function
   def resolve(self):
     yield self.func
 
 
-# SortDesc query function
-class SortDesc(Function):
+# Take query function
+class Take(Function):
+  # The name of the query function
+  name = "take"
+
   # Constructor
-  def __init__(self, func):
-    self.func = func
+  def __init__(self, count):
+    self.count = count
+
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    count = interpreter.evaluate(self.count)
+    if not isinstance(count, internals.ObjInt):
+      raise internals.InvalidTypeException(f"Query function {self.name} expects an argument of type Int, got {count.__class__.typename}")
+    return self.apply(iterable, count)
+
+  # Apply the function to the iterable with the evaluated count
+  def apply(self, iterable, count):
+    return iterable.take(count)
+
+  # Resolve the expressions of the function that are evaluated outside the scope of the query variable
+  def resolve_unbound(self):
+    yield self.count
+
+
+# Skip query function
+class Skip(Take):
+  # The name of the query function
+  name = "skip"
+
+  # Apply the function to the iterable with the evaluated count
+  def apply(self, iterable, count):
+    return iterable.skip(count)
+
+
+# TakeWhile query function
+class TakeWhile(Function):
+  # Constructor
+  def __init__(self, predicate):
+    self.predicate = predicate
 
   # Call the function
   def call(self, interpreter, variable, iterable):
     function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
-    function = internals.ObjFunction(interpreter, function_params, self.func, interpreter.environment)
+    function = internals.ObjFunction(interpreter, function_params, self.predicate, interpreter.environment)
 
-    return iterable.method_sort(function, internals.ObjBool(True))
+    return iterable.take_while(function)
 
   # Resolve the function
   def resolve(self):
-    yield self.func
+    yield self.predicate
+
+
+# SkipWhile query function
+class SkipWhile(Function):
+  # Constructor
+  def __init__(self, predicate):
+    self.predicate = predicate
+
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
+    function = internals.ObjFunction(interpreter, function_params, self.predicate, interpreter.environment)
+
+    return iterable.skip_while(function)
+
+  # Resolve the function
+  def resolve(self):
+    yield self.predicate
 
 
 # Count query function
@@ -137,6 +396,17 @@ class Count(Function):
     return iterable.method_count()
 
 
+# Counting filter query function, which counts the elements that match the predicate without getting them
+class CountWhere(Where):
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    iterator = iter(super().call(interpreter, variable, iterable))
+    count = 0
+    while iterator.advance():
+      count += 1
+    return internals.ObjInt(count)
+
+
 # Fold query function
 class Fold(Function):
   # Constructor
@@ -153,8 +423,8 @@ class Fold(Function):
     else:
       return iterable.method_fold(function)
 
-  # Resolve the function
-  def resolve(self):
+  # Resolve the expressions of the function that are evaluated outside the scope of the query variable
+  def resolve_unbound(self):
     yield self.func
     if self.initial is not None:
       yield self.initial
@@ -214,8 +484,8 @@ class Max(Function):
     yield self.func
 
 
-# Average query function
-class Average(Function):
+# Stats query function
+class Stats(Function):
   # Constructor
   def __init__(self, func):
     self.func = func
@@ -225,26 +495,67 @@ class Average(Function):
     function_params = internals.Parameters(internals.Parameter(variable, internals.Obj))
     function = internals.ObjFunction(interpreter, function_params, self.func, interpreter.environment)
 
-    return iterable.method_select(function).method_average()
+    return iterable.method_select(function).method_stats()
 
   # Resolve the function
   def resolve(self):
     yield self.func
 
 
-# Contains query function
+# Average query function, which returns the mean of the stats of the elements
+class Average(Stats):
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    return super().call(interpreter, variable, iterable).get_field('mean')
+
+
+# First query function, which returns the first element that matches the predicate if one is specified
+class First(Function):
+  # Constructor
+  def __init__(self, predicate = None):
+    self.predicate = predicate
+
+    # Define the where function that filters the elements, so it can use the indexes of a table
+    self.where = Where(predicate) if predicate is not None else None
+
+  # Call the function
+  def call(self, interpreter, variable, iterable):
+    if self.where is not None:
+      iterable = self.where.call(interpreter, variable, iterable)
+    return iterable.first()
+
+  # Resolve the function
+  def resolve(self):
+    if self.predicate is not None:
+      yield self.predicate
+
+
+# Contains query function, which checks the selected values of the elements if a select function is fused into it
 class Contains(Function):
   # Constructor
-  def __init__(self, element):
+  def __init__(self, element, func = None):
     self.element = element
+    self.func = func
 
   # Call the function
   def call(self, interpreter, variable, iterable):
     element = interpreter.evaluate(self.element)
-    return iterable.method_contains(element)
+    if self.func is None:
+      return iterable.method_contains(element)
+
+    # Look up the element in the hash index on the selected field of a table
+    if isinstance(iterable, internals.ObjTable) and (field := Where.field(variable, self.func)) is not None:
+      if (rows := iterable.lookup(field, element)) is not None:
+        return internals.ObjBool(bool(rows))
+    return Select(self.func).call(interpreter, variable, iterable).method_contains(element)
 
   # Resolve the function
   def resolve(self):
+    if self.func is not None:
+      yield self.func
+
+  # Resolve the expressions of the function that are evaluated outside the scope of the query variable
+  def resolve_unbound(self):
     yield self.element
 
 
@@ -308,6 +619,139 @@ class Drop(Function):
     return iterable.method_drop()
 
 
+#########################################
+### Definition of the query optimizer ###
+#########################################
+
+# The binary operators that always result in a bool
+bool_ops = {'<', '<=', '>', '>=', '<=>', '=~', '!~', '==', '!=', 'in', '!in'}
+
+# Return the functions of a composed query function in order
+def stages(function):
+  if isinstance(function, Compose):
+    return stages(function.first) + stages(function.second)
+  return [function]
+
+# Return if an expression always results in a bool, so it can be combined with a logical and
+def is_predicate(expr):
+  if isinstance(expr, ast.GroupingExpr):
+    return is_predicate(expr.expression)
+  if isinstance(expr, ast.BinaryOpExpr):
+    return expr.op.value in bool_ops
+  if isinstance(expr, (ast.LogicalExpr, ast.UnaryOpExpr)):
+    return expr.op.value in ('and', 'or', 'not')
+  return isinstance(expr, ast.LiteralExpr) and isinstance(expr.object, internals.ObjBool)
+
+# Return the number of times an expression gets a variable, or None if the expression can't be substituted
+def count_variable(expr, variable):
+  if isinstance(expr, ast.VariableExpr):
+    return int(expr.name.value == variable)
+  if isinstance(expr, ast.LiteralExpr):
+    return 0
+  children = substitutable_children(expr)
+  if children is None:
+    return None
+  counts = [count_variable(child, variable) for child in children]
+  return None if None in counts else sum(counts)
+
+# Return the child expressions of an expression that can be substituted, or None if it can't be substituted
+def substitutable_children(expr):
+  if isinstance(expr, (ast.GetExpr, ast.GroupingExpr, ast.UnaryOpExpr)):
+    return [expr.expression]
+  if isinstance(expr, (ast.BinaryOpExpr, ast.LogicalExpr)):
+    return [expr.left, expr.right]
+  if isinstance(expr, ast.ListExpr):
+    return expr.items
+  if isinstance(expr, ast.CallExpr):
+    return [expr.expression, expr.args]
+  return None
+
+# Return a copy of an expression with the variable replaced by another expression
+def substitute(expr, variable, replacement):
+  if isinstance(expr, ast.VariableExpr):
+    return ast.GroupingExpr(replacement) if expr.name.value == variable else expr
+  if isinstance(expr, ast.LiteralExpr):
+    return expr
+  if isinstance(expr, ast.GetExpr):
+    return ast.GetExpr(substitute(expr.expression, variable, replacement), expr.token, expr.name)
+  if isinstance(expr, ast.GroupingExpr):
+    return ast.GroupingExpr(substitute(expr.expression, variable, replacement))
+  if isinstance(expr, ast.UnaryOpExpr):
+    return ast.UnaryOpExpr(expr.op, substitute(expr.expression, variable, replacement))
+  if isinstance(expr, ast.BinaryOpExpr):
+    return ast.BinaryOpExpr(substitute(expr.left, variable, replacement), expr.op, substitute(expr.right, variable, replacement))
+  if isinstance(expr, ast.LogicalExpr):
+    return ast.LogicalExpr(substitute(expr.left, variable, replacement), expr.op, substitute(expr.right, variable, replacement))
+  if isinstance(expr, ast.ListExpr):
+    return ast.ListExpr([substitute(item, variable, replacement) for item in expr.items])
+  if isinstance(expr, ast.CallExpr):
+    return ast.CallExpr(substitute(expr.expression, variable, replacement), expr.token, substitute(expr.args, variable, replacement))
+
+# Return the expression that applies an expression of the variable to the result of another expression of the
+# variable, or None if the variable is not used exactly once, since the other expression must be evaluated once
+def compose_exprs(variable, first, second):
+  if count_variable(second, variable) != 1:
+    return None
+  return substitute(second, variable, first)
+
+# Return the rewritten functions for two consecutive query functions, or None if they can't be rewritten
+def rewrite(variable, first, second):
+  # Fuse consecutive where functions into one where function with a logical and of their predicates
+  if type(first) is Where and type(second) is Where and is_predicate(first.predicate) and is_predicate(second.predicate):
+    return [Where(ast.LogicalExpr(first.predicate, parser.Token('operator_and', 'and', None), second.predicate))]
+
+  # Count the elements of a where function without getting them
+  if type(first) is Where and type(second) is Count:
+    return [CountWhere(first.predicate)]
+
+  # Add the keys of a then by function to the keys of the preceding order by function
+  if type(first) is OrderBy and type(second) is ThenBy:
+    return [OrderBy([*first.keys, (second.func, second.desc)])]
+
+  # Don't sort the elements before a function that doesn't depend on the order of the elements
+  if type(first) is OrderBy and type(second) in (Count, CountWhere, Sum, Min, Max, Stats, Average, Any, All, Contains):
+    return [second]
+
+  # Filter the elements before sorting them, since sorting is stable and filtering is cheaper than sorting
+  if type(first) is OrderBy and type(second) in (Where, CountWhere):
+    return [second, first]
+
+  # Take or skip the elements before selecting them, so the taken elements of an order by function are selected
+  # with a heap and the skipped elements are not selected at all
+  if type(first) is Select and type(second) in (Take, Skip):
+    return [second, first]
+
+  # Fuse a select function into a following contains function, so it can look up the element in the hash index on
+  # the selected field
+  if type(first) is Select and type(second) is Contains and second.func is None:
+    return [Contains(second.element, first.func)]
+
+  # Fuse a select function into a following select function or aggregate
+  if type(first) is Select and type(second) in (Select, Sum, Min, Max, Stats, Average):
+    if (func := compose_exprs(variable, first.func, second.func)) is not None:
+      return [type(second)(func)]
+
+  return None
+
+# Return an optimized query function for a query function of the specified variable
+def optimize(variable, function):
+  functions = stages(function)
+
+  # Rewrite consecutive functions until no rule applies anymore
+  index = 0
+  while index < len(functions) - 1:
+    if (rewritten := rewrite(variable, functions[index], functions[index + 1])) is not None:
+      functions[index:index + 2] = rewritten
+      index = max(index - 1, 0)
+    else:
+      index += 1
+
+  result = functions[0]
+  for function in functions[1:]:
+    result = Compose(result, function)
+  return result
+
+
 ###############################################
 ### Definition of the query function parser ###
 ###############################################
@@ -323,20 +767,55 @@ def parse_function(name, args):
     if len(args) == 1:
       return Distinct(*args)
 
+  # DistinctBy query function
+  elif name.value == "distinctBy":
+    if len(args) == 1:
+      return DistinctBy(*args)
+
   # Where query function
   elif name.value == "where":
     if len(args) == 1:
       return Where(*args)
 
   # Sort query function
-  elif name.value == "sort":
+  elif name.value == "sort" or name.value == "orderBy":
     if len(args) == 1:
-      return Sort(*args)
+      return OrderBy([(args[0], False)])
 
   # SortDesc query function
-  elif name.value == "sortDesc":
+  elif name.value == "sortDesc" or name.value == "orderByDesc":
     if len(args) == 1:
-      return SortDesc(*args)
+      return OrderBy([(args[0], True)])
+
+  # ThenBy query function
+  elif name.value == "thenBy":
+    if len(args) == 1:
+      return ThenBy(args[0])
+
+  # ThenByDesc query function
+  elif name.value == "thenByDesc":
+    if len(args) == 1:
+      return ThenBy(args[0], True)
+
+  # Take query function
+  elif name.value == "take":
+    if len(args) == 1:
+      return Take(*args)
+
+  # Skip query function
+  elif name.value == "skip":
+    if len(args) == 1:
+      return Skip(*args)
+
+  # TakeWhile query function
+  elif name.value == "takeWhile":
+    if len(args) == 1:
+      return TakeWhile(*args)
+
+  # SkipWhile query function
+  elif name.value == "skipWhile":
+    if len(args) == 1:
+      return SkipWhile(*args)
 
   # Count query function
   elif name.value == "count":
@@ -368,6 +847,16 @@ def parse_function(name, args):
     if len(args) == 1:
       return Average(*args)
 
+  # First query function
+  elif name.value == "first":
+    if len(args) == 0 or len(args) == 1:
+      return First(*args)
+
+  # Stats query function
+  elif name.value == "stats":
+    if len(args) == 1:
+      return Stats(*args)
+
   # Contains query function
   elif name.value == "contains":
     if len(args) == 1:
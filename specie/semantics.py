@@ -1,4 +1,4 @@
-from . import ast, internals
+from . import ast, internals, query
 
 
 # Class that defines an analyzer that resolves variable accesses
@@ -7,7 +7,7 @@ class Resolver(ast.ExprVisitor[None]):
   def __init__(self, interpreter):
     self.interpreter = interpreter
 
-    # The scope stack holds a dictionary (name: str, initialized: bool) for each scope
+    # The scope stack holds a dictionary (name: str, initialized: bool) for each scope, ordered by the slots of the variables
     self.scopes = []
 
 
@@ -31,11 +31,17 @@ class Resolver(ast.ExprVisitor[None]):
       return
     self.scopes[-1][name] = True
 
-  # Resolve a variable
+  # Resolve the slot of a variable declaration
+  def resolve_declaration(self, expression, name):
+    if not self.scopes:
+      return
+    self.interpreter.locals[expression] = list(self.scopes[-1]).index(name)
+
+  # Resolve the distance and slot of a variable, where the slot is the index of the variable in its scope
   def resolve_variable(self, expression, name):
     for i in range(len(self.scopes) - 1, -1, -1):
       if name in self.scopes[i]:
-        self.interpreter.locals[expression] = len(self.scopes) - 1 - i
+        self.interpreter.locals[expression] = (len(self.scopes) - 1 - i, list(self.scopes[i]).index(name))
         return
 
 
@@ -113,7 +119,10 @@ class Resolver(ast.ExprVisitor[None]):
 
   # Visit a query expression
   def visit_query_expr(self, expr: ast.QueryExpr) -> None:
+    expr.function = query.optimize(expr.variable.name.value, expr.function)
     self.resolve(expr.iterable)
+    for resolvable in expr.function.resolve_unbound():
+      self.resolve(resolvable)
     self.begin_scope()
     self.declare_variable(expr.variable.name.value)
     self.initialize_variable(expr.variable.name.value)
@@ -138,6 +147,7 @@ class Resolver(ast.ExprVisitor[None]):
   # Visit a declaration expression
   def visit_declaration_expr(self, expr: ast.DeclarationExpr) -> None:
     self.declare_variable(expr.name.value)
+    self.resolve_declaration(expr, expr.name.value)
     self.resolve(expr.value)
     self.initialize_variable(expr.name.value)
 
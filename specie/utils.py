@@ -2,11 +2,25 @@
 def ellipsis(string, length = 70):
   return (string[:length] + "...") if len(string) > length else string
 
-# Return a list with the distinct items from the iterable appended
+# Return a list with the distinct items from the iterable appended, using a set of the items that are in the list
+# and falling back to searching the list for items that can't be hashed
 def distinct_append(list, iterable):
+  seen = set()
+  for item in list:
+    try:
+      seen.add(item)
+    except TypeError:
+      pass
+
   for item in iterable:
-    if item not in list:
-      list.append(item)
+    try:
+      if item in seen:
+        continue
+      seen.add(item)
+    except TypeError:
+      if item in list:
+        continue
+    list.append(item)
   return list
 
 # Return a list of the distinct items from the iterable
@@ -0,0 +1,87 @@
+import os
+import stat
+import tempfile
+import unittest
+import unittest.mock
+
+from specie import cache
+
+
+############################################
+### Definition of the module cache tests ###
+############################################
+
+@unittest.skipUnless(hasattr(os, 'getuid'), "file ownership is only checked on POSIX systems")
+class ModuleCacheTest(unittest.TestCase):
+  # Set up a module cache in a temporary directory and a file to cache
+  def setUp(self):
+    self.temp = tempfile.TemporaryDirectory()
+    self.directory = os.path.join(self.temp.name, 'cache')
+    self.file_name = os.path.join(self.temp.name, 'module.sp')
+    with open(self.file_name, 'w') as file:
+      file.write("var x = 1")
+
+  def tearDown(self):
+    self.temp.cleanup()
+
+  # Return a new module cache and the key of the cached file
+  def module_cache(self):
+    module_cache = cache.ModuleCache(self.directory)
+    with open(self.file_name) as file:
+      return module_cache, module_cache.key(self.file_name, file.read())
+
+  # Test that the cache directory is only accessible by the current user and the cached module can be loaded
+  def test_store_and_load(self):
+    module_cache, key = self.module_cache()
+    module_cache.store(self.file_name, key, "module")
+    self.assertEqual(stat.S_IMODE(os.stat(self.directory).st_mode), 0o700)
+    self.assertEqual(module_cache.load(self.file_name, key), "module")
+
+  # Test that cached modules that other users can write are not loaded
+  def test_load_writable_file(self):
+    module_cache, key = self.module_cache()
+    module_cache.store(self.file_name, key, "module")
+    os.chmod(module_cache.cache_file_name(self.file_name), 0o666)
+    self.assertIsNone(module_cache.load(self.file_name, key))
+
+  # Test that cached modules in a directory that other users can write are not loaded
+  def test_load_writable_directory(self):
+    module_cache, key = self.module_cache()
+    module_cache.store(self.file_name, key, "module")
+    os.chmod(self.directory, 0o777)
+    self.assertIsNone(module_cache.load(self.file_name, key))
+
+
+###############################################
+### Definition of the grammar version tests ###
+###############################################
+
+class GrammarVersionTest(unittest.TestCase):
+  # Test that the version covers every module in the package
+  def test_package_modules(self):
+    root = os.path.dirname(cache.__file__)
+    modules = [module for module, _ in cache.package_modules()]
+    for directory, _, file_names in os.walk(root):
+      for file_name in file_names:
+        if file_name.endswith('.py'):
+          self.assertIn(os.path.relpath(os.path.join(directory, file_name), root).replace(os.sep, '/'), modules)
+    self.assertIn('internals/object_iterable.py', modules)
+
+  # Test that the version changes when the source of any module changes
+  def test_version_changes(self):
+    with tempfile.TemporaryDirectory() as directory:
+      file_names = [os.path.join(directory, f"module{index}.py") for index in range(3)]
+      for file_name in file_names:
+        with open(file_name, 'w') as file:
+          file.write("x = 1")
+
+      with unittest.mock.patch.object(cache, 'package_modules', lambda: [(os.path.basename(file_name), file_name) for file_name in file_names]):
+        version = cache.grammar_version()
+        self.assertEqual(cache.grammar_version(), version)
+        with open(file_names[-1], 'w') as file:
+          file.write("x = 2")
+        self.assertNotEqual(cache.grammar_version(), version)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,125 @@
+import contextlib
+import gc
+import glob
+import io
+import os
+import unittest
+
+from rich.console import Console
+
+from specie import interpreter, output
+
+
+# Return the printed output of evaluating a script with an interpreter
+def run(source, intp):
+  buffer = io.StringIO()
+  console, output.console = output.console, Console(file = buffer, width = 200, color_system = None)
+  try:
+    with contextlib.redirect_stdout(buffer):
+      intp.execute(source)
+  finally:
+    output.console = console
+  return buffer.getvalue()
+
+# Return the sample scripts in the tests directory
+def scripts():
+  sources = []
+  for file_name in sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'scripts', '*.sp'))):
+    with open(file_name) as file:
+      sources.append(file.read())
+  return sources
+
+
+########################################
+### Definition of the compiler tests ###
+########################################
+
+class CompilerTest(unittest.TestCase):
+  # Assert that a script prints the same with the compiled and the tree-walking interpreter and return the output
+  def assertSameOutput(self, source):
+    result = run(source, interpreter.Interpreter(compiled = True))
+    self.assertEqual(result, run(source, interpreter.Interpreter(compiled = False)))
+    return result
+
+  # Test if the sample scripts print the same with both interpreters
+  def test_scripts(self):
+    for source in scripts():
+      with self.subTest(source = source[:40]):
+        self.assertSameOutput(source)
+
+  # Test functions with optional and variadic parameters, recursion and partial application
+  def test_functions(self):
+    self.assertEqual(self.assertSameOutput("\n".join([
+      "var f = (a, b = 10) -> a * b",
+      "var g = (a, ...rest) -> a + rest.count()",
+      "print(f(2), \" \", f(2, 3), \" \", g(2, 3, 4, 5))",
+      "var fact = (n) -> if n <= 1 then 1 else n * fact(n - 1)",
+      "print(fact(12))",
+      "print(f.partial(3)(4))",
+    ])), "20 6 5\n479001600\n12\n")
+
+  # Test closures that capture and update variables of enclosing functions and blocks
+  def test_closures(self):
+    self.assertEqual(self.assertSameOutput("\n".join([
+      "var counter = (step) -> do",
+      "  var count = 0",
+      "  () -> do",
+      "    count = count + step",
+      "    count",
+      "  end",
+      "end",
+      "var a = counter(1)",
+      "var b = counter(10)",
+      "a()",
+      "b()",
+      "print(a(), \" \", b())",
+      "var adders = for i in [1, 2, 3] do",
+      "  (x) -> x + i",
+      "end",
+      "print(for add in adders add(100))",
+    ])), "2 20\n- 101\n- 102\n- 103\n")
+
+  # Test nested for loops and loops that are written as recursion, since the language has no while loop
+  def test_loops(self):
+    self.assertEqual(self.assertSameOutput("\n".join([
+      "print(for i in [1, 2] for j in [10, 20] i * j)",
+      "var loop = (i, total) -> if i > 100 then total else loop(i + 1, total + i)",
+      "print(loop(1, 0))",
+      "var total = 0",
+      "for i in [1, 2, 3, 4] do",
+      "  total = total + i",
+      "end",
+      "print(total)",
+    ])), "- [10, 20]\n- [20, 40]\n5050\n10\n")
+
+  # Test queries whose functions capture variables of the enclosing scope
+  def test_queries(self):
+    self.assertEqual(self.assertSameOutput("\n".join([
+      "var xs = [5, 3, 8, 1, 9, 2]",
+      "var above = (k) -> from x in xs where x > k select x * 2 sort x",
+      "print(above(4))",
+      "var k = 3",
+      "print((from x in xs where x > k count), \" \", (from x in xs sum x + k), \" \", (from r in (for x in xs {v: x}) max r.v))",
+    ])), "- 10\n- 16\n- 18\n3 46 9\n")
+
+  # Test if runtime errors are reported the same by both interpreters
+  def test_errors(self):
+    for source in ["var x = 1\nx()", "var x = 1\nx.y = 2", "print(1.nope)", "var f = (a) -> a.b\nf(1)", "undefined = 1"]:
+      with self.subTest(source = source):
+        self.assertNotEqual(self.assertSameOutput(source), "")
+
+  # Test if the compiled closures of an expression are released when the expression isn't used anymore
+  def test_closures_are_released(self):
+    intp = interpreter.Interpreter(compiled = True)
+    run("var xs = [1, 2, 3]", intp)
+    gc.collect()
+    count = len(intp.compiler.closures)
+    for i in range(10):
+      run(f"print(for x in xs do\n  var y = x * {i}\n  y + 1\nend)", intp)
+    gc.collect()
+    self.assertEqual(len(intp.compiler.closures), count)
+    self.assertEqual(len(intp.locals), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
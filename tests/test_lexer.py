@@ -0,0 +1,109 @@
+import glob
+import os
+import unittest
+
+from specie import grammar, parser
+
+
+# Return the sample scripts in the tests directory, together with some inputs that exercise edge cases of the lexer
+def corpus():
+  sources = []
+  for file_name in sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'scripts', '*.sp'))):
+    with open(file_name) as file:
+      sources.append(file.read())
+  sources.extend([
+    "print(\"café ✓\")",
+    "print(\"naïve # not a comment\", /a\\/b/ims, 2023-01-05, -1.5, -1)",
+    "FROM x IN xs WHERE x != 1 AND NOT x !in ys SORTDESC x",
+    "a...b->c<=>d<=e>=f=~g!~h==i=j",
+    "\r\n\n  x # comment\r\n#- block\r\n comment -#\n\n y\n\n",
+    "infrom fromx do_end var_ _var",
+  ])
+  return sources
+
+
+# Class that defines a lexer that tries every rule at every position, like the lexer did before it dispatched on the first character
+class ReferenceLexer(parser.Lexer):
+  # Return the rule with the longest match at the position and its match; on matches of equal length the first rule wins
+  def match_rules(self, string, pos):
+    token_matches = [(token_match.end(), -rule_index, rule, token_match) for rule_index, rule in enumerate(self.rules) if (token_match := rule.pattern.match(string, pos))]
+    if not token_matches:
+      return None
+    _, _, rule, token_match = max(token_matches, key = lambda token_match: token_match[:2])
+    return rule, token_match
+
+
+#####################################
+### Definition of the lexer tests ###
+#####################################
+
+class LexerTest(unittest.TestCase):
+  # Return the tokens of a string or the syntax error raised while tokenizing it
+  def tokenize(self, lexer, string):
+    try:
+      return lexer.tokenize(string)
+    except parser.SyntaxError as err:
+      return str(err)
+
+  # Return a lexer for the grammar with the specified class and options
+  def lexer(self, lexer_class = parser.Lexer, **kwargs):
+    return lexer_class(grammar.rules, comment_inline = grammar.lexer.comment_inline, comment_block = grammar.lexer.comment_block, comment_ignore_pattern = grammar.lexer.comment_ignore_pattern, **kwargs)
+
+  # Test if dispatching on the first character yields the same tokens as trying every rule
+  def test_dispatch_matches_reference(self):
+    lexers = [self.lexer(), self.lexer(compiled = False), self.lexer(ReferenceLexer, compiled = False)]
+    for source in corpus():
+      with self.subTest(source = source[:40]):
+        tokens = [self.tokenize(lexer, source) for lexer in lexers]
+        self.assertIsInstance(tokens[0], list)
+        self.assertEqual(tokens[0], tokens[1])
+        self.assertEqual(tokens[0], tokens[2])
+
+  # Test if an illegal character raises the same error in both lexers
+  def test_illegal_character(self):
+    for source in ["var x = 1 ; 2", "x = @", "var é = 1"]:
+      with self.subTest(source = source):
+        expected = self.tokenize(self.lexer(ReferenceLexer, compiled = False), source)
+        self.assertIsInstance(expected, str)
+        self.assertEqual(self.tokenize(self.lexer(), source), expected)
+
+
+#######################################
+### Definition of the comment tests ###
+#######################################
+
+class CommentTest(unittest.TestCase):
+  # Return the names, values and locations of the tokens of a string
+  def tokenize(self, string):
+    return [(token.name, token.value, token.location.line, token.location.col) for token in grammar.lexer.tokenize(string)]
+
+  # Test if inline and block comments are skipped and keep the locations of the following tokens
+  def test_comments(self):
+    self.assertEqual(self.tokenize("x # c\n\n#- a\nb -#\n\ny"), [('identifier', 'x', 0, 0), ('newline', None, 0, 5), ('identifier', 'y', 5, 0)])
+    self.assertEqual(self.tokenize("x #- a -# y # z\nw"), [('identifier', 'x', 0, 0), ('identifier', 'y', 0, 10), ('newline', None, 0, 15), ('identifier', 'w', 1, 0)])
+    self.assertEqual(self.tokenize("x\n#- a\n\n\n-#\n\n y"), [('identifier', 'x', 0, 0), ('newline', None, 0, 1), ('identifier', 'y', 6, 1)])
+    self.assertEqual(self.tokenize("#- only -#"), [])
+
+  # Test if comment markers inside strings are not treated as comments
+  def test_comments_in_strings(self):
+    self.assertEqual(self.tokenize("\"# a\" # b\n\"#- c -#\""), [('literal_string', '# a', 0, 0), ('newline', None, 0, 9), ('literal_string', '#- c -#', 1, 0)])
+
+  # Test if blank lines are stripped at the start and end and reduced to a single newline in between
+  def test_blank_lines(self):
+    self.assertEqual(self.tokenize("\n\n\nx\n\n\n\ny\n\n"), [('identifier', 'x', 3, 0), ('newline', None, 3, 1), ('identifier', 'y', 7, 0)])
+    self.assertEqual(self.tokenize("x\r\n# a\r\n\r\ny"), [('identifier', 'x', 0, 0), ('newline', None, 0, 1), ('identifier', 'y', 3, 0)])
+    self.assertEqual(self.tokenize("\n\n  \n"), [])
+
+  # Test if a script with thousands of comments and blank lines keeps the line of every declaration
+  def test_many_comments(self):
+    lines = []
+    for i in range(2000):
+      lines.extend([f"# comment {i}", f"var v{i} = \"#{i}\" # trailing", "", f"#- block {i}", "   -#"])
+    tokens = self.tokenize("\n".join(lines) + "\n")
+    identifiers = [token for token in tokens if token[0] == 'identifier']
+    self.assertEqual(identifiers, [('identifier', f"v{i}", i * 5 + 1, 4) for i in range(2000)])
+    self.assertEqual(sum(token[0] == 'newline' for token in tokens), 1999)
+
+
+if __name__ == '__main__':
+  unittest.main()
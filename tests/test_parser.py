@@ -0,0 +1,145 @@
+import contextlib
+import glob
+import importlib.util
+import io
+import os
+import unittest
+import unittest.mock
+
+from specie import ast, grammar, parser, query
+from specie.parser.parser import MemoizedTokens
+
+
+# Return the sample scripts in the tests directory
+def scripts():
+  sources = []
+  for file_name in sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'scripts', '*.sp'))):
+    with open(file_name) as file:
+      sources.append(file.read())
+  return sources
+
+# Inputs that fail to parse, of which the last one has errors on multiple lines
+invalid_sources = [
+  "var = 3",
+  "1 2 3",
+  "(a, ...b, c) -> a",
+  "[1, 2,",
+  "{a: 1, b}",
+  "var x = (1 + 2",
+  "print(1 +)",
+  "from t in [1] bogus t",
+  "var f = (a = 1, b) -> a",
+  "do\n1\n",
+  "x.y.z = ",
+  "if 1 then",
+  "for x in",
+  "var = 3\nprint(1)\nvar x = (1 + 2\nprint(2)",
+]
+
+# Return a string representation of a node in an abstract syntax tree that contains all its fields
+def dump(node):
+  if isinstance(node, parser.Token):
+    return f"{node.name}({getattr(node.value, 'pattern', node.value)!r}, {node.location.line}, {node.location.col})"
+  elif isinstance(node, (list, tuple)):
+    return '[' + ', '.join(dump(item) for item in node) + ']'
+  elif isinstance(node, (ast.Expr, query.Function)) or hasattr(node, '__dict__'):
+    return node.__class__.__name__ + '(' + ', '.join(f"{name}={dump(value)}" for name, value in sorted(vars(node).items()) if name != 'plans') + ')'
+  else:
+    return f"{node.__class__.__name__}({node!s})"
+
+# Return the dumped tree and the printed errors of parsing a string with a grammar, or the raised error
+def parse(string, grammar = grammar, **kwargs):
+  buffer = io.StringIO()
+  try:
+    with contextlib.redirect_stdout(buffer):
+      tree = grammar.parse(string, **kwargs)
+  except (parser.ParserError, parser.LexerError) as err:
+    return f"{err.__class__.__name__}: {err}"
+  return dump(tree) + buffer.getvalue()
+
+
+# Return a separate copy of the grammar module of which the parser combinators are not compiled
+def interpreted_grammar():
+  spec = importlib.util.spec_from_file_location('specie.interpreted_grammar', grammar.__file__)
+  module = importlib.util.module_from_spec(spec)
+  with unittest.mock.patch.object(parser, 'compile_grammar', lambda *parsers: None):
+    spec.loader.exec_module(module)
+  return module
+
+
+###############################################
+### Definition of the packrat parsing tests ###
+###############################################
+
+class PackratTest(unittest.TestCase):
+  # Test if packrat parsing yields the same trees as parsing without memoization
+  def test_results(self):
+    for source in scripts():
+      with self.subTest(source = source[:40]):
+        self.assertEqual(parse(source, packrat = True), parse(source, packrat = False))
+
+  # Test if packrat parsing reports the same errors as parsing without memoization
+  def test_errors(self):
+    for source in invalid_sources:
+      with self.subTest(source = source):
+        result = parse(source, packrat = True)
+        self.assertRegex(result, r"^\w+Error: ")
+        self.assertEqual(result, parse(source, packrat = False))
+
+  # Test if a parser that synchronizes after an error doesn't return the memoized result without that error
+  def test_synchronize_errors(self):
+    identifier = parser.Parser(parser.token('identifier').function, ['newline'])
+    tokens = grammar.lexer.tokenize("1\nx")
+
+    expected = identifier.parse(tokens, 0)
+    self.assertFalse(expected)
+    self.assertEqual(expected.value.value, 'x')
+    self.assertEqual(len(expected.errors), 1)
+
+    # Memoize the successful result after the synchronization point first
+    memoized_tokens = MemoizedTokens(tokens)
+    self.assertTrue(identifier.parse(memoized_tokens, 2))
+    result = identifier.parse(memoized_tokens, 0)
+    self.assertEqual((result.value, result.index, [str(err) for err in result.errors]), (expected.value, expected.index, [str(err) for err in expected.errors]))
+
+  # Test if the memo belongs to a single parse, so parses of different tokens don't share results
+  def test_memo_per_parse(self):
+    self.assertEqual(parse("var x = 1", packrat = True), parse("var x = 1", packrat = False))
+    self.assertEqual(parse("var y = 2", packrat = True), parse("var y = 2", packrat = False))
+    self.assertFalse(hasattr(parser.Parser, 'memo'))
+
+
+################################################
+### Definition of the grammar compiler tests ###
+################################################
+
+class GrammarCompilerTest(unittest.TestCase):
+  # Create a copy of the grammar with interpreted parser combinators
+  @classmethod
+  def setUpClass(cls):
+    cls.interpreted_grammar = interpreted_grammar()
+
+  # Test if the copy of the grammar is actually interpreted
+  def test_interpreted(self):
+    self.assertEqual(grammar.module.function.__name__, 'parse_sequence')
+    self.assertNotEqual(self.interpreted_grammar.module.function.__name__, 'parse_sequence')
+
+  # Test if the compiled grammar yields the same trees as the interpreted parser combinators
+  def test_results(self):
+    for source in scripts():
+      with self.subTest(source = source[:40]):
+        result = parse(source)
+        self.assertTrue(result.startswith('ModuleExpr('))
+        self.assertEqual(result, parse(source, self.interpreted_grammar))
+
+  # Test if the compiled grammar reports the same errors as the interpreted parser combinators
+  def test_errors(self):
+    for source in invalid_sources:
+      with self.subTest(source = source):
+        result = parse(source, packrat = False)
+        self.assertRegex(result, r"^\w+Error: ")
+        self.assertEqual(result, parse(source, self.interpreted_grammar, packrat = False))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,589 @@
+import collections
+import contextlib
+import functools
+import io
+import itertools
+import os
+import random
+import tempfile
+import unittest
+import unittest.mock
+
+from rich.console import Console
+
+from specie import ast, cache, grammar, interpreter, internals, output, parser, query
+
+
+# Return the printed output of evaluating a script with the specified interpreter, or with a new compiled or
+# tree-walking interpreter
+def run(source, compiled = True, intp = None):
+  buffer = io.StringIO()
+  console, output.console = output.console, Console(file = buffer, width = 200, color_system = None)
+  try:
+    with contextlib.redirect_stdout(buffer):
+      (intp or interpreter.Interpreter(compiled = compiled)).execute(source)
+  finally:
+    output.console = console
+  return buffer.getvalue()
+
+# Return the result of a query and the counted calls of query functions, advances of select iterators and sorts of
+# all elements, with the query optimized or not
+def count_calls(source, compiled = True, optimized = True):
+  counts = collections.Counter()
+
+  # Return a function that counts its calls before calling the specified function
+  def counting(name, function):
+    def counting_function(*args, **kwargs):
+      counts[name] += 1
+      return function(*args, **kwargs)
+    return counting_function
+
+  intp = interpreter.Interpreter(compiled = compiled)
+  with contextlib.ExitStack() as stack:
+    if not optimized:
+      stack.enter_context(unittest.mock.patch.object(query, 'optimize', lambda variable, function: function))
+    stack.enter_context(unittest.mock.patch.object(internals.ObjFunction, '__call__', counting('function', internals.ObjFunction.__call__)))
+    stack.enter_context(unittest.mock.patch.object(internals.object_iterable.ObjSelectIterator, 'advance', counting('select', internals.object_iterable.ObjSelectIterator.advance)))
+    stack.enter_context(unittest.mock.patch.object(internals.object_iterable, 'sorted', counting('sort', sorted), create = True))
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    result = intp.execute(source)
+  return result, counts
+
+# Return a string representation of a node in an abstract syntax tree that contains all its fields
+def dump(node):
+  if isinstance(node, parser.Token):
+    return f"{node.name}({getattr(node.value, 'pattern', node.value)!r}, {node.location!s})"
+  elif isinstance(node, (list, tuple)):
+    return '[' + ', '.join(dump(item) for item in node) + ']'
+  elif isinstance(node, (ast.Expr, query.Function)):
+    return node.__class__.__name__ + '(' + ', '.join(f"{name}={dump(value)}" for name, value in sorted(vars(node).items()) if name != 'plans') + ')'
+  else:
+    return f"{node.__class__.__name__}({node!s})"
+
+
+########################################
+### Definition of query result tests ###
+########################################
+
+class QueryResultTest(unittest.TestCase):
+  # Test that query results in lists, records and call arguments don't change with their source
+  def test_results_are_copied(self):
+    source = "\n".join([
+      "var k = 1",
+      "var xs = [1, 2, 3]",
+      "var l = [from x in xs where x > k]",
+      "var r = {q: from x in xs where x > k}",
+      "var m = []",
+      "m.insert(from x in xs where x > k)",
+      "k = 2",
+      "xs.insert(10)",
+      "print(l)",
+      "print(r.q)",
+      "print(m)",
+    ])
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        self.assertEqual(run(source, compiled), "- [2, 3]\n- 2\n- 3\n- [2, 3]\n")
+
+  # Test that query results that are declared, assigned, set as a field or mutated don't change with their source
+  def test_results_are_materialized(self):
+    source = "\n".join([
+      "var k = 1",
+      "var xs = [1, 2, 3]",
+      "var d = from x in xs where x > k",
+      "var a = []",
+      "a = from x in xs where x > k",
+      "var r = {q: []}",
+      "r.q = from x in xs where x > k",
+      "var counted = from x in xs where x > k",
+      "var count = counted.count()",
+      "(from x in xs where x > k).insert(4)",
+      "k = 2",
+      "xs.insert(10)",
+      "print(d)",
+      "print(a)",
+      "print(r.q)",
+      "print(count, \" \", counted.count())",
+      "print(xs)",
+    ])
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        self.assertEqual(run(source, compiled), "- 2\n- 3\n- 2\n- 3\n- 2\n- 3\n2 2\n- 1\n- 2\n- 3\n- 10\n")
+
+  # Test that query results that are only iterated by another query, a for loop or a method are streamed instead of
+  # copied into a list
+  def test_results_are_lazy(self):
+    for source, expected, expected_calls in [
+      ("print(from y in (from x in xs select probe(x)) take 2 sum y)", "8\n", 2),
+      ("print((from x in xs select probe(x)).count())", "6\n", 0),
+      ("print(from y in (from x in xs where probe(x) > 2) sum y)", "25\n", 6),
+      ("print(for y in (from x in xs select probe(x)) y * 2)", "- 10\n- 6\n- 16\n- 2\n- 18\n- 4\n", 6),
+    ]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          calls = []
+
+          # Return the value after counting the call
+          def probe(value: 'Obj') -> 'Obj':
+            calls.append(value)
+            return value
+
+          intp = interpreter.Interpreter(compiled = compiled)
+          intp.globals.variables.declare_field('probe', internals.ObjPyCallable(probe))
+          with unittest.mock.patch.object(internals.ObjLazyList, 'materialize', side_effect = AssertionError("the query result was materialized")):
+            self.assertEqual(run(f"var xs = [5, 3, 8, 1, 9, 2]\n{source}", intp = intp), expected)
+          self.assertEqual(len(calls), expected_calls)
+
+
+###########################################
+### Definition of query optimizer tests ###
+###########################################
+
+class QueryOptimizerTest(unittest.TestCase):
+  # Return the optimized query function of a query expression
+  def optimize(self, source):
+    module = grammar.parse(source)
+    interpreter.Interpreter().resolver.resolve(module)
+    return module.expressions[0].function
+
+  # Test that a sort before a filter and a count is dropped, so the filter and the count are fused
+  def test_sort_where_count(self):
+    function = self.optimize("from x in [3, 1, 2] sort x where x > 1 count")
+    self.assertIs(type(function), query.CountWhere)
+    self.assertEqual(run("print(from x in [3, 1, 2] sort x where x > 1 count)"), "2\n")
+
+  # Test that a sort before an aggregate is dropped
+  def test_sort_sum(self):
+    function = self.optimize("from x in [3, 1, 2] sortDesc x sum x")
+    self.assertIs(type(function), query.Sum)
+
+  # Test that fusing where functions evaluates one predicate per element instead of one per where function
+  def test_where_fusion_calls(self):
+    source = "from x in [5, 3, 8, 1, 9, 2] where x > 1 where x < 9"
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        result, counts = count_calls(source, compiled)
+        unoptimized_result, unoptimized_counts = count_calls(source, compiled, optimized = False)
+        self.assertEqual(result, unoptimized_result)
+        self.assertEqual((counts['function'], unoptimized_counts['function']), (6, 11))
+
+  # Test that fusing a select function into a following select function or aggregate evaluates one function per
+  # element instead of two
+  def test_select_fusion_calls(self):
+    for source in ["from x in [5, 3, 8, 1, 9, 2] select x * 2 select x + 1", "from x in [5, 3, 8, 1, 9, 2] select x * 2 sum x + 1"]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          result, counts = count_calls(source, compiled)
+          unoptimized_result, unoptimized_counts = count_calls(source, compiled, optimized = False)
+          self.assertEqual(result, unoptimized_result)
+          self.assertEqual((counts['function'], unoptimized_counts['function']), (6, 12))
+
+  # Test that skipping elements before selecting them doesn't advance the selected elements that are skipped
+  def test_skip_calls(self):
+    source = "from x in [5, 3, 8, 1, 9, 2] orderBy x select x * 2 skip 4"
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        result, counts = count_calls(source, compiled)
+        unoptimized_result, unoptimized_counts = count_calls(source, compiled, optimized = False)
+        self.assertEqual(result, unoptimized_result)
+        self.assertEqual((counts['select'], unoptimized_counts['select']), (3, 7))
+        self.assertLessEqual(counts['function'], unoptimized_counts['function'])
+
+  # Test that taking elements before selecting them selects the first sorted elements with a heap instead of sorting
+  # all elements
+  def test_take_calls(self):
+    source = "from x in [5, 3, 8, 1, 9, 2] orderBy x select x * 2 take 2"
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        result, counts = count_calls(source, compiled)
+        unoptimized_result, unoptimized_counts = count_calls(source, compiled, optimized = False)
+        self.assertEqual(result, unoptimized_result)
+        self.assertEqual((counts['sort'], unoptimized_counts['sort']), (0, 1))
+        self.assertLessEqual(counts['function'], unoptimized_counts['function'])
+
+  # Test that a module that is loaded from the cache is optimized the same as a freshly parsed module, also when the
+  # cached tree is resolved again after it was optimized in place
+  def test_cached_module(self):
+    source = "\n".join([
+      "var xs = [5, 3, 8, 1, 9, 2]",
+      "print(from x in xs orderBy x where x > 1 where x < 9 count)",
+      "print(from x in xs select x * 2 sum x + 1)",
+      "print(from x in xs orderBy x select x * 2 take 2)",
+      "print(from x in xs select x + 1 contains 4)",
+    ])
+    expected = grammar.parse(source)
+    interpreter.Interpreter().resolver.resolve(expected)
+
+    with tempfile.TemporaryDirectory() as directory:
+      file_name = os.path.join(directory, 'module.sp')
+      with open(file_name, 'w') as file:
+        file.write(source)
+      cache.ModuleCache(os.path.join(directory, 'cache')).parse(file_name, source)
+
+      module_cache = cache.ModuleCache(os.path.join(directory, 'cache'))
+      module = module_cache.load(os.path.abspath(file_name), module_cache.key(os.path.abspath(file_name), source))
+      self.assertIsNotNone(module)
+      interpreter.Interpreter().resolver.resolve(module)
+      self.assertEqual(dump(module), dump(expected))
+
+      module = module_cache.parse(file_name, source)
+      for _ in range(2):
+        interpreter.Interpreter().resolver.resolve(module)
+        self.assertEqual(dump(module), dump(expected))
+
+
+
+#########################################
+### Definition of the aggregate tests ###
+#########################################
+
+class AggregateTest(unittest.TestCase):
+  # Return money with the specified currency and value
+  @staticmethod
+  def money(currency, value):
+    return internals.ObjMoney(internals.ObjString(currency), internals.ObjFloat(value))
+
+  # Return the result of folding elements with a method, like the aggregates do for elements that aren't native
+  @staticmethod
+  def fold(method, elements):
+    if method == 'add':
+      return functools.reduce(lambda a, b: a.call_method('add', b), elements)
+    return functools.reduce(lambda a, b: a if bool(a.call_method(method, b)) else b, elements)
+
+  # Test that a run of ints followed by floats is aggregated like folding the elements with their methods
+  def test_ints_then_floats(self):
+    for items in [[1, 2, 3, 0.5, 1.5], [3, 1, 2, 0.5], [3, 1, 4, 3.5, 4.5], [0.5, 1, 2], [2, 2.0, 2]]:
+      with self.subTest(items = items):
+        elements = [internals.ObjInt(item) if type(item) is int else internals.ObjFloat(item) for item in items]
+        iterable = internals.ObjList(*elements)
+        self.assertEqual(iterable.sum(), self.fold('add', elements))
+        self.assertEqual(iterable.min(), self.fold('lt', elements))
+        self.assertEqual(iterable.max(), self.fold('gt', elements))
+
+        stats = iterable.stats()
+        self.assertEqual(stats.get_field('count'), internals.ObjInt(len(items)))
+        self.assertEqual(stats.get_field('sum'), self.fold('add', elements))
+        self.assertEqual(stats.get_field('min'), self.fold('lt', elements))
+        self.assertEqual(stats.get_field('max'), self.fold('gt', elements))
+        self.assertAlmostEqual(stats.get_field('mean').value, sum(items) / len(items))
+        self.assertAlmostEqual(stats.get_field('variance').value, sum((item - sum(items) / len(items)) ** 2 for item in items) / len(items))
+
+  # Test that a run of ints followed by floats is aggregated the same by queries under both engines
+  def test_ints_then_floats_queries(self):
+    for source, expected in [
+      ("print(from x in [1, 2, 3, 0.5, 1.5] sum x)", "8.0\n"),
+      ("print(from x in [3, 1, 2, 0.5] min x)", "0.5\n"),
+      ("print(from x in [3, 1, 2, 3.5] max x)", "3.5\n"),
+      ("print(from x in [1, 2, 3, 0.5, 1.5] average x)", "1.6\n"),
+    ]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          self.assertEqual(run(source, compiled), expected)
+
+  # Test that money of a single currency is aggregated natively and money of different currencies raises an error
+  # like adding or comparing it with its methods
+  def test_money_currencies(self):
+    elements = [self.money('EUR', 1), self.money('EUR', 2.5), self.money('EUR', 0.25)]
+    iterable = internals.ObjList(*elements)
+    self.assertEqual(iterable.sum(), self.money('EUR', 3.75))
+    self.assertEqual(iterable.min(), self.money('EUR', 0.25))
+    self.assertEqual(iterable.max(), self.money('EUR', 2.5))
+    self.assertEqual(iterable.stats().get_field('mean'), self.money('EUR', 1.25))
+
+    for elements in [[self.money('EUR', 1), self.money('EUR', 2.5), self.money('USD', 1)], [self.money('USD', 1), self.money('EUR', 1)]]:
+      iterable = internals.ObjList(*elements)
+      for method in ('sum', 'min', 'max', 'stats'):
+        with self.subTest(elements = elements, method = method):
+          with self.assertRaises(internals.InvalidOperationException):
+            getattr(iterable, method)()
+
+  # Test that money of different currencies raises the same error by queries under both engines
+  def test_money_currencies_queries(self):
+    for function in ('sum', 'min', 'max', 'average'):
+      source = f"print(from x in [money(\"EUR\", 1), money(\"EUR\", 2.5), money(\"USD\", 1)] {function} x)"
+      for compiled in (True, False):
+        with self.subTest(function = function, compiled = compiled):
+          self.assertRegex(run(source, compiled), r"InvalidOperationException: Operation '(add|lt|gt)' does not support operands of type Money and Money")
+
+  # Test that the stats of an empty iterable have a count of zero and null for the other fields
+  def test_empty_stats(self):
+    stats = internals.ObjList().stats()
+    self.assertEqual(stats.get_field('count'), internals.ObjInt(0))
+    for name in ('sum', 'min', 'max', 'mean', 'variance'):
+      with self.subTest(name = name):
+        self.assertIs(stats.get_field(name), internals.ObjNull())
+
+  # Test that the average of an empty iterable is null instead of raising an error, also for queries under both
+  # engines
+  def test_empty_average(self):
+    self.assertIs(internals.ObjList().average(), internals.ObjNull())
+    for source in ["print(from x in [] average x)", "print(from x in [1, 2] where x > 5 average x)", "print([].average())"]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          self.assertEqual(run(source, compiled), "null\n")
+    for compiled in (True, False):
+      with self.subTest(compiled = compiled):
+        self.assertEqual(run("var s = from x in [1, 2] where x > 5 stats x\nprint(s.count, \" \", s.sum, \" \", s.mean, \" \", s.variance)", compiled), "0 null null null\n")
+
+
+
+########################################
+### Definition of the distinct tests ###
+########################################
+
+class DistinctTest(unittest.TestCase):
+  # Return a record with the specified fields
+  @staticmethod
+  def record(**fields):
+    record = internals.ObjRecord()
+    for name, value in fields.items():
+      record.declare_field(name, value)
+    return record
+
+  # Return the elements that are not equal to an earlier element, like distinct did by comparing every element
+  @staticmethod
+  def unique(elements, key = lambda element: element):
+    result, keys = [], []
+    for element in elements:
+      if key(element) not in keys:
+        result.append(element)
+        keys.append(key(element))
+    return result
+
+  # Return hashable and unhashable elements with duplicates of both, of which the ints and floats are equal, the
+  # lists are equal by their items and the records are only equal to themselves
+  def elements(self):
+    one, two, record = internals.ObjInt(1), internals.ObjInt(2), self.record(a = internals.ObjInt(1))
+    return [
+      one, record, internals.ObjList(one, two), internals.ObjFloat(1.0), self.record(a = one), internals.ObjString("a"),
+      internals.ObjList(one, two), two, record, internals.ObjList(two), one, internals.ObjString("a"),
+      internals.ObjList(internals.ObjFloat(2.0)), internals.ObjNull(), internals.ObjNull(),
+    ]
+
+  # Test that distinct keeps the first of equal hashable and unhashable elements in order
+  def test_hashable_and_unhashable(self):
+    elements = self.elements()
+    result = [*iter(internals.ObjList(*elements).distinct())]
+    self.assertEqual(result, self.unique(elements))
+    self.assertEqual(len(result), 8)
+    for element, expected in zip(result, self.unique(elements)):
+      self.assertIs(element, expected)
+
+  # Test that rewinding a distinct iterator clears the yielded elements, so every pass yields the same elements
+  def test_rewind(self):
+    elements = self.elements()
+    iterable = internals.ObjList(*elements).distinct()
+    first_pass = [*iter(iterable)]
+    self.assertEqual([*iter(iterable)], first_pass)
+
+    iterator = iter(iterable)
+    self.assertTrue(iterator.advance())
+    self.assertTrue(iterator.advance())
+    iterator.rewind()
+    self.assertEqual([*iterator], first_pass)
+
+  # Test that distinctBy keeps the first element for every hashable or unhashable key in order
+  def test_distinct_by(self):
+    elements = [self.record(k = key, v = internals.ObjInt(index)) for index, key in enumerate(self.elements())]
+    key = internals.ObjPyCallable(lambda element: element.get_field('k'))
+    result = [*iter(internals.ObjList(*elements).distinct(key))]
+    expected = self.unique(elements, lambda element: element.get_field('k'))
+    self.assertEqual([element.get_field('v') for element in result], [element.get_field('v') for element in expected])
+
+  # Test that distinct and distinctBy queries yield the same elements under both engines
+  def test_queries(self):
+    for source, expected in [
+      ("var r = {a: 1}\nprint(from x in [1, r, [1, 2], 1.0, {a: 1}, \"a\", [1, 2], 2, r, \"a\", [2.0], [2]] distinct x)", "- 1\n- {a: 1}\n- [1, 2]\n- {a: 1}\n- a\n- 2\n- [2.0]\n"),
+      ("print(from x in [3, 1, 4, 1, 5, 9, 2, 6, 5] distinct x > 3)", "- false\n- true\n"),
+      ("print(from x in [{k: [1], v: 1}, {k: 2, v: 2}, {k: [1], v: 3}, {k: 2.0, v: 4}, {k: [2], v: 5}] distinctBy x.k select x.v)", "- 1\n- 2\n- 5\n"),
+      ("print(from x in [3, 1, 4, 1, 5, 9, 2, 6, 5] distinctBy x > 3)", "- 3\n- 4\n"),
+    ]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          self.assertEqual(run(source, compiled), expected)
+
+
+
+########################################
+### Definition of the ordering tests ###
+########################################
+
+class OrderByTest(unittest.TestCase):
+  # Set up elements with two keys that have many equal values and their index in the original order
+  def setUp(self):
+    generator = random.Random(7)
+    self.keys = [(generator.randrange(4), generator.choice([0.5, 1, 1.5, 2])) for _ in range(40)]
+    self.source = "var xs = [" + ", ".join(f"{{k: {k}, j: {j}, i: {i}}}" for i, (k, j) in enumerate(self.keys)) + "]\n"
+
+  # Return the printed indices of the elements in the order of a key function, which is stable like the expected order
+  def expected(self, key, count = None):
+    indices = sorted(range(len(self.keys)), key = lambda i: key(*self.keys[i]))
+    return "".join(f"- {i}\n" for i in indices[:count]) if indices[:count] else "No items in the list\n"
+
+  # Assert that a query prints the same under both engines and return the printed output
+  def assertSameOutput(self, source):
+    result = run(self.source + source, True)
+    self.assertEqual(result, run(self.source + source, False))
+    return result
+
+  # Test that elements with equal keys keep their original order in both directions and with multiple keys
+  def test_stable(self):
+    for query, key in [
+      ("orderBy x.k", lambda k, j: k),
+      ("orderByDesc x.k", lambda k, j: -k),
+      ("orderBy x.j", lambda k, j: j),
+      ("orderBy x.k thenBy x.j", lambda k, j: (k, j)),
+      ("orderBy x.k thenByDesc x.j", lambda k, j: (k, -j)),
+      ("orderByDesc x.k thenBy x.j", lambda k, j: (-k, j)),
+      ("sort x.j", lambda k, j: j),
+      ("sortDesc x.j", lambda k, j: -j),
+    ]:
+      with self.subTest(query = query):
+        self.assertEqual(self.assertSameOutput(f"print(from x in xs {query} select x.i)"), self.expected(key))
+
+  # Test that taking fewer, as many or more elements than there are sorted elements takes the first sorted elements
+  def test_take(self):
+    for query, key in [
+      ("orderBy x.k", lambda k, j: k),
+      ("orderByDesc x.j", lambda k, j: -j),
+      ("orderBy x.k thenByDesc x.j", lambda k, j: (k, -j)),
+      ("orderByDesc x.k thenByDesc x.j", lambda k, j: (-k, -j)),
+    ]:
+      for count in (0, 1, 5, len(self.keys) - 1, len(self.keys), len(self.keys) + 1, 100):
+        with self.subTest(query = query, count = count):
+          self.assertEqual(self.assertSameOutput(f"print(from x in xs {query} take {count} select x.i)"), self.expected(key, count))
+          self.assertEqual(self.assertSameOutput(f"print(from x in xs {query} select x.i take {count})"), self.expected(key, count))
+
+  # Test that keys of numbers of mixed types are sorted by their value and keys that can't be compared with each other
+  # raise an error instead of a Python error
+  def test_mixed_key_types(self):
+    self.assertEqual(self.assertSameOutput("print(from x in [3, 1.5, 2, 1, 2.0, 0.5] orderBy x)"), "- 0.5\n- 1\n- 1.5\n- 2\n- 2.0\n- 3\n")
+    self.assertEqual(self.assertSameOutput("print(from x in [3, 1.5, 2, 1, 2.0, 0.5] orderByDesc x take 3)"), "- 3\n- 2\n- 2.0\n")
+    for items in ["[3, \"a\", 1]", "[money(\"EUR\", 2), money(\"USD\", 1)]", "[date(\"2023-01-02\"), 1]", "[{a: 1}, {a: 2}]"]:
+      for query in ("orderBy x", "orderByDesc x take 1", "orderBy x thenByDesc x"):
+        with self.subTest(items = items, query = query):
+          self.assertRegex(self.assertSameOutput(f"print(from x in {items} {query})"), r"InvalidOperationException: ")
+
+    with self.assertRaises(internals.InvalidOperationException):
+      internals.ObjList(internals.ObjInt(1), internals.ObjString("a")).sort()
+
+  # Test that getting the current element of a Python iterator before advancing it raises an invalid state error
+  def test_iterator_state(self):
+    iterator = iter(internals.ObjList(internals.ObjInt(2), internals.ObjInt(1)).sort())
+    with self.assertRaises(internals.InvalidStateException):
+      iterator.current()
+    self.assertTrue(iterator.advance())
+    self.assertEqual(iterator.current(), internals.ObjInt(1))
+
+
+
+#############################################
+### Definition of the take and skip tests ###
+#############################################
+
+class TakeSkipTest(unittest.TestCase):
+  # Lists of ints to take and skip elements of
+  lists = [[], [1], [5], [1, 2, 5, 1, 2], [1, 2, 2], [7, 8, 9]]
+
+  # Return a list object with the specified ints
+  @staticmethod
+  def list_object(items):
+    return internals.ObjList(*map(internals.ObjInt, items))
+
+  # Return the ints of an iterable
+  @staticmethod
+  def ints(iterable):
+    return [element.value for element in iter(iterable)]
+
+  # Return a predicate that matches ints less than three
+  @staticmethod
+  def less_than_three():
+    return internals.ObjPyCallable(lambda element: internals.ObjBool(element.value < 3))
+
+  # Test that skip, takeWhile and skipWhile yield the same elements as their Python counterparts
+  def test_results(self):
+    for items in self.lists:
+      with self.subTest(items = items):
+        for count in range(len(items) + 2):
+          self.assertEqual(self.ints(self.list_object(items).skip(count)), items[count:])
+          self.assertEqual(self.ints(self.list_object(items).take(count)), items[:count])
+        self.assertEqual(self.ints(self.list_object(items).take_while(self.less_than_three())), [*itertools.takewhile(lambda item: item < 3, items)])
+        self.assertEqual(self.ints(self.list_object(items).skip_while(self.less_than_three())), [*itertools.dropwhile(lambda item: item < 3, items)])
+
+  # Test that rewinding the iterators, also after they stopped or were only partially advanced, yields the same
+  # elements again
+  def test_rewind(self):
+    for items in self.lists:
+      for name, iterable in [
+        ("skip", self.list_object(items).skip(2)),
+        ("take", self.list_object(items).take(2)),
+        ("takeWhile", self.list_object(items).take_while(self.less_than_three())),
+        ("skipWhile", self.list_object(items).skip_while(self.less_than_three())),
+      ]:
+        with self.subTest(items = items, name = name):
+          expected = self.ints(iterable)
+          self.assertEqual(self.ints(iterable), expected)
+
+          iterator = iter(iterable)
+          if iterator.advance():
+            iterator.rewind()
+          self.assertEqual([element.value for element in iterator], expected)
+          self.assertEqual(len(iterable), len(expected))
+
+  # Test that first returns the first element, the first matching element or null if there is none
+  def test_first(self):
+    for items in self.lists:
+      with self.subTest(items = items):
+        iterable = self.list_object(items)
+        self.assertEqual(iterable.first(), internals.ObjInt(items[0]) if items else internals.ObjNull())
+        self.assertEqual(iterable.skip(len(items)).first(), internals.ObjNull())
+        self.assertEqual(iterable.skip_while(self.less_than_three()).first(), internals.ObjInt(next(item for item in items if item >= 3)) if any(item >= 3 for item in items) else internals.ObjNull())
+
+  # Test that the query functions and methods yield the same elements under both engines and can be iterated again
+  def test_queries(self):
+    for source, expected in [
+      ("print(from x in [1, 2, 5, 1, 2] skip 2)", "- 5\n- 1\n- 2\n"),
+      ("print(from x in [1, 2, 5, 1, 2] skip 9 count)", "0\n"),
+      ("print(from x in [1, 2, 5, 1, 2] takeWhile x < 3)", "- 1\n- 2\n"),
+      ("print(from x in [1, 2, 5, 1, 2] skipWhile x < 3)", "- 5\n- 1\n- 2\n"),
+      ("print(from x in [5, 1, 2] takeWhile x < 3 count)", "0\n"),
+      ("print(from x in [1, 2] skipWhile x < 3 count)", "0\n"),
+      ("print(from x in [4, 1, 3] first)", "4\n"),
+      ("print(from x in [4, 1, 3] first x < 4)", "1\n"),
+      ("print(from x in [4, 1, 3] orderBy x first)", "1\n"),
+      ("print(from x in [] first)", "null\n"),
+      ("print(from x in [4, 1, 3] first x > 5)", "null\n"),
+      ("print(from x in [4, 1, 3] skip 3 first)", "null\n"),
+      ("print([].first())", "null\n"),
+      ("var it = [1, 2, 5, 1, 2].skip(2)\nprint(it.count(), \" \", it.count(), \" \", it.first())\nprint(for y in it y)\nprint(for y in it y)", "3 3 5\n- 5\n- 1\n- 2\n- 5\n- 1\n- 2\n"),
+      ("var it = [1, 2, 5, 1, 2].takeWhile((x) -> x < 3)\nprint(it.count(), \" \", it.count())\nprint(for y in it y)", "2 2\n- 1\n- 2\n"),
+      ("var it = [1, 2, 5, 1, 2].skipWhile((x) -> x < 3)\nprint(it.first(), \" \", it.count(), \" \", it.first())", "5 3 5\n"),
+    ]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          self.assertEqual(run(source, compiled), expected)
+
+  # Test that first and takeWhile stop evaluating elements after the first element that decides the result
+  def test_short_circuit(self):
+    for source, expected, expected_calls in [
+      ("print(from x in xs first probe(x) > 2)", "5\n", 3),
+      ("print(from x in xs takeWhile probe(x) < 3 count)", "2\n", 3),
+      ("print(from x in xs select probe(x) first)", "1\n", 1),
+    ]:
+      for compiled in (True, False):
+        with self.subTest(source = source, compiled = compiled):
+          calls = []
+
+          # Return the value after counting the call
+          def probe(value: 'Obj') -> 'Obj':
+            calls.append(value)
+            return value
+
+          intp = interpreter.Interpreter(compiled = compiled)
+          intp.globals.variables.declare_field('probe', internals.ObjPyCallable(probe))
+          self.assertEqual(run(f"var xs = [1, 2, 5, 1, 2]\n{source}", intp = intp), expected)
+          self.assertEqual(len(calls), expected_calls)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,182 @@
+import contextlib
+import io
+import random
+import re
+import sys
+import unittest
+import unittest.mock
+
+from specie import interpreter, internals
+
+
+# Return a transaction with the specified id, date and name
+def transaction(id, date, name):
+  transaction = internals.ObjTransaction()
+  transaction.set_field('id', internals.ObjString(f"t{id:05d}"))
+  transaction.set_field('date', internals.ObjDate(date))
+  transaction.set_field('name', internals.ObjString.intern(name))
+  return transaction
+
+
+##########################################
+### Definition of the hash index tests ###
+##########################################
+
+class HashIndexTest(unittest.TestCase):
+  # The names of the transactions, of which there are few, so every name has several rows
+  names = ["ALBERT HEIJN", "HEMA", "JUMBO", "NS", "SHELL"]
+
+  # Set up a table with a hash index on the names of the transactions and the same table without index
+  def setUp(self):
+    self.random = random.Random(7)
+    self.next_id = 0
+    self.table = internals.ObjTable().create_index('name')
+    self.unindexed_table = internals.ObjTable()
+    for _ in range(50):
+      self.apply('insert', self.new_transaction())
+
+  # Return a new transaction with a random date and name
+  def new_transaction(self):
+    self.next_id += 1
+    return transaction(self.next_id, f"2023-{self.random.randrange(1, 13):02d}-{self.random.randrange(1, 29):02d}", self.random.choice(self.names))
+
+  # Apply a method with the specified arguments to both tables
+  def apply(self, method, *args):
+    for table in (self.table, self.unindexed_table):
+      getattr(table, method)(*args)
+
+  # Assert that the index of the table finds the same rows as scanning the table without index
+  def assertIndexMatches(self):
+    self.assertEqual(len(self.table), len(self.unindexed_table))
+    for name in self.names + ["MISSING"]:
+      value = internals.ObjString(name)
+      expected = [index for index in range(len(self.unindexed_table)) if self.unindexed_table.get_item_at(index).name == value]
+      self.assertEqual(self.table.lookup('name', value), expected)
+      self.assertEqual([self.table.get_item_at(index).id for index in expected], [self.unindexed_table.get_item_at(index).id for index in expected])
+
+  # Apply a random modification to both tables
+  def modify(self):
+    operation = self.random.choice(['insert', 'insort', 'delete_item_at', 'delete', 'set_item_at', 'write'])
+    if operation in ('insert', 'insort'):
+      self.apply(operation, self.new_transaction())
+    elif operation == 'delete_item_at':
+      self.apply(operation, self.random.randrange(len(self.table)))
+    elif operation == 'delete':
+      self.apply(operation, self.unindexed_table.get_item_at(self.random.randrange(len(self.table))))
+    elif operation == 'set_item_at':
+      self.apply(operation, self.random.randrange(len(self.table)), self.new_transaction())
+    else:
+      index, name = self.random.randrange(len(self.table)), internals.ObjString(self.random.choice(self.names))
+      for table in (self.table, self.unindexed_table):
+        table.get_item_at(index).name = name
+
+  # Test if the index finds the same rows as a scan after mixed inserts, deletes and writes
+  def test_mixed_modifications(self):
+    self.assertIndexMatches()
+    for _ in range(300):
+      self.modify()
+      self.assertIndexMatches()
+
+  # Test if the index is updated along with the rows instead of being rebuilt after it is built once
+  def test_index_is_updated(self):
+    self.assertIndexMatches()
+    with unittest.mock.patch.object(internals.object_table.HashIndex, 'build', side_effect = AssertionError("the index was rebuilt")):
+      for _ in range(100):
+        self.modify()
+        self.assertIndexMatches()
+      self.apply('insort_all', [self.new_transaction() for _ in range(20)])
+      self.assertIndexMatches()
+
+  # Test if the index is rebuilt once rows that can't be indexed are deleted again
+  def test_unindexable_rows(self):
+    self.assertIndexMatches()
+    self.apply('insert', internals.ObjInt(1))
+    self.assertIsNone(self.table.lookup('name', internals.ObjString("HEMA")))
+    self.apply('delete_item_at', len(self.table) - 1)
+    self.assertIndexMatches()
+
+  # Test if a contains query on a selected field looks up the element in the index and matches a scan under both engines
+  def test_contains(self):
+    for _ in range(50):
+      self.modify()
+    for compiled in (True, False):
+      for table in (self.table, self.unindexed_table):
+        intp = interpreter.Interpreter(compiled = compiled)
+        intp.globals['_'] = table
+        for name in self.names + ["MISSING"]:
+          with self.subTest(compiled = compiled, indexed = table is self.table, name = name):
+            with unittest.mock.patch.object(internals.ObjTable, 'lookup', autospec = True, side_effect = internals.ObjTable.lookup) as lookup:
+              with contextlib.redirect_stdout(io.StringIO()):
+                result = intp.execute(f"from t in _ select t.name contains \"{name}\"")
+            self.assertEqual(result, internals.ObjBool(bool(self.table.lookup('name', internals.ObjString(name)))))
+            self.assertEqual(lookup.call_count, 1)
+
+
+
+#############################################
+### Definition of the trigram index tests ###
+#############################################
+
+class TrigramIndexTest(unittest.TestCase):
+  # Descriptions with characters that are folded differently by str.lower() depending on their context
+  descriptions = ["ΟΔΟΣ ΑΘΗΝΑΣ 12", "ΟΔΟΣΑ", "Café ΣΟΦΙΑ", "İSTANBUL ſtraat", "KELVIN \u212aoffie", "boodschappen week"]
+
+  # Set up a table with a trigram index on the descriptions of the transactions and the same table without index
+  def setUp(self):
+    self.table = internals.ObjTable().create_index('description', 'trigram')
+    self.unindexed_table = internals.ObjTable()
+    for id, description in enumerate(self.descriptions):
+      for table in (self.table, self.unindexed_table):
+        row = transaction(id, '2023-01-05', "HEMA")
+        row.set_field('description', internals.ObjString(description))
+        table.insert(row)
+
+  # Return the result of a query on a table under both engines, asserting that they are the same
+  def query(self, table, source):
+    results = []
+    for compiled in (True, False):
+      intp = interpreter.Interpreter(compiled = compiled)
+      intp.globals['_'] = table
+      with contextlib.redirect_stdout(io.StringIO()):
+        results.append(intp.execute(source))
+    self.assertEqual(results[0], results[1])
+    return results[0]
+
+  # Test if the characters are folded one at a time, regardless of the characters around them
+  def test_fold_per_character(self):
+    fold = internals.object_table.TrigramIndex.fold
+    for string in self.descriptions + ["ΟΔΟΣ", "ΣΑ", "ὈΔΥΣΣΕΎΣ"]:
+      with self.subTest(string = string):
+        self.assertEqual(fold(string), ''.join(map(fold, string)))
+        self.assertEqual(len(fold(string)), len(string))
+
+  # Test if every character that a case-insensitive regex matches to an ASCII letter is folded to that letter
+  def test_fold_ascii_letters(self):
+    fold = internals.object_table.TrigramIndex.fold
+    letters = [re.compile(letter, re.IGNORECASE) for letter in 'abcdefghijklmnopqrstuvwxyz']
+    for code in range(128, sys.maxunicode + 1):
+      char = chr(code)
+      if char.isalpha() or code in (0x212a,):
+        for pattern in letters:
+          if pattern.fullmatch(char):
+            self.assertEqual(fold(char), pattern.pattern, f"{char!r} matches {pattern.pattern!r}")
+
+  # Test if queries that use the trigram index find the same rows as the table without index
+  def test_queries(self):
+    for term in ["\"ΟΔΟΣ\" in t.description", "t.description =~ /ΟΔΟΣ/", "t.description =~ /οδος/i", "\"ΟΔΟΣΑ\" in t.description", "t.description =~ /istanbul st/i", "t.description =~ /koffie/i", "t.description =~ /café/i", "\"ΣΟΦ\" in t.description"]:
+      with self.subTest(term = term):
+        source = f"from t in _ where {term} count"
+        expected = self.query(self.unindexed_table, source)
+        self.assertNotEqual(expected, internals.ObjInt(0))
+        self.assertEqual(self.query(self.table, source), expected)
+
+  # Test if the index finds the rows that contain a literal with a final sigma in the middle of a word
+  def test_final_sigma(self):
+    rows = self.table.search('description', ["ΟΔΟΣ"])
+    self.assertIsNotNone(rows)
+    self.assertIn(1, rows)
+    self.assertIn(0, rows)
+
+
+if __name__ == '__main__':
+  unittest.main()